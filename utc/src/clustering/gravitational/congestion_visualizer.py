@@ -1,7 +1,8 @@
 from utc.src.constants.static.file_constants import DirPaths, FileExtension
-from utc.src.constants.file_system.file_types.xml_file import XmlFile
+from utc.src.constants.file_system.file_types.edge_data_store import EdgeDataStore
+from utc.src.constants.file_system.my_directory import MyDirectory
 from utc.src.graph import Graph, RoadNetwork
-from typing import Dict, Tuple, Optional
+from typing import List, Tuple, Optional
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -27,13 +28,52 @@ class CongestionVisualizer:
             title=f"Congestion Index of: {graph.road_network.map_name}",
             background_color="white"
         )
-        graph.display.render_edges(
-            ax, graph.road_network.get_edge_list(),
-            colors=plt.get_cmap("Reds")(congestion_array)
-        )
+        graph.display.render_network(ax, plt.get_cmap("Reds")(congestion_array))
         graph.display.show_plot(ax, save_path)
         return
 
+    def export_ci(
+            self, edge_data: str, graph: Graph, out_dir: str,
+            period: float = 3600.0, processes: int = 1
+        ) -> bool:
+        """
+        Saves heatmap of congestion index averaged over each period of edge data (frames of animation,
+        e.g. hourly congestion), geometry of network is shared, frames are rendered in parallel processes.
+
+        :param edge_data: edge data
+        :param graph: on which to visualize the data
+        :param out_dir: directory to save images at (created if it does not exist)
+        :param period: length of frame in seconds (default one hour)
+        :param processes: number of processes (default 1)
+        :return: True on success, False otherwise
+        """
+        store: EdgeDataStore = EdgeDataStore(edge_data)
+        if not store.is_loaded() or period <= 0:
+            return False
+        values: Optional[np.ndarray] = store.get_values("congestionIndex", graph.road_network.edges.keys())
+        if values is None:
+            print(f"Edge data: {edge_data} is missing attribute 'congestionIndex' !")
+            return False
+        directory: MyDirectory = MyDirectory(out_dir)
+        directory.initialize_dir()
+        congestion_arrays: List[np.ndarray] = []
+        save_paths: List[str] = []
+        titles: List[str] = []
+        for start in np.arange(store.begin.min(), store.end.max(), period):
+            intervals: np.ndarray = np.flatnonzero((store.begin >= start) & (store.begin < start + period))
+            if len(intervals) == 0:
+                continue
+            congestion_arrays.append(self.average_ci(values[intervals]))
+            save_paths.append(directory.format_file(f"ci_{int(start)}.png"))
+            titles.append(f"Congestion Index of: {graph.road_network.map_name}, {int(start)}-{int(start + period)}")
+        print(f"Exporting: {len(congestion_arrays)} frames of CI to: {out_dir}")
+        if not all(self.check_array(congestion_array, graph) for congestion_array in congestion_arrays):
+            return False
+        return graph.display.export_frames(
+            [plt.get_cmap("Reds")(congestion_array) for congestion_array in congestion_arrays],
+            save_paths, processes, titles
+        )
+
     def plot_ci_diff(
             self, ci_array1: np.ndarray, ci_array2: np.ndarray, graph: Graph,
             save_path: str = "", axes=None) -> None:
@@ -64,10 +104,7 @@ class CongestionVisualizer:
         colors[congestion_diff >= 0] = plt.cm.Reds(congestion_diff[congestion_diff >= 0])
         # Apply reversed colormap for values in the range [-1, 0]
         colors[congestion_diff < 0] = plt.cm.Blues(-congestion_diff[congestion_diff < 0])
-        graph.display.render_edges(
-            ax, graph.road_network.get_edge_list(),
-            colors=colors, adjust_colors=True
-        )
+        graph.display.render_network(ax, colors)
         # graph.display.render_edges(
         #     ax, [graph.road_network.get_edge("-31818#22")],
         #     colors="purple"
@@ -87,33 +124,28 @@ class CongestionVisualizer:
         :param window: time window from which we want the data to be (from, to)
         :return: Congestion index values as
         """
-        if not XmlFile.file_exists(edge_data, True):
+        store: EdgeDataStore = EdgeDataStore(edge_data)
+        if not store.is_loaded():
             return
         elif window is None:
             window = (0, float("inf"))
-        xml_file: XmlFile = XmlFile(edge_data)
-        # Edge_id : CongestionIndex
-        ci_map: Dict[str, float] = dict.fromkeys(graph.road_network.edges.keys(), 0.)
-        ci_counter: Dict[str, int] = dict.fromkeys(ci_map.keys(), 0)
-        n_intervals: int = 0
-        for interval in xml_file.root.findall("interval"):
-            if float(interval.attrib["begin"]) < window[0]:
-                continue
-            elif float(interval.attrib["end"]) > window[1]:
-                break
-            n_intervals += 1
-            for edge in interval.findall("edge"):
-                if edge.attrib["id"] not in ci_map:
-                    continue
-                elif "congestionIndex" not in edge.attrib:
-                    print(f"Edge: {edge.attrib['id']} is missing attribute 'congestionIndex' !")
-                    continue
-                ci_map[edge.attrib["id"]] += float(edge.attrib["congestionIndex"])
-                ci_counter[edge.attrib["id"]] += 1
-        print(f"Loaded CI of: {edge_data}, intervals: {n_intervals}")
-        divs: np.ndarray = np.array(list(ci_counter.values()))
+        intervals: np.ndarray = store.get_intervals(*window)
+        # Intervals x edges of graph (values of edges missing in interval are NaN)
+        values: Optional[np.ndarray] = store.get_values("congestionIndex", graph.road_network.edges.keys(), intervals)
+        if values is None:
+            print(f"Edge data: {edge_data} is missing attribute 'congestionIndex' !")
+            return
+        print(f"Loaded CI of: {edge_data}, intervals: {len(intervals)}")
+        return self.average_ci(values)
+
+    def average_ci(self, values: np.ndarray) -> np.ndarray:
+        """
+        :param values: congestion indexes of edges (intervals x edges), missing values are NaN
+        :return: Average congestion index of each edge over intervals (0 if edge has no values)
+        """
+        divs: np.ndarray = np.count_nonzero(~np.isnan(values), axis=0)
         divs[np.where(divs == 0)] = 1
-        return np.array(list(ci_map.values())) / divs
+        return np.nansum(values, axis=0, dtype=np.float64) / divs
 
     def check_array(self, congestion_array: np.ndarray, graph: Graph) -> bool:
         """
@@ -141,6 +173,10 @@ if __name__ == '__main__':
     array1 = visualizer.load_ci(data[0], graph)
     array2 = visualizer.load_ci(data[1], graph)
     visualizer.plot_ci_diff(array1, array2, graph)
+    # Hourly animation of congestion index
+    visualizer.export_ci(
+        data[0], graph, DirPaths.SCENARIO_STATISTICS.format("itsc_25200_32400_planned") + "/ci_frames", processes=4
+    )
 
 
 
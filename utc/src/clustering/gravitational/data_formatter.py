@@ -1,6 +1,8 @@
 from utc.src.constants.static.file_constants import DirPaths, FileExtension
-from utc.src.constants.file_system.file_types.xml_file import XmlFile
+from utc.src.constants.file_system.file_types.edge_data_store import EdgeDataStore
 from utc.src.graph.graph import Graph, RoadNetwork
+import numpy as np
+from typing import Optional, Tuple
 
 
 class DataFormatter:
@@ -21,78 +23,69 @@ class DataFormatter:
 
         :param data_file: path to data file (edge dump)
         :param network: network from which to extract the maximal speed on edges
-        :param save: true if congestion index should be saved in original data file
+        :param save: true if congestion index should be saved in store of data file
         :return: True on success, false otherwise
         :raises FileNotFoundError: if files do not exist
         """
-        xml_file: XmlFile = XmlFile(data_file)
-        if not xml_file.is_loaded():
+        store: EdgeDataStore = EdgeDataStore(data_file)
+        if not store.is_loaded():
             raise FileNotFoundError(f"Edge dump: '{data_file}' does not exist!")
         graph: Graph = Graph(RoadNetwork())
         assert(graph.loader.load_map(network))
         # Compute congestion index
         print("Computing congestion indexes")
-        for count, node in enumerate(xml_file.root.findall("interval")):
-            # print(f"Computing CI for interval: {count}")
-            for edge in node.findall("edge"):
-                if "traveltime" in edge.attrib and float(edge.attrib["traveltime"]) > 0:
-                    # Free flow travel time
-                    ftt: float = graph.road_network.get_edge(edge.attrib["id"]).get_travel_time()
-                    # Actual travel time
-                    att: float = float(edge.attrib["traveltime"])
-                    if att <= ftt:  # In case vehicle were faster or as fast as possible (given max speed limit)
-                        edge.attrib["congestionIndex"] = "0.0"
-                    else:
-                        edge.attrib["congestionIndex"] = str(round(1 - (ftt / att), 3))
-                        assert(0 <= float(edge.attrib["congestionIndex"]) <= 1)
-                else:  # No travel time was observed here
-                    edge.attrib["congestionIndex"] = "0"
+        shape: Tuple[int, int] = (len(store.begin), len(store.edges))
+        # Edges present in intervals (CI is not defined for the others)
+        present: np.ndarray = np.zeros(shape, dtype=bool)
+        for attribute in store.attributes:
+            present |= ~np.isnan(store.get_attribute(attribute))
+        # Actual travel time
+        att: Optional[np.ndarray] = store.get_attribute("traveltime")
+        att = np.full(shape, np.nan) if att is None else att.astype(np.float64)
+        # Free flow travel time
+        ftt: np.ndarray = np.array([
+            np.nan if graph.road_network.get_edge(edge_id) is None else
+            graph.road_network.get_edge(edge_id).get_travel_time() for edge_id in store.edges
+        ], dtype=np.float64)
+        # In case vehicle were faster or as fast as possible (given max speed limit), or no travel time was observed
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ci: np.ndarray = np.where(att > ftt, np.round(1 - (ftt / att), 3), 0.)
+        assert(np.all((0 <= ci) & (ci <= 1)))
+        store.set_attribute("congestionIndex", np.where(present, ci, np.nan))
         print("Finished computing congestion indexes")
-        return True if not save else xml_file.save(xml_file.file_path)
+        return True if not save else store.save()
 
     def congestion_difference(self, edge_data1: str, edge_data2: str, new_file: str) -> bool:
         """
-        Creates new file, with congestion index difference, both files must it already
+        Creates new store (of edge data), with congestion index difference, both files must it already
         calculated, and must be from the same network.
 
         :param edge_data1: path to edge data with congestion index already calculated
         :param edge_data2: path to edge data with congestion index already calculated
-        :param new_file: name of new file
+        :param new_file: name of new file (store)
         :return: true on success, false otherwise
         """
         # Compute congestion index
         print("Computing congestion index difference")
-        xml_file1: XmlFile = XmlFile(edge_data1)
-        xml_file2: XmlFile = XmlFile(edge_data2)
-        if not xml_file1.is_loaded() or not xml_file2.is_loaded():
+        store1: EdgeDataStore = EdgeDataStore(edge_data1)
+        store2: EdgeDataStore = EdgeDataStore(edge_data2)
+        if not store1.is_loaded() or not store2.is_loaded():
             return False
-        intervals1: list = list(xml_file1.root.findall("interval"))
-        intervals2: list = list(xml_file2.root.findall("interval"))
-        # if len(intervals1) != len(intervals2):
-        #     print("Intervals of edge data files are not equal !")
-        #     print(f"E1: {edge_data1}, E2: {edge_data2}")
-        #     quit()
-        #     return False
-        if len(intervals1) != len(intervals2):
+        elif store1.edges.keys() != store2.edges.keys():
+            print("Edge data have different edges !")
+            return False
+        ci1: Optional[np.ndarray] = store1.get_attribute("congestionIndex")
+        # Edges can be ordered differently in stores
+        ci2: Optional[np.ndarray] = store2.get_values("congestionIndex", store1.edges)
+        assert(ci1 is not None and ci2 is not None)
+        intervals: int = min(len(ci1), len(ci2))
+        if len(ci1) != len(ci2):
             print("Intervals of edge data files are not equal !")
-            if len(intervals1) > len(intervals2):
-                intervals1 = intervals1[:len(intervals2)]
-            else:
-                intervals2 = intervals1[:len(intervals1)]
-
-        for index, (interval1, interval2) in enumerate(zip(intervals1, intervals2)):
-            # print(f"Computing CI difference for interval: {index}")
-            if len(interval1.findall("edge")) != len(interval2.findall("edge")):
-                print("Intervals have different number of edges !")
-                return False
-            for edge1, edge2 in zip(interval1.findall("edge"), interval2.findall("edge")):
-                assert("congestionIndex" in edge1.attrib and "congestionIndex" in edge2.attrib)
-                edge1.attrib["congestionIndex"] = str(
-                    round(float(edge1.attrib["congestionIndex"]) - float(edge2.attrib["congestionIndex"]), 3)
-                )
+        difference: np.ndarray = np.copy(ci1)
+        difference[:intervals] = np.round(ci1[:intervals] - ci2[:intervals], 3)
+        store1.set_attribute("congestionIndex", difference)
         print("Finished computing congestion index difference")
-        return xml_file1.save(new_file)
-
+        return store1.save(new_file.replace(FileExtension.EDGE_DUMP, FileExtension.NPZ))
 
 if __name__ == "__main__":
     # DataFormatter().compute_congestion_index(
@@ -1,9 +1,10 @@
 from utc.src.constants.dynamic.arguments import get_args
 from utc.src.constants.file_system.file_types.json_file import JsonFile
-from utc.src.constants.file_system.file_types.xml_file import XmlFile
+from utc.src.constants.file_system.file_types.edge_data_store import EdgeDataStore
 from utc.src.clustering.gravitational.grav_clustering_options import GravClusteringOptions
 from utc.src.graph import Graph, RoadNetwork
-from typing import Dict, List, Union
+from utc.src.graph.network import SpatialIndex
+from typing import Dict, List, Union, Optional
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -61,7 +62,7 @@ class GravClustering:
 		# File checks
 		if not self.graph.loader.load_map(self.options.network):
 			raise FileNotFoundError(f"Network: '{self.options.network}' does not exist!")
-		elif not XmlFile.file_exists(self.options.data_path, False):
+		elif not EdgeDataStore.file_exists(self.options.data_path, False):
 			raise FileNotFoundError(f"Data: '{self.options.data_path}' does not exist!")
 		# Parameters for grav. clustering
 		self.clusters: Dict[int, List[int]] = {}  # edge_id : [edge_id, ...]
@@ -389,21 +390,23 @@ class GravClustering:
 		"""
 		:return: matrix of centroid points of all network edges
 		"""
-		centroid_matrix: np.array = np.zeros(shape=(len(self.graph.road_network.edges), 2), dtype=np.float32)
-		for edge in self.graph.road_network.edges.values():
-			# Values must be taken from lanes, since edges can have the same shape!
-			centroid_matrix[edge.get_id(True)] = np.array(edge.get_centroid())
+		# Values must be taken from lanes, since edges can have the same shape!
+		spatial_index: SpatialIndex = self.graph.road_network.get_spatial_index()
+		centroid_matrix: np.array = spatial_index.get_centroid_matrix(
+			len(self.graph.road_network.edges)
+		).astype(np.float32)
 		# Check if there are lanes which have the same position (can happen -> ITSC scenario), shift them
-		unique_elements, counts = np.unique(centroid_matrix, axis=0, return_counts=True)
+		unique_elements, counts = np.unique(spatial_index.edge_centroids, axis=0, return_counts=True)
 		duplicates = unique_elements[counts > 1]
 		if len(duplicates) != 0:
 			print(f"Warning, detected {len(duplicates)} Edge's, which lanes share the same coordinates, shifting!")
 			# Shift duplicate coordinates
 			for duplicate in duplicates:
-				# Find the indexes of duplicates
-				duplicate_indexes = np.unique(np.where(centroid_matrix == duplicate)[0])
-				# Change to python integers
-				edge_ids: List[str] = [self.graph.road_network.get_edge(int(i)).get_id() for i in duplicate_indexes]
+				# Find edges at the same position (by the spatial index)
+				edge_ids: List[str] = spatial_index.edges_in_radius(tuple(duplicate), 0)
+				duplicate_indexes: List[int] = sorted(
+					self.graph.road_network.get_edge(edge_id).internal_id for edge_id in edge_ids
+				)
 				print(f"Edges sharing same coordinates: {edge_ids}")
 				# Shift each duplicate by: 0.1 * duplicate_number
 				for i in range(1, len(duplicate_indexes)):
@@ -417,8 +420,8 @@ class GravClustering:
 		:param multiplier: of congestion indexes (otherwise, values between 0 and 1)
 		:return: array of congestion indexes (averaged over intervals)
 		"""
-		xml_file: XmlFile = XmlFile(self.options.data_path)
-		assert(xml_file.is_loaded())
+		store: EdgeDataStore = EdgeDataStore(self.options.data_path)
+		assert(store.is_loaded())
 		to_time = to_time if to_time is not None else float("inf")
 		if from_time < 0:
 			print(f"Intervals from data file cannot start at time: {from_time} < 0 !")
@@ -426,24 +429,19 @@ class GravClustering:
 		elif from_time > to_time:
 			print(f"Time interval has to be in the form <from, to>, but from: {from_time} > to: {to_time} !")
 			return None
-		elif xml_file.root.find("interval") is None:
+		intervals: np.ndarray = store.get_intervals(from_time, to_time)
+		if len(intervals) == 0:
 			print("Cannot find element 'interval' in data file!")
 			return None
-		# Edge_id : CongestionIndex
-		ci_map: Dict[str, float] = {edge_id: 0 for edge_id in self.graph.road_network.edges}
-		n_intervals: int = 0
-		for interval in xml_file.root.findall("interval"):
-			if float(interval.attrib["begin"]) < from_time:
-				continue
-			elif float(interval.attrib["end"]) > to_time:
-				break
-			n_intervals += 1
-			for edge in interval.findall("edge"):
-				if edge.attrib["id"] not in ci_map:
-					continue
-				ci_map[edge.attrib["id"]] += float(edge.attrib["congestionIndex"])
-		# Average the congestion indexes, increase to avoid 0-values and multiply
-		return ((np.array(list(ci_map.values())) / n_intervals) + 0.001) * multiplier
+		# Intervals x edges of graph (values of edges missing in interval are NaN)
+		values: Optional[np.ndarray] = store.get_values(
+			"congestionIndex", self.graph.road_network.edges.keys(), intervals
+		)
+		if values is None:
+			print(f"Data file: {self.options.data_path} is missing attribute 'congestionIndex' !")
+			return None
+		# Average the congestion indexes (missing are counted as 0), increase to avoid 0-values and multiply
+		return ((np.nansum(values, axis=0, dtype=np.float64) / len(intervals)) + 0.001) * multiplier
 
 	def choose_clusters(self, size: int = 200) -> Dict[int, List[int]]:
 		"""
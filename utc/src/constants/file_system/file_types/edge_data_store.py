@@ -0,0 +1,226 @@
+from utc.src.constants.static import FileExtension
+from utc.src.constants.file_system.my_file import MyFile
+import xml.etree.ElementTree as ET
+from xml.etree.ElementTree import ParseError
+from os.path import getmtime
+import numpy as np
+from typing import Optional, Dict, List, Tuple, Iterable
+
+
+class EdgeDataStore(MyFile):
+    """
+    Class representing columnar store (".npz") of edge dump file, which is converted by single
+    streaming pass over the dump, each numeric attribute of edges is stored as array indexed
+    by (interval, edge), missing values are NaN. Store is placed next to the edge dump and is
+    converted again if the dump is newer (attributes computed only in store, e.g. congestion
+    index, are kept).
+    """
+    def __init__(self, file_path: str):
+        """
+        :param file_path: path to edge dump file (".out.xml"), or directly to its store (".npz")
+        """
+        self.edges: Dict[str, int] = {}
+        self.begin: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.end: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.attributes: Dict[str, Optional[np.ndarray]] = {}
+        self.data: Optional[np.lib.npyio.NpzFile] = None
+        super().__init__(file_path, "r", FileExtension.NPZ)
+
+    # ------------------------------------------- Load & Save -------------------------------------------
+
+    def load(self, file_path: str) -> bool:
+        dump_path: str = ""
+        if file_path.endswith(FileExtension.EDGE_DUMP):
+            dump_path, file_path = file_path, file_path[:-len(FileExtension.EDGE_DUMP)] + FileExtension.NPZ
+        super().load(file_path)
+        if dump_path and MyFile.file_exists(dump_path) and (
+                not MyFile.file_exists(self.file_path, message=False) or getmtime(dump_path) > getmtime(self.file_path)
+                ):
+            previous: Optional[EdgeDataStore] = None
+            if MyFile.file_exists(self.file_path, message=False):
+                previous = EdgeDataStore(self.file_path)
+            if not self.convert(dump_path):
+                return False
+            elif previous is not None:
+                self.keep_attributes(previous)
+                previous.close()
+            return self.save()
+        elif not MyFile.file_exists(self.file_path):
+            return False
+        self.close()
+        try:
+            self.data = np.load(self.file_path)
+            self.edges = {str(edge_id): index for index, edge_id in enumerate(self.data["edges"])}
+            self.begin, self.end = self.data["begin"], self.data["end"]
+            # Attributes are loaded once they are needed
+            self.attributes = dict.fromkeys(str(attribute) for attribute in self.data["attributes"])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error: '{e}' while loading edge data store: '{self.file_path}'!")
+            self.close()
+            return False
+        return True
+
+    def save(self, file_path: str = "default") -> bool:
+        file_path = (self.file_path if file_path == "default" else file_path)
+        if not file_path.endswith(FileExtension.NPZ):
+            print(f"Expected: '{FileExtension.NPZ}' for edge data store, got: '{file_path}' !")
+            return False
+        arrays: Dict[str, np.ndarray] = {
+            f"attribute_{attribute}": self.get_attribute(attribute) for attribute in self.attributes
+        }
+        # All attributes are loaded, file can be overwritten
+        self.close()
+        try:
+            # Not compressed, since stores are loaded repeatedly
+            np.savez(
+                file_path, edges=np.array(list(self.edges), dtype=str), begin=self.begin, end=self.end,
+                attributes=np.array(list(self.attributes), dtype=str), **arrays
+            )
+        except OSError as e:
+            print(f"Error: '{e}' while saving edge data store to: '{file_path}'!")
+            return False
+        print(f"Saved edge data store: '{file_path}'")
+        return True
+
+    def convert(self, dump_path: str) -> bool:
+        """
+        :param dump_path: path to edge dump file, which is streamed into columns (intervals are parsed one by one)
+        :return: True on success, False otherwise
+        """
+        print(f"Converting edge dump: '{dump_path}' to edge data store")
+        self.close()
+        edges: Dict[str, int] = {}
+        intervals: List[Tuple[float, float]] = []
+        # Attribute -> values of intervals (indexes of edges, values)
+        columns: Dict[str, List[Tuple[List[int], List[float]]]] = {}
+        try:
+            for _, element in ET.iterparse(dump_path, events=("end",)):
+                if element.tag != "interval":
+                    continue
+                rows: Dict[str, Tuple[List[int], List[float]]] = {}
+                for edge in element.iter("edge"):
+                    index: int = edges.setdefault(edge.attrib["id"], len(edges))
+                    for attribute, value in edge.attrib.items():
+                        if attribute == "id":
+                            continue
+                        try:
+                            value = float(value)
+                        except ValueError:
+                            continue
+                        row: Tuple[List[int], List[float]] = rows.setdefault(attribute, ([], []))
+                        row[0].append(index)
+                        row[1].append(value)
+                for attribute, row in rows.items():
+                    columns.setdefault(attribute, [([], [])] * len(intervals)).append(row)
+                for column in columns.values():
+                    if len(column) == len(intervals):
+                        column.append(([], []))
+                intervals.append((float(element.attrib["begin"]), float(element.attrib["end"])))
+                element.clear()
+        except (OSError, ParseError) as e:
+            print(f"Error: '{e}' while converting edge dump: '{dump_path}'!")
+            return False
+        self.edges = edges
+        self.begin = np.array([begin for begin, _ in intervals], dtype=np.float64)
+        self.end = np.array([end for _, end in intervals], dtype=np.float64)
+        self.attributes = {}
+        for attribute, column in columns.items():
+            values: np.ndarray = np.full((len(intervals), len(edges)), np.nan, dtype=np.float32)
+            for interval, (indexes, row) in enumerate(column):
+                values[interval, indexes] = row
+            self.attributes[attribute] = values
+        print(f"Converted: {len(intervals)} intervals, {len(edges)} edges, {len(self.attributes)} attributes")
+        return True
+
+    def keep_attributes(self, store: 'EdgeDataStore') -> None:
+        """
+        Copies attributes of other store, which are not present in this one (i.e. they were not
+        converted from edge dump, but computed), values are matched by edge id's and intervals
+
+        :param store: previous store of edge dump
+        :return: None
+        """
+        kept: List[str] = [attribute for attribute in store.attributes if attribute not in self.attributes]
+        if not kept:
+            return
+        # Indexes of shared edges and intervals (in this store, in the other store)
+        edges: np.ndarray = np.array([
+            (index, store.edges[edge_id]) for edge_id, index in self.edges.items() if edge_id in store.edges
+        ], dtype=np.int64).reshape(-1, 2)
+        previous_intervals: Dict[Tuple[float, float], int] = {
+            interval: index for index, interval in enumerate(zip(store.begin.tolist(), store.end.tolist()))
+        }
+        intervals: np.ndarray = np.array([
+            (index, previous_intervals[interval])
+            for index, interval in enumerate(zip(self.begin.tolist(), self.end.tolist()))
+            if interval in previous_intervals
+        ], dtype=np.int64).reshape(-1, 2)
+        for attribute in kept:
+            values: np.ndarray = np.full((len(self.begin), len(self.edges)), np.nan, dtype=np.float32)
+            previous: np.ndarray = store.get_attribute(attribute)
+            values[np.ix_(intervals[:, 0], edges[:, 0])] = previous[np.ix_(intervals[:, 1], edges[:, 1])]
+            self.attributes[attribute] = values
+        print(f"Kept attributes: {kept} of previous edge data store (computed from previous edge dump)")
+        return
+
+    # ------------------------------------------- Getters -------------------------------------------
+
+    def get_intervals(self, from_time: float = 0, to_time: float = float("inf")) -> np.ndarray:
+        """
+        :param from_time: starting time of window (seconds)
+        :param to_time: ending time of window (seconds)
+        :return: Indexes of intervals, which are inside of window
+        """
+        return np.flatnonzero((self.begin >= from_time) & (self.end <= to_time))
+
+    def get_attribute(self, attribute: str) -> Optional[np.ndarray]:
+        """
+        :param attribute: name of edge attribute
+        :return: Values of attribute (intervals x edges), None if attribute is not present
+        """
+        if attribute not in self.attributes:
+            return None
+        elif self.attributes[attribute] is None:
+            self.attributes[attribute] = self.data[f"attribute_{attribute}"]
+        return self.attributes[attribute]
+
+    def get_values(
+            self, attribute: str, edge_ids: Iterable[str], intervals: Optional[np.ndarray] = None
+        ) -> Optional[np.ndarray]:
+        """
+        :param attribute: name of edge attribute
+        :param edge_ids: id's of edges (edges not present in store have NaN values)
+        :param intervals: indexes of intervals, all if not given
+        :return: Values of attribute (intervals x edges), None if attribute is not present
+        """
+        values: Optional[np.ndarray] = self.get_attribute(attribute)
+        if values is None:
+            return None
+        indexes: np.ndarray = np.fromiter((self.edges.get(edge_id, -1) for edge_id in edge_ids), dtype=np.int64)
+        if intervals is not None:
+            values = values[intervals]
+        # Extra column of NaN for unknown edges
+        values = np.concatenate((values, np.full((values.shape[0], 1), np.nan, dtype=values.dtype)), axis=1)
+        return values[:, indexes]
+
+    def set_attribute(self, attribute: str, values: np.ndarray) -> None:
+        """
+        :param attribute: name of edge attribute
+        :param values: of attribute (intervals x edges)
+        :return: None
+        """
+        assert(values.shape == (len(self.begin), len(self.edges)))
+        self.attributes[attribute] = values.astype(np.float32)
+
+    # ------------------------------------------- Utils -------------------------------------------
+
+    def close(self) -> None:
+        """
+        :return: None
+        """
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    def is_loaded(self) -> bool:
+        return len(self.begin) != 0 or bool(self.edges)
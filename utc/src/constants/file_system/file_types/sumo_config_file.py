@@ -42,10 +42,11 @@ class SumoConfigFile(XmlFile):
 
     def set_routes_file(self, routes_path: str) -> bool:
         """
-        :param routes_path: path of routes file ('.rou.xml')
+        :param routes_path: path of routes file ('.rou.xml', can be compressed '.rou.xml.gz')
         :return: True on success, false otherwise
         """
-        if self.get_file_name(routes_path) == routes_path or not (routes_path.endswith(FileExtension.SUMO_ROUTES)):
+        extensions: tuple = (FileExtension.SUMO_ROUTES, FileExtension.SUMO_ROUTES + FileExtension.GZ)
+        if self.get_file_name(routes_path) == routes_path or not (routes_path.endswith(extensions)):
             print(f"Error, expected full routes path, got: '{routes_path}'")
             return False
         self.set_additional_file(routes_path)
@@ -155,7 +156,7 @@ class SumoConfigFile(XmlFile):
         routes_path: str = ""
         # Find route file in additional files
         for file_path in self.get_additional_files():
-            if file_path.endswith(FileExtension.SUMO_ROUTES):
+            if file_path.endswith((FileExtension.SUMO_ROUTES, FileExtension.SUMO_ROUTES + FileExtension.GZ)):
                 routes_path = file_path
                 break
         # Unable to find
@@ -1,4 +1,5 @@
 from utc.src.constants.file_system.file_types.xml_file import XmlFile, Element
+from utc.src.constants.file_system.file_types.xml_stream_writer import XmlStreamWriter
 from utc.src.constants.static import FileExtension, FilePaths
 from typing import Optional, Dict, List
 
@@ -19,9 +20,14 @@ class SumoRoutesFile(XmlFile):
         self.route_map: Dict[str, str] = {}
         # Counter for new route ids
         self.route_counter: int = 0
+        # Writer of routes, if file is streamed (routes are not kept in memory)
+        self.writer: Optional[XmlStreamWriter] = None
 
     def save(self, file_path: str = "default") -> bool:
-        if file_path == "default" and self.file_path == FilePaths.XmlTemplates.SUMO_ROUTES:
+        # Streamed file is finished by closing the stream
+        if self.writer is not None:
+            return self.close_stream()
+        elif file_path == "default" and self.file_path == FilePaths.XmlTemplates.SUMO_ROUTES:
             print(f"Cannot overwrite template for 'routes' file!")
             return False
         self.route_map.clear()
@@ -42,14 +48,14 @@ class SumoRoutesFile(XmlFile):
         elif not self.check_route(route):
             return None
         elif not re_index:
-            self.root.append(route)
+            self.append(route)
             return None
         # Record and add new route
         elif route.attrib["edges"] not in self.route_map:
             self.route_map[route.attrib["edges"]] = f"r{self.route_counter}"
             route.attrib["id"] = f"r{self.route_counter}"
             self.route_counter += 1
-            self.root.append(route)
+            self.append(route)
         return self.route_map[route.attrib["edges"]]
 
     def add_routes(self, routes: List[Element], re_index: bool = True) -> Optional[Dict[str, str]]:
@@ -65,6 +71,63 @@ class SumoRoutesFile(XmlFile):
             return None
         return {route.attrib["id"]: self.add_route(route, re_index) for route in routes}
 
+    def append(self, route: Element) -> None:
+        """
+        :param route: checked route, which is written to stream (if file is streamed), or added to root
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.write(route)
+            return
+        self.root.append(route)
+
+    # ------------------------------------------ Stream ------------------------------------------
+
+    def stream(self, file_path: str, compress: bool = False) -> bool:
+        """
+        Starts streaming of file, routes added from now on are written directly to
+        the given file (routes currently present in file are written first)
+
+        :param file_path: path to new '.rou.xml' file
+        :param compress: True if file should be compressed by gzip
+        :return: True on success, False otherwise
+        """
+        if self.writer is not None:
+            print(f"Routes file is already streamed to: '{self.writer.file_path}'!")
+            return False
+        elif self.root is None:
+            print(f"Error cannot stream file: {file_path}, 'root' of xml file is of type: 'None' !")
+            return False
+        elif not file_path.endswith((self.extension, self.extension + FileExtension.GZ)):
+            print(f"Expected default extension: '{self.extension}', got: '{file_path}' !")
+            return False
+        writer: XmlStreamWriter = XmlStreamWriter(file_path, self.root, compress)
+        if not writer.open():
+            return False
+        # Written routes are no longer needed
+        for route in self.root.findall("route"):
+            self.root.remove(route)
+        self.writer = writer
+        return True
+
+    def close_stream(self) -> bool:
+        """
+        :return: True if stream was finished successfully, False otherwise
+        """
+        if self.writer is None:
+            return False
+        print(f"Finished streaming of: {self.writer.count} routes to: '{self.writer.file_path}'")
+        success: bool = self.writer.close()
+        self.writer = None
+        self.route_map.clear()
+        return success
+
+    def get_stream_path(self) -> str:
+        """
+        :return: Path to file, to which routes are streamed (empty if file is not streamed)
+        """
+        return "" if self.writer is None else self.writer.file_path
+
     # ------------------------------------------ Utils  ------------------------------------------
 
     def check_route(self, route: Element) -> bool:
@@ -1,6 +1,8 @@
 from utc.src.constants.file_system.file_types.xml_file import XmlFile, Element
+from utc.src.constants.file_system.file_types.xml_stream_writer import XmlStreamWriter
 from utc.src.constants.static import FileExtension, FilePaths
-from typing import List
+import heapq
+from typing import List, Tuple, Optional
 
 
 class SumoVehiclesFile(XmlFile):
@@ -13,10 +15,18 @@ class SumoVehiclesFile(XmlFile):
         directory 'utc/data/scenarios/name/additional' will be search for corresponding file),
         default is template of ".rou.xml" file
         """
+        # Writer of vehicles, if file is streamed (vehicles are kept in memory only until they are written)
+        self.writer: Optional[XmlStreamWriter] = None
+        # Vehicles waiting to be written, ordered by departure (depart, order of addition, vehicle)
+        self.buffer: List[Tuple[float, int, Element]] = []
+        self.counter: int = 0
         super().__init__(file_path, extension=FileExtension.SUMO_ADDITIONAL)
 
     def save(self, file_path: str = "default") -> bool:
-        if not self.check_file():
+        # Streamed file is finished by closing the stream
+        if self.writer is not None:
+            return self.close_stream()
+        elif not self.check_file():
             return False
         elif file_path == "default" and self.file_path == FilePaths.XmlTemplates.SUMO_VEHICLE:
             print("Cannot overwrite template for 'vehicles' file!")
@@ -36,7 +46,7 @@ class SumoVehiclesFile(XmlFile):
             return False
         elif not self.check_vehicle(vehicle):
             return False
-        self.root.append(vehicle)
+        self.append(vehicle)
         return True
 
     def add_vehicles(self, vehicles: List[Element]) -> bool:
@@ -50,9 +60,83 @@ class SumoVehiclesFile(XmlFile):
             return False
         elif not all([self.check_vehicle(vehicle) for vehicle in vehicles]):
             return False
-        [self.root.append(vehicle) for vehicle in vehicles]
+        [self.append(vehicle) for vehicle in vehicles]
+        return True
+
+    def append(self, vehicle: Element) -> None:
+        """
+        :param vehicle: checked vehicle, which is buffered (if file is streamed), or added to root
+        :return: None
+        """
+        if self.writer is not None:
+            heapq.heappush(self.buffer, (float(vehicle.attrib.get("depart", 0)), self.counter, vehicle))
+            self.counter += 1
+            return
+        self.root.append(vehicle)
+
+    # ------------------------------------------ Stream ------------------------------------------
+
+    def stream(self, file_path: str, compress: bool = False) -> bool:
+        """
+        Starts streaming of file, vehicles added from now on are buffered and written
+        to the given file in order of their departure, once they are flushed (vehicles
+        currently present in file, along with vTypes, are written first)
+
+        :param file_path: path to new vehicles file
+        :param compress: True if file should be compressed by gzip
+        :return: True on success, False otherwise
+        """
+        if self.writer is not None:
+            print(f"Vehicles file is already streamed to: '{self.writer.file_path}'!")
+            return False
+        elif not self.check_file():
+            return False
+        elif not file_path.endswith((self.extension, self.extension + FileExtension.GZ)):
+            print(f"Expected default extension: '{self.extension}', got: '{file_path}' !")
+            return False
+        writer: XmlStreamWriter = XmlStreamWriter(file_path, self.root, compress)
+        if not writer.open():
+            return False
+        # Written vehicles are no longer needed
+        for vehicle in self.root.findall("vehicle"):
+            self.root.remove(vehicle)
+        self.writer = writer
         return True
 
+    def flush(self, until: float = float("inf")) -> bool:
+        """
+        :param until: time (seconds), vehicles departing before (or at) it are written,
+        caller guarantees that vehicles departing before this time are no longer added
+        :return: True on success (or if file is not streamed), False otherwise
+        """
+        if self.writer is None:
+            return True
+        while self.buffer and self.buffer[0][0] <= until:
+            if not self.writer.write(heapq.heappop(self.buffer)[2]):
+                return False
+        return True
+
+    def close_stream(self) -> bool:
+        """
+        Writes all remaining vehicles and closes the stream
+
+        :return: True if stream was finished successfully, False otherwise
+        """
+        if self.writer is None:
+            return False
+        success: bool = self.flush()
+        print(f"Finished streaming of: {self.writer.count} vehicles to: '{self.writer.file_path}'")
+        success &= self.writer.close()
+        self.writer = None
+        self.buffer.clear()
+        return success
+
+    def get_stream_path(self) -> str:
+        """
+        :return: Path to file, to which vehicles are streamed (empty if file is not streamed)
+        """
+        return "" if self.writer is None else self.writer.file_path
+
     # ------------------------------------------ Getters ------------------------------------------
 
     def get_start_time(self) -> float:
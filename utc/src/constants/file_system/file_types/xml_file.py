@@ -1,6 +1,8 @@
 from utc.src.constants.file_system.my_file import MyFile
+from utc.src.constants.static import FileExtension
 import xml.etree.ElementTree as ET
 from xml.etree.ElementTree import Element, ElementTree, ParseError
+import gzip
 from typing import Optional, List, Set
 
 
@@ -19,9 +21,13 @@ class XmlFile(MyFile):
             print(f"Unable to initialize XML file: '{self.file_path}', file does not exist!")
             return False
         try:  # Check for parsing error
-            self.tree = ET.parse(self.file_path)
+            if self.file_path.endswith(FileExtension.GZ):
+                with gzip.open(self.file_path, "rb") as file:
+                    self.tree = ET.parse(file)
+            else:
+                self.tree = ET.parse(self.file_path)
             self.root = self.tree.getroot()
-        except ParseError as e:
+        except (ParseError, OSError) as e:
             print(
                 f"Unable to parse xml file: {self.file_path}\n"
                 f" got error: '{e}'\n, be sure the file is actually of type 'xml'!"
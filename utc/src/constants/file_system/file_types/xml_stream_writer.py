@@ -0,0 +1,113 @@
+from utc.src.constants.static import FileExtension
+import xml.etree.ElementTree as ET
+from xml.etree.ElementTree import Element
+import gzip
+from io import TextIOWrapper
+from typing import Optional
+
+
+class XmlStreamWriter:
+    """
+    Class writing xml file incrementally, elements are serialized to file once they are written
+    (and can be freed afterwards), root element is closed when writer is closed, file is
+    compressed by gzip, if requested (or if path ends with ".gz").
+    """
+    def __init__(self, file_path: str, root: Element, compress: bool = False):
+        """
+        :param file_path: path to file, which is (over)written
+        :param root: element whose tag and attributes are used for root of file,
+        its children (e.g. vTypes) are written first
+        :param compress: True if file should be compressed by gzip (".gz" is appended to path)
+        """
+        if compress and not file_path.endswith(FileExtension.GZ):
+            file_path += FileExtension.GZ
+        self.file_path: str = file_path
+        self.root: Element = root
+        self.file: Optional[TextIOWrapper] = None
+        # Number of written elements (excluding root and its children)
+        self.count: int = 0
+
+    def open(self) -> bool:
+        """
+        :return: True on success, False otherwise
+        """
+        if self.is_open():
+            print(f"Xml stream: '{self.file_path}' is already opened!")
+            return False
+        shell: Element = Element(self.root.tag, self.root.attrib)
+        opening: str = ET.tostring(shell, encoding="unicode", short_empty_elements=False)
+        try:
+            if self.file_path.endswith(FileExtension.GZ):
+                self.file = gzip.open(self.file_path, "wt", encoding="utf-8")
+            else:
+                self.file = open(self.file_path, "w", encoding="utf-8")
+            self.file.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            self.file.write(opening[:-len(f"</{self.root.tag}>")] + "\n")
+        except OSError as e:
+            print(f"Unable to open xml stream: '{self.file_path}', got error: {e} !")
+            self.file = None
+            return False
+        for child in self.root:
+            if not self.write(child):
+                return False
+        self.count = 0
+        return True
+
+    def write(self, element: Element) -> bool:
+        """
+        :param element: to be written as child of root element
+        :return: True on success, False otherwise
+        """
+        if not self.is_open():
+            print(f"Cannot write to xml stream: '{self.file_path}', stream is not opened!")
+            return False
+        tail: Optional[str] = element.tail
+        element.tail = None
+        ET.indent(element, space="\t", level=1)
+        try:
+            self.file.write("\t" + ET.tostring(element, encoding="unicode") + "\n")
+        except OSError as e:
+            print(f"Unable to write to xml stream: '{self.file_path}', got error: {e} !")
+            return False
+        finally:
+            element.tail = tail
+        self.count += 1
+        return True
+
+    def close(self) -> bool:
+        """
+        Closes root element and the file
+
+        :return: True on success, False otherwise
+        """
+        if not self.is_open():
+            return False
+        try:
+            self.file.write(f"</{self.root.tag}>")
+            self.file.close()
+        except OSError as e:
+            print(f"Unable to close xml stream: '{self.file_path}', got error: {e} !")
+            return False
+        finally:
+            self.file = None
+        return True
+
+    def is_open(self) -> bool:
+        """
+        :return: True if file is opened for writing, False otherwise
+        """
+        return self.file is not None
+
+    # ------------------------------------------ Magic methods ------------------------------------------
+
+    def __enter__(self) -> Optional['XmlStreamWriter']:
+        """
+        :return: self, None if file could not be opened
+        """
+        return self if self.open() else None
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """
+        :return: None
+        """
+        self.close()
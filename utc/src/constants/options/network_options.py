@@ -7,11 +7,25 @@ class TopkaOptions(Options):
     """ Data class for TopKA* algorithm options """
     c: float = 1.3
     k: int = 3000
+    heuristic: str = "euclidean"  # Estimate of distance to target (euclidean, landmarks, tree)
+    landmarks: int = 16  # Number of landmarks (used by 'landmarks' heuristic)
 
     def validate_options(self) -> bool:
         return self.validate_data(asdict(self), "TopkaOptions")
 
 
+@dataclass
+class PenaltyOptions(Options):
+    """ Data class for penalty method (diverse alternative routes) options """
+    k: int = 10
+    penalty: float = 1.4
+    max_similarity: float = 0.7
+    attempts: int = 30
+
+    def validate_options(self) -> bool:
+        return self.validate_data(asdict(self), "PenaltyOptions")
+
+
 @dataclass
 class DbscanOptions(Options):
     """ Data class for DBSCAN algorithm information options """
@@ -27,12 +41,21 @@ class DbscanOptions(Options):
 
 @dataclass
 class NetworkOptions(Options):
-    """ Data class for road network options (includes simplifying, TopKA*, DBSCAN) """
+    """ Data class for road network options (includes simplifying, TopKA*, DBSCAN, penalty method) """
     simplify: bool = True
     topka: TopkaOptions = None
     dbscan: DbscanOptions = None
+    # Generator of alternative routes, either 'topka' (TopKA* + DBSCAN) or 'penalty' (penalty method)
+    alternatives: str = "topka"
+    penalty: PenaltyOptions = None
 
     def validate_options(self) -> bool:
+        if self.alternatives not in ("topka", "penalty"):
+            print(f"Invalid generator of alternative routes: '{self.alternatives}', expected 'topka' or 'penalty'!")
+            return False
+        elif self.alternatives == "penalty" and self.penalty is None:
+            print("Options of penalty method are missing!")
+            return False
         return isinstance(self.simplify, bool) and None not in (self.topka, self.dbscan)
 
 
@@ -8,6 +8,8 @@ class FileExtension:
     XML: str = ".xml"
     JSON: str = ".json"
     CSV: str = ".csv"
+    NPZ: str = ".npz"
+    GZ: str = ".gz"  # Compressed files (e.g. ".rou.xml.gz")
     LOG: str = ".log"
     # ------- Simulation & Scenarios -------
     SUMO_ROUTES: str = ".rou.xml"  # Files containing vehicle routes
@@ -51,6 +53,7 @@ class DirPaths:
     # Domain & planners
     PDDL_DOMAINS: str = (CWD + "/data/domains")
     PDDL_PLANNERS: str = (CWD + "/data/planners/{0}")
+    PDDL_PLANS: str = (CWD + "/data/plans")  # Store of previously found plans
     # Templates
     XML_TEMPLATES: str = (CWD + "/data/templates/xml")
     JSON_TEMPLATES: str = (CWD + "/data/templates/json")
@@ -87,6 +90,8 @@ class FilePaths:
     MAP_OSM: str = (DirPaths.MAPS_OSM + "/{0}" + FileExtension.OSM)
     # Path to '.net.xml' file map for SUMO
     MAP_SUMO: str = (DirPaths.MAPS_SUMO + "/{0}" + FileExtension.SUMO_NETWORK)
+    # Path to pre-computed landmarks (distances) of '.net.xml' map
+    MAP_LANDMARKS: str = (DirPaths.MAPS_SUMO + "/{0}_landmarks" + FileExtension.NPZ)
     # --------------------------------------  Pddl --------------------------------------
     PDDL_DOMAIN: str = (DirPaths.PDDL_DOMAINS + "/{0}" + FileExtension.PDDL)
     # Path scenarios specific pddl problem file
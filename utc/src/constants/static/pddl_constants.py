@@ -1,5 +1,5 @@
 from utc.src.constants.static.file_constants import DirPaths
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Optional
 
 # ---------------------------------- Extension ----------------------------------
 
@@ -21,6 +21,8 @@ class NetworkCapacity:
     LIGHT_CAPACITY_MULTIPLIER: float = 1
     MEDIUM_CAPACITY_MULTIPLIER: float = 10
     HEAVY_CAPACITY_MULTIPLIER: float = 100
+    # Cost of driving on congested road (as defined in pddl domains)
+    CONGESTED_COST: int = 100000
 
     @staticmethod
     def calculate_threshold(capacity: int) -> Dict[str, int]:
@@ -49,14 +51,55 @@ class NetworkCapacity:
         return ret_val
 
 
+# ---------------------------------- Planning cost ----------------------------------
+
+class PlanningCost:
+    """
+    Coefficients of linear model estimating planning time (seconds) of pddl problems,
+    from the number of vehicles, routes (size of sub-graph) and allowed predicates,
+    used when coefficients are not fitted from previous planning (see WindowScheduler.fit_cost).
+    """
+    VEHICLE: float = 0.05
+    ROUTE: float = 0.002
+    ALLOWED: float = 0.0005
+    # Fraction of planner timeout, which estimated planning time should not surpass
+    BUDGET: float = 0.5
+
+    @staticmethod
+    def estimate(
+            vehicles: float, routes: float, allowed: float,
+            coefficients: Optional[Tuple[float, float, float]] = None
+        ) -> float:
+        """
+        :param vehicles: number of vehicles scheduled for planning
+        :param routes: number of routes in network (sub-graph)
+        :param allowed: number of allowed predicates (summed sizes of vehicles sub-graphs)
+        :param coefficients: of vehicles, routes and allowed predicates, default ones if None
+        :return: Estimated planning time in seconds
+        """
+        if coefficients is None:
+            coefficients = (PlanningCost.VEHICLE, PlanningCost.ROUTE, PlanningCost.ALLOWED)
+        return vehicles * coefficients[0] + routes * coefficients[1] + allowed * coefficients[2]
+
+
 # ---------------------------------- Planners ----------------------------------
 
 class PLANNERS:
     """
     Class defining planner calls as format string (expected
-    arguments are "domain_file.pddl" "problem_file.pddl" "result_file.pddl")
+    arguments are "domain_file.pddl" "problem_file.pddl" "result_file.pddl"),
+    planners have to end each plan with cost comment ('; cost = X')
     """
     MERCURY: str = (DirPaths.PDDL_PLANNERS.format("Mercury/plan-utc") + " {0} {1} {2}")
+    # Fast Downward configurations: anytime LAMA (plans are numbered) and its first found plan
+    LAMA: str = (
+        DirPaths.PDDL_PLANNERS.format("FastDownward/fast-downward.py") +
+        " --alias seq-sat-lama-2011 --plan-file {2} {0} {1}"
+    )
+    LAMA_FIRST: str = (
+        DirPaths.PDDL_PLANNERS.format("FastDownward/fast-downward.py") +
+        " --alias lama-first --plan-file {2} {0} {1}"
+    )
 
     @staticmethod
     def get_planner(planner_name: str) -> str:
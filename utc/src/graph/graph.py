@@ -1,5 +1,6 @@
-from utc.src.graph.network import RoadNetwork
+from utc.src.graph.network import RoadNetwork, NetworkDiff
 from utc.src.graph.modules import GraphModule, Loader, Simplify, PathFinder, Display, SubGraph, Control
+from typing import Optional, Set
 
 
 class Graph(GraphModule):
@@ -27,6 +28,56 @@ class Graph(GraphModule):
         self.sub_graph.set_network(self.road_network)
         self.control.set_network(self.road_network)
 
+    def reload(self, network_path: str = "") -> bool:
+        """
+        Loads map of road network again (e.g. after it was edited), only differences
+        against the current network are applied (see 'patch').
+
+        :param network_path: path to network file, by default the last loaded map
+        :return: True on success, False otherwise
+        """
+        if not network_path and not self.loader.network_path:
+            print("Unable to reload graph, no map was loaded!")
+            return False
+        network_path = network_path or self.loader.network_path
+        graph: Graph = Graph(RoadNetwork())
+        if not graph.loader.load_map(network_path):
+            print(f"Unable to reload graph from map: '{network_path}'!")
+            return False
+        diff: Optional[NetworkDiff] = self.road_network.diff(graph.road_network)
+        if diff is None:
+            return False
+        elif diff.is_empty():
+            return True
+        print(diff.info())
+        if not self.patch(diff):
+            return False
+        self.loader.network_path = graph.loader.network_path
+        return True
+
+    def patch(self, diff: NetworkDiff) -> bool:
+        """
+        Applies differences to road network in place, invalidates only data of modules depending on changed routes.
+        Data keyed by fingerprint of network (geometry of display, sub-graphs of NetworkBuilder, stored plans)
+        are no longer used once it changes.
+
+        :param diff: differences computed against road network of graph
+        :return: True on success, False otherwise
+        """
+        routes: Optional[Set[int]] = self.road_network.patch(diff)
+        if routes is None:
+            return False
+        self.path_finder.invalidate(routes)
+        if diff.modified_edges or diff.added_edges or diff.removed_edges:
+            self.display.clear_geometry()
+        return True
+
+    def get_fingerprint(self) -> str:
+        """
+        :return: Digest of graph's road network structure (equal networks share the digest)
+        """
+        return self.road_network.get_fingerprint()
+
 
 # # For testing purposes
 if __name__ == '__main__':
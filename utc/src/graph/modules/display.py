@@ -2,11 +2,14 @@ from utc.src.graph.modules.graph_module import GraphModule
 from utc.src.constants.static.graph_attributes import NodeAttributes, EdgeAttributes
 from utc.src.constants.static.colors import GraphColors
 from utc.src.graph.network import RoadNetwork, Edge, Route, Junction
+from utc.src.utils.task_manager import TaskManager
 from matplotlib import pyplot as plt
 from matplotlib.collections import LineCollection, CircleCollection
-from matplotlib.colors import is_color_like
+from matplotlib.colors import is_color_like, to_rgba_array
+import numpy as np
 from numpy import ndarray
-from typing import List, Set, Tuple, Union, Optional
+from weakref import WeakKeyDictionary
+from typing import Dict, List, Set, Tuple, Union, Optional
 
 
 class Display(GraphModule):
@@ -14,6 +17,20 @@ class Display(GraphModule):
 
     def __init__(self, road_network: RoadNetwork):
         super().__init__(road_network)
+        # Cached shapes of lanes (of all edges), keyed by level of detail (tolerance of simplification)
+        self.geometry: Dict[float, List[ndarray]] = {}
+        # Index of edge (in order of network edges) for each lane in geometry
+        self.lane_edges: Optional[ndarray] = None
+        # Edge id -> range of its lanes in geometry
+        self.edge_lanes: Dict[str, Tuple[int, int]] = {}
+        # Rendered collections (of zoomed view) -> indexes of their lanes in geometry
+        self.visible_lanes: WeakKeyDictionary = WeakKeyDictionary()
+        # Fingerprint of network when geometry was cached
+        self.fingerprint: str = ""
+
+    def set_network(self, road_network: RoadNetwork) -> None:
+        super().set_network(road_network)
+        self.clear_geometry()
 
     def initialize_plot(
             self, rows: int = 1, cols: int = 1,
@@ -29,19 +46,7 @@ class Display(GraphModule):
         :return: figure and axes (can be multiple)
         :raises: ValueError if rows or cols are less than 1
         """
-        # Check arguments
-        if rows < 1 or cols < 1:
-            raise ValueError(f"Rows: '{rows}' and cols: '{cols}' must be at least 1!")
-        fig_size = (fig_size[0] * rows, fig_size[1] * cols)
-        fig, ax = plt.subplots(nrows=rows, ncols=cols, figsize=fig_size)
-        # Check for multiple subplots
-        if rows > 1 or cols > 1:
-            for axes in ax.flatten():
-                axes.set_facecolor(background_color)
-        else:
-            ax.set_facecolor(background_color)
-        fig.canvas.manager.set_window_title(self.road_network.name if not title else title)
-        return fig, ax
+        return initialize_plot(rows, cols, fig_size, self.road_network.name if not title else title, background_color)
 
     # -------------------------------------------- Plotting --------------------------------------------
 
@@ -96,28 +101,36 @@ class Display(GraphModule):
         :param annotate: True if junctions should display their internal id, False by default (limited to 100)
         :return: None
         """
+        # Only junctions inside of zoomed view are rendered
+        view: Optional[Tuple[float, float, float, float]] = self.get_view(ax)
+        visible: Set[str] = set(
+            self.road_network.junctions.keys() if view is None else
+            self.road_network.get_spatial_index().junctions_in_bbox(view)
+        )
         if colored:
-            self.render_junctions(ax, self.road_network.get_inner_junctions())
+            self.render_junctions(ax, [
+                junction for junction in self.road_network.get_inner_junctions() if junction.id in visible
+            ])
             starting_junction: set = self.road_network.starting_junctions
             ending_junctions: set = self.road_network.ending_junctions
             common: set = (starting_junction & ending_junctions)
             starting_junction ^= common
             ending_junctions ^= common
             self.render_junctions(
-                ax, self.road_network.get_junctions(starting_junction),
+                ax, self.road_network.get_junctions(starting_junction & visible),
                 colors=GraphColors.JUNCTION_START_COLOR, annotate=annotate
             )
             self.render_junctions(
-                ax, self.road_network.get_junctions(ending_junctions),
+                ax, self.road_network.get_junctions(ending_junctions & visible),
                 colors=GraphColors.JUNCTION_END_COLOR, annotate=annotate
             )
             self.render_junctions(
-                ax, self.road_network.get_junctions(common),
+                ax, self.road_network.get_junctions(common & visible),
                 colors=GraphColors.JUNCTION_START_END_COLOR, annotate=annotate
             )
         else:
-            self.render_junctions(ax, self.road_network.get_junctions_list(), annotate=annotate)
-        self.render_edges(ax, list(self.road_network.edges.values()))
+            self.render_junctions(ax, self.road_network.get_junctions(visible), annotate=annotate)
+        self.render_network(ax)
         return
 
     # noinspection PyMethodMayBeStatic
@@ -212,6 +225,102 @@ class Display(GraphModule):
         ax.add_collection(LineCollection(shapes, linewidth=line_width, color=colors, linestyles=lines_style))
         return True
 
+    def render_network(
+            self, ax: plt.Axes, colors: Union[ndarray, List[str], str] = GraphColors.EDGE_COLOR,
+            line_width: int = EdgeAttributes.LANE_WIDTH,
+            lines_style: str = EdgeAttributes.LINES_STYLE,
+            lod: bool = True
+        ) -> Optional[LineCollection]:
+        """
+        Renders all edges of network as single collection from cached geometry, colors
+        of the returned collection can be changed by 'update_colors' (e.g. for each frame of animation).
+        If view of axes was set (zoomed), only edges overlapping it are rendered.
+
+        :param ax: plot axes
+        :param colors: of edges (one color, or color for each edge in order of network edges)
+        :param line_width: of edges (default 1)
+        :param lines_style: of edges (default 'solid')
+        :param lod: True if shapes should be simplified to the resolution of plot (default True)
+        :return: Collection of rendered lanes, None if error occurred
+        """
+        if ax is None:
+            print("Axes given for rendering network are of type 'None' !")
+            return None
+        elif not self.road_network.edges:
+            print("Network to be rendered has no edges!")
+            return None
+        geometry: List[ndarray] = self.get_geometry(self.get_tolerance(ax) if lod else 0.)
+        view: Optional[Tuple[float, float, float, float]] = self.get_view(ax)
+        lanes: Optional[ndarray] = None
+        if view is not None:
+            lanes = np.array([
+                lane for edge_id in self.road_network.get_spatial_index().edges_in_bbox(view, overlap=True)
+                for lane in range(*self.edge_lanes[edge_id])
+            ], dtype=np.int64)
+            geometry = [geometry[lane] for lane in lanes]
+        collection: LineCollection = LineCollection(geometry, linewidth=line_width, linestyles=lines_style)
+        if lanes is not None:
+            self.visible_lanes[collection] = lanes
+        if not self.update_colors(collection, colors):
+            return None
+        ax.add_collection(collection)
+        return collection
+
+    def update_colors(self, collection: LineCollection, colors: Union[ndarray, List[str], str]) -> bool:
+        """
+        :param collection: rendered by 'render_network'
+        :param colors: of edges (one color, or color for each edge in order of network edges)
+        :return: True on success, False otherwise
+        """
+        lane_colors: Optional[ndarray] = self.get_lane_colors(colors)
+        if lane_colors is None:
+            return False
+        elif collection in self.visible_lanes:
+            lane_colors = lane_colors[self.visible_lanes[collection]]
+        collection.set_color(lane_colors)
+        return True
+
+    def export_frames(
+            self, frames: List[Union[ndarray, List[str], str]], paths: List[str],
+            processes: int = 1, titles: Optional[List[str]] = None,
+            fig_size: Tuple[int, int] = (12, 8), background_color: str = "white",
+            line_width: int = EdgeAttributes.LANE_WIDTH
+        ) -> bool:
+        """
+        Saves images of network colored by each frame, frames are split between processes,
+        each process creates figure once and only changes colors of edges for each frame.
+
+        :param frames: colors of edges for each frame (one color, or color for each edge)
+        :param paths: file paths to which frames are saved
+        :param processes: number of processes (default 1)
+        :param titles: of frames (optional)
+        :param fig_size: of frames (tuple x, y)
+        :param background_color: of frames
+        :param line_width: of edges (default 1)
+        :return: True on success, False otherwise
+        """
+        if len(frames) != len(paths) or (titles is not None and len(titles) != len(frames)):
+            print(f"Number of frames: {len(frames)} must equal to number of paths: {len(paths)} (and titles)!")
+            return False
+        elif not frames:
+            return True
+        titles = ([""] * len(frames)) if titles is None else titles
+        lane_colors: List[Optional[ndarray]] = [self.get_lane_colors(colors) for colors in frames]
+        if any(colors is None for colors in lane_colors):
+            return False
+        # Shapes are simplified to the resolution of saved figure
+        width, height = np.ptp(np.concatenate(self.get_geometry()), axis=0)
+        tolerance: float = self.get_level(max(width / (fig_size[0] * 100), height / (fig_size[1] * 100)))
+        geometry: List[ndarray] = self.get_geometry(tolerance)
+        count: int = min(max(processes, 1), len(frames))
+        task_manager: TaskManager = TaskManager(count)
+        for index in range(count):
+            task_manager.tasks.append((render_frames, (
+                geometry, lane_colors[index::count], paths[index::count], titles[index::count],
+                fig_size, background_color, line_width
+            )))
+        return all(task_manager.start())
+
     def render_routes(
             self, ax: plt.Axes, routes: List[Route],
             colors: Union[List[str], str] = GraphColors.EDGE_COLOR,
@@ -231,6 +340,127 @@ class Display(GraphModule):
             route_edges |= set(route.get_edge_ids(False))
         return self.render_edges(ax, self.road_network.get_edges(route_edges), colors, line_width, lines_style)
 
+    # ------------------------------------------ Geometry ------------------------------------------
+
+    def get_geometry(self, tolerance: float = 0.) -> List[ndarray]:
+        """
+        :param tolerance: maximal distance of removed points of shapes from the simplified ones
+        (rounded down to power of 2, so that zoom levels share geometry), 0 for exact shapes
+        :return: Shapes of lanes of all edges (cached, until network changes)
+        """
+        if self.fingerprint != self.road_network.get_fingerprint():
+            self.clear_geometry()
+        if not self.geometry:
+            shapes: List[ndarray] = []
+            lane_edges: List[int] = []
+            for index, edge in enumerate(self.road_network.edges.values()):
+                self.edge_lanes[edge.id] = (len(shapes), len(shapes) + len(edge.lanes))
+                for lane_params in edge.lanes.values():
+                    shapes.append(np.asarray(lane_params["shape"], dtype=np.float64).reshape(-1, 2))
+                    lane_edges.append(index)
+            self.geometry[0.] = shapes
+            self.lane_edges = np.array(lane_edges, dtype=np.int64)
+            self.fingerprint = self.road_network.get_fingerprint()
+        tolerance = self.get_level(tolerance)
+        if tolerance not in self.geometry:
+            self.geometry[tolerance] = [self.simplify_shape(shape, tolerance) for shape in self.geometry[0.]]
+        return self.geometry[tolerance]
+
+    # noinspection PyMethodMayBeStatic
+    def get_view(self, ax: plt.Axes) -> Optional[Tuple[float, float, float, float]]:
+        """
+        :param ax: plot axes
+        :return: Bounding box (min_x, min_y, max_x, max_y) of current view of axes,
+        None if view was not set (axes are scaled automatically to the whole network)
+        """
+        if ax.get_autoscale_on():
+            return None
+        (min_x, max_x), (min_y, max_y) = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+        return min_x, min_y, max_x, max_y
+
+    def get_tolerance(self, ax: plt.Axes) -> float:
+        """
+        :param ax: plot axes
+        :return: Size of single pixel of plot (in coordinates of network), computed from current view
+        of axes if it was set (zoomed), otherwise from bounds of network
+        """
+        width_px, height_px = ax.get_window_extent().size
+        if not ax.get_autoscale_on():
+            width, height = np.ptp(ax.get_xlim()), np.ptp(ax.get_ylim())
+        else:
+            width, height = np.ptp(np.concatenate(self.get_geometry()), axis=0)
+        return max(width / max(width_px, 1.), height / max(height_px, 1.))
+
+    def get_lane_colors(self, colors: Union[ndarray, List[str], str]) -> Optional[ndarray]:
+        """
+        :param colors: of edges (one color, or color for each edge in order of network edges)
+        :return: RGBA colors of lanes in cached geometry, None if colors are invalid
+        """
+        self.get_geometry()
+        try:
+            rgba: ndarray = to_rgba_array(colors)
+        except ValueError as e:
+            print(f"Invalid colors: {e}")
+            return None
+        if len(rgba) == 1:
+            return np.repeat(rgba, len(self.lane_edges), axis=0)
+        elif len(rgba) != len(self.road_network.edges):
+            print(f"Number of colors: {len(rgba)}, must equal to edges: {len(self.road_network.edges)}")
+            return None
+        return rgba[self.lane_edges]
+
+    # noinspection PyMethodMayBeStatic
+    def get_level(self, tolerance: float) -> float:
+        """
+        :param tolerance: of shape simplification
+        :return: Tolerance rounded down to power of 2 (0 for non-positive)
+        """
+        if tolerance <= 0:
+            return 0.
+        return float(2 ** np.floor(np.log2(tolerance)))
+
+    # noinspection PyMethodMayBeStatic
+    def simplify_shape(self, shape: ndarray, tolerance: float) -> ndarray:
+        """
+        Simplifies shape by Ramer-Douglas-Peucker algorithm
+
+        :param shape: array of points (x, y)
+        :param tolerance: maximal distance of removed points from the simplified shape
+        :return: Simplified shape (first and last points are always kept)
+        """
+        if len(shape) <= 2 or tolerance <= 0:
+            return shape
+        keep: ndarray = np.zeros(len(shape), dtype=bool)
+        keep[[0, -1]] = True
+        stack: List[Tuple[int, int]] = [(0, len(shape) - 1)]
+        while stack:
+            start, end = stack.pop()
+            if end - start < 2:
+                continue
+            direction: ndarray = shape[end] - shape[start]
+            norm: float = float(np.hypot(*direction))
+            offsets: ndarray = shape[start + 1:end] - shape[start]
+            if norm == 0:
+                distances: ndarray = np.hypot(offsets[:, 0], offsets[:, 1])
+            else:
+                distances = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / norm
+            farthest: int = int(distances.argmax())
+            if distances[farthest] > tolerance:
+                keep[start + 1 + farthest] = True
+                stack.append((start, start + 1 + farthest))
+                stack.append((start + 1 + farthest, end))
+        return shape[keep]
+
+    def clear_geometry(self) -> None:
+        """
+        :return: None
+        """
+        self.geometry.clear()
+        self.lane_edges = None
+        self.edge_lanes.clear()
+        self.visible_lanes.clear()
+        self.fingerprint = ""
+
     # ------------------------------------------ Utils ------------------------------------------
 
     # noinspection PyMethodMayBeStatic
@@ -300,3 +530,66 @@ class Display(GraphModule):
             for _ in range(edge.get_lane_count()):
                 new_colors.append(colors[i])
         return new_colors
+
+
+def initialize_plot(
+        rows: int = 1, cols: int = 1, fig_size: Tuple[int, int] = (12, 8),
+        title: str = "", background_color: str = GraphColors.BACKGROUND
+    ) -> Tuple[plt.Figure, plt.Axes]:
+    """
+    :param rows: of subplot
+    :param cols: of subplot
+    :param fig_size: of plot (tuple x, y)
+    :param title: of window
+    :param background_color: of plot
+    :return: figure and axes (can be multiple)
+    :raises: ValueError if rows or cols are less than 1
+    """
+    # Check arguments
+    if rows < 1 or cols < 1:
+        raise ValueError(f"Rows: '{rows}' and cols: '{cols}' must be at least 1!")
+    fig_size = (fig_size[0] * rows, fig_size[1] * cols)
+    fig, ax = plt.subplots(nrows=rows, ncols=cols, figsize=fig_size)
+    # Check for multiple subplots
+    if rows > 1 or cols > 1:
+        for axes in ax.flatten():
+            axes.set_facecolor(background_color)
+    else:
+        ax.set_facecolor(background_color)
+    fig.canvas.manager.set_window_title(title)
+    return fig, ax
+
+
+def render_frames(
+        geometry: List[ndarray], frames: List[ndarray], paths: List[str], titles: List[str],
+        fig_size: Tuple[int, int], background_color: str, line_width: int
+    ) -> bool:
+    """
+    Renders frames of network in single figure, changing only colors of edges (runs in separate process).
+
+    :param geometry: shapes of lanes
+    :param frames: colors of lanes for each frame
+    :param paths: file paths to which frames are saved
+    :param titles: of frames
+    :param fig_size: of frames (tuple x, y)
+    :param background_color: of frames
+    :param line_width: of edges
+    :return: True on success, False otherwise
+    """
+    plt.switch_backend("Agg")
+    fig, ax = initialize_plot(fig_size=fig_size, background_color=background_color)
+    collection: LineCollection = LineCollection(geometry, linewidth=line_width)
+    ax.add_collection(collection)
+    ax.autoscale_view(True, True, True)
+    plt.tight_layout()
+    try:
+        for colors, path, title in zip(frames, paths, titles):
+            collection.set_color(colors)
+            ax.set_title(title)
+            fig.savefig(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: '{e}' while saving frames!")
+        return False
+    finally:
+        plt.close(fig)
+    return True
@@ -0,0 +1,227 @@
+from utc.src.constants.static import FilePaths
+from utc.src.constants.file_system.my_file import MyFile
+from utc.src.graph.modules.graph_module import GraphModule
+from utc.src.graph.network import RoadNetwork, Route
+import numpy as np
+import heapq
+from os.path import getmtime
+from typing import Dict, List, Tuple, Optional, Callable
+
+
+class Landmarks(GraphModule):
+    """
+    Class holding pre-computed distances between landmarks (selected junctions) and all other junctions
+    of road network, used as lower bound (ALT - A*, Landmarks, Triangle inequality) heuristic in A* search.
+    Distances are computed over routes of network (i.e. their lengths), forward table
+    holds distances from landmarks to junctions, backward table distances from junctions to landmarks.
+    """
+    def __init__(self, road_network: RoadNetwork):
+        super().__init__(road_network)
+        # Junction id -> column in distance tables
+        self.junctions: Dict[str, int] = {}
+        self.landmarks: List[str] = []
+        # Tables of shape (landmarks, junctions)
+        self.forward: Optional[np.ndarray] = None
+        self.backward: Optional[np.ndarray] = None
+        # Lower bounds of the last target (target junction id, bounds)
+        self.cached: Optional[Tuple[str, np.ndarray]] = None
+
+    def set_network(self, road_network: RoadNetwork) -> None:
+        super().set_network(road_network)
+        self.clear()
+
+    # -------------------------------------- Pre-computation --------------------------------------
+
+    def prepare(self, count: int = 16, file_path: str = "") -> bool:
+        """
+        Loads landmarks stored alongside the network, computes (and stores) them if they do not exist.
+
+        :param count: number of landmarks
+        :param file_path: path to file with landmarks (default is next to network map)
+        :return: True on success, False otherwise
+        """
+        file_path = (file_path or self.get_path())
+        if self.is_loaded() and len(self.landmarks) >= min(count, len(self.road_network.junctions)):
+            return True
+        elif file_path and MyFile.file_exists(file_path, message=False) and self.load(file_path):
+            if len(self.landmarks) >= min(count, len(self.road_network.junctions)):
+                return True
+        if not self.precompute(count):
+            return False
+        return not file_path or self.save(file_path)
+
+    def precompute(self, count: int = 16) -> bool:
+        """
+        Selects landmarks by farthest-point strategy (each new landmark is the junction farthest
+        from already selected ones), computes forward and backward distances of each landmark.
+
+        :param count: number of landmarks
+        :return: True on success, False otherwise
+        """
+        if count < 1:
+            print(f"Number of landmarks has to be at least 1, got: {count}!")
+            return False
+        elif not self.road_network.junctions:
+            print("Unable to compute landmarks, road network has no junctions!")
+            return False
+        print(f"Pre-computing {count} landmarks for network: '{self.road_network.map_name}'")
+        self.clear()
+        self.junctions = {junction_id: index for index, junction_id in enumerate(self.road_network.junctions.keys())}
+        count = min(count, len(self.junctions))
+        junction_ids: List[str] = list(self.junctions)
+        forward: List[np.ndarray] = []
+        backward: List[np.ndarray] = []
+        # Start from junction farthest from arbitrary one (usually lies on the fringe of network)
+        nearest: np.ndarray = self.dijkstra(next(iter(self.junctions)))
+        while len(self.landmarks) < count:
+            reachable: np.ndarray = np.where(np.isfinite(nearest), nearest, -1)
+            reachable[[self.junctions[landmark] for landmark in self.landmarks]] = -1
+            landmark: str = junction_ids[int(reachable.argmax())]
+            if reachable.max() < 0:  # Remaining junctions are unreachable, pick any unselected
+                landmark = next(junction for junction in junction_ids if junction not in self.landmarks)
+            self.landmarks.append(landmark)
+            forward.append(self.dijkstra(landmark))
+            backward.append(self.dijkstra(landmark, reverse=True))
+            nearest = forward[-1] if len(forward) == 1 else np.minimum(nearest, forward[-1])
+        self.forward = np.vstack(forward)
+        self.backward = np.vstack(backward)
+        return True
+
+    def dijkstra(self, source: str, reverse: bool = False) -> np.ndarray:
+        """
+        :param source: junction from which distances are computed
+        :param reverse: True if distances should be computed to source (on reversed routes), default False
+        :return: Array of distances indexed by columns of junctions (inf for unreachable)
+        """
+        distances: np.ndarray = np.full(len(self.junctions), np.inf)
+        distances[self.junctions[source]] = 0
+        # (distance, junction id)
+        queue: List[Tuple[float, str]] = [(0, source)]
+        while queue:
+            distance, junction_id = heapq.heappop(queue)
+            if distance > distances[self.junctions[junction_id]]:
+                continue
+            junction = self.road_network.get_junction(junction_id)
+            routes: List[Route] = junction.get_in_routes() if reverse else junction.get_out_routes()
+            for route in routes:
+                length, destination = route.traverse()
+                neighbour: str = route.get_start() if reverse else destination
+                if neighbour not in self.junctions:
+                    continue
+                length += distance
+                if length < distances[self.junctions[neighbour]]:
+                    distances[self.junctions[neighbour]] = length
+                    heapq.heappush(queue, (length, neighbour))
+        return distances
+
+    # -------------------------------------- Heuristic --------------------------------------
+
+    def get_heuristic(self, target_junction_id: str) -> Optional[Callable[[str], float]]:
+        """
+        Computes lower bounds of distances from all junctions to target at once,
+        max over landmarks of: max(d(L, t) - d(L, v), d(v, L) - d(t, L)).
+
+        :param target_junction_id: goal junction of search
+        :return: Function mapping junction id to lower bound of its distance to target,
+        None if landmarks are not computed or target is unknown
+        """
+        if not self.is_loaded() or target_junction_id not in self.junctions:
+            return None
+        elif self.cached is None or self.cached[0] != target_junction_id:
+            column: int = self.junctions[target_junction_id]
+            with np.errstate(invalid="ignore"):
+                bounds: np.ndarray = np.fmax(
+                    self.forward[:, [column]] - self.forward,
+                    self.backward - self.backward[:, [column]]
+                )
+            # Both bounds being undefined (inf - inf) gives no information
+            bounds = np.max(np.where(np.isnan(bounds), 0, bounds), axis=0)
+            self.cached = (target_junction_id, np.maximum(bounds, 0))
+        bounds: np.ndarray = self.cached[1]
+
+        def heuristic(junction_id: str) -> float:
+            """
+            :param junction_id: current junction
+            :return: Lower bound of distance to target (0 for unknown junctions)
+            """
+            index: Optional[int] = self.junctions.get(junction_id)
+            return 0 if index is None else float(bounds[index])
+        return heuristic
+
+    # -------------------------------------- Utils --------------------------------------
+
+    def save(self, file_path: str = "") -> bool:
+        """
+        :param file_path: path to file (default is next to network map)
+        :return: True on success, False otherwise
+        """
+        file_path = (file_path or self.get_path())
+        if not self.is_loaded() or not file_path:
+            print("Unable to save landmarks, they are not computed or path is missing!")
+            return False
+        try:
+            np.savez_compressed(
+                file_path, junctions=np.array(list(self.junctions)),
+                landmarks=np.array(self.landmarks), forward=self.forward, backward=self.backward
+            )
+        except OSError as e:
+            print(f"Error: '{e}' while saving landmarks to: '{file_path}'!")
+            return False
+        return True
+
+    def load(self, file_path: str = "") -> bool:
+        """
+        Stored landmarks are only accepted, if they cover all junctions of the current network
+        (sub-networks can use landmarks of their original network, since they only remove routes)
+        and if they are not older than network map (otherwise they are stale).
+
+        :param file_path: path to file (default is next to network map)
+        :return: True on success, False otherwise
+        """
+        file_path = (file_path or self.get_path())
+        if not MyFile.file_exists(file_path):
+            return False
+        network_path: str = FilePaths.MAP_SUMO.format(self.road_network.map_name)
+        if (self.road_network.map_name and MyFile.file_exists(network_path, message=False)
+                and getmtime(network_path) > getmtime(file_path)):
+            print(f"Landmarks: '{file_path}' are older than network: '{network_path}', computing them again!")
+            return False
+        self.clear()
+        try:
+            with np.load(file_path) as data:
+                junctions: List[str] = [str(junction_id) for junction_id in data["junctions"]]
+                landmarks: List[str] = [str(landmark) for landmark in data["landmarks"]]
+                forward, backward = data["forward"], data["backward"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error: '{e}' while loading landmarks from: '{file_path}'!")
+            return False
+        if not (self.road_network.junctions.keys() <= set(junctions)):
+            print(f"Landmarks: '{file_path}' do not match junctions of network: '{self.road_network.map_name}'!")
+            return False
+        self.junctions = {junction_id: index for index, junction_id in enumerate(junctions)}
+        self.landmarks = landmarks
+        self.forward, self.backward = forward, backward
+        return True
+
+    def get_path(self) -> str:
+        """
+        :return: Path to file of landmarks (next to network map), empty if network was not loaded from map
+        """
+        if not self.road_network.map_name:
+            return ""
+        return FilePaths.MAP_LANDMARKS.format(self.road_network.map_name)
+
+    def is_loaded(self) -> bool:
+        """
+        :return: True if distance tables are computed, False otherwise
+        """
+        return self.forward is not None and self.backward is not None
+
+    def clear(self) -> None:
+        """
+        :return: None
+        """
+        self.junctions = {}
+        self.landmarks = []
+        self.forward = self.backward = None
+        self.cached = None
@@ -11,6 +11,8 @@ class Loader(GraphModule):
     def __init__(self, road_network: RoadNetwork):
         super().__init__(road_network)
         self.network_file: Optional[SumoNetworkFile] = None
+        # Path to the last loaded network file (file itself is cleared after loading)
+        self.network_path: str = ""
 
     def load_map(self, network_path: str) -> bool:
         """
@@ -31,6 +33,9 @@ class Loader(GraphModule):
             return False
         self.road_network.roundabouts = self.load_roundabouts()
         self.road_network.map_name = self.network_file.get_name()
+        self.network_path = self.network_file.file_path
+        # Connections were assigned directly to junctions
+        self.road_network.update_fingerprint()
         # print("Finished loading road network")
         # return True
         return self.check_status()
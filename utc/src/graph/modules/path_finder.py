@@ -1,21 +1,36 @@
 from utc.src.graph.modules.graph_module import GraphModule
 from utc.src.graph.network import RoadNetwork, Route
 from utc.src.graph.modules.display import Display, plt
+from utc.src.graph.modules.landmarks import Landmarks
 import heapq
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Callable, FrozenSet, Set
 
 
 class PathFinder(GraphModule):
     """ Class implementing shortest path algorithms """
-    def __init__(self, road_network: RoadNetwork):
+    def __init__(self, road_network: RoadNetwork, tree_limit: int = 32):
+        """
+        :param road_network: of graph
+        :param tree_limit: maximal number of reverse search trees kept in memory (for 'tree' heuristic)
+        """
         super().__init__(road_network)
+        self.landmarks: Landmarks = Landmarks(road_network)
+        # Reverse search trees shared by queries with the same destination,
+        # (target junction, allowed ending routes) -> {route id: exact distance to target after route}
+        self.trees: Dict[Tuple[str, FrozenSet[int]], Dict[int, float]] = {}
+        self.tree_limit: int = tree_limit
+
+    def set_network(self, road_network: RoadNetwork) -> None:
+        super().set_network(road_network)
+        self.landmarks.set_network(road_network)
+        self.clear_trees()
 
     # -------------------------------------- Shortest path --------------------------------------
 
     def top_k_a_star(
             self, start_junction_id: str, target_junction_id: str,
             c: float, k: int = 3000, display: Display = None,
-            incoming_route: Route = None
+            incoming_route: Route = None, heuristic: str = "euclidean"
         ) -> Optional[List[Route]]:
         """
         At start, performs A* search to find shortest route,
@@ -29,6 +44,7 @@ class PathFinder(GraphModule):
         :param k: limit of found routes, default 3000
         :param display: Class Display, if process should be displayed (default None)
         :param incoming_route: incoming route to starting junction (default None)
+        :param heuristic: estimate of distance to target, either 'euclidean' (default), 'landmarks' or 'tree'
         :return: List of routes (shortest route is the first) satisfying (route_length < c * shortest_route_length),
         None if shortest route does not exists
         """
@@ -43,11 +59,11 @@ class PathFinder(GraphModule):
             return None
         # -------------------------------- init --------------------------------
         # Perform initial search to find shortest route and return queue with unexplored junctions
-        queue, shortest_route = self.a_star(start_junction_id, target_junction_id, incoming_route)
+        queue, shortest_route = self.a_star(start_junction_id, target_junction_id, incoming_route, heuristic)
         if shortest_route is None:  # No path exists
             print(f"No path exists between junction '{start_junction_id}' and junction '{target_junction_id}'")
             return None
-        dest: Tuple[float, float] = self.road_network.junctions[target_junction_id].get_position()
+        estimate: Callable[[Route], float] = self.get_heuristic(target_junction_id, heuristic)
         limit: float = round(c * shortest_route.traverse()[0], 3)
         assert (limit > 0)
         # print(f"Setting alternative route length limit: '{limit}'")
@@ -55,7 +71,7 @@ class PathFinder(GraphModule):
         # -------------------------------- Algorithm --------------------------------
         while queue:
             priority, in_route, length, path = heapq.heappop(queue)
-            if priority > limit:  # Priority is current length + euclidean distance to target
+            if priority > limit:  # Priority is current length + lower bound of distance to target
                 break  # End of search
             elif in_route.get_destination() == target_junction_id and in_route.allowed_last:
                 # Found other path (satisfying path_length < c * shortest_path_length), record it
@@ -69,14 +85,12 @@ class PathFinder(GraphModule):
                     break
                 continue
             for route in self.road_network.junctions[in_route.get_destination()].travel(in_route):
-                distance, neigh_junction_id = route.traverse()
+                distance, _ = route.traverse()
                 # On the same route, avoid visiting the same edge multiple times (loops)
                 if not self.has_loop(route, path):
                     distance += length
-                    # Current position
-                    pos: Tuple[float, float] = self.road_network.junctions[neigh_junction_id].get_position()
                     heapq.heappush(queue, (
-                        distance + self.coord_distance(dest, pos), route,
+                        distance + estimate(route), route,
                         distance, path + route.get_edge_ids(True)
                         )
                     )
@@ -100,9 +114,66 @@ class PathFinder(GraphModule):
             display.show_plot(ax)
         return other_routes
 
+    def diverse_routes(
+            self, start_junction_id: str, target_junction_id: str,
+            c: float, k: int = 10, penalty: float = 1.4, max_similarity: float = 0.7,
+            attempts: int = 30, heuristic: str = "euclidean"
+        ) -> Optional[List[Route]]:
+        """
+        Penalty method, repeatedly finds shortest route, while increasing weights of routes
+        used by previously found ones, new route is accepted if its length is at maximum
+        c * shortest_route_length and its Jaccard similarity to every accepted route is below bound.
+
+        :param start_junction_id: starting junction
+        :param target_junction_id: target junction
+        :param c: multiplier of shortest path length
+        :param k: limit of found routes, default 10
+        :param penalty: multiplier of weight of used routes (in each iteration), default 1.4
+        :param max_similarity: maximal Jaccard similarity (of edges) between accepted routes, default 0.7
+        :param attempts: maximal number of searches, default 30
+        :param heuristic: estimate of distance to target, either 'euclidean' (default), 'landmarks' or 'tree'
+        :return: List of routes (shortest route is the first), None if shortest route does not exists
+        """
+        # -------------------------------- checks --------------------------------
+        if not self.check_junctions(start_junction_id, target_junction_id):
+            return None
+        elif c <= 1 or penalty <= 1:
+            print(f"Parameters 'c' and 'penalty' have to be greater than 1, got: '{c}', '{penalty}' !")
+            return None
+        elif k <= 1:
+            print(f"Parameter 'k' has to be more than 1, got: '{k}' !")
+            return None
+        shortest_route: Optional[Route] = self.a_star(start_junction_id, target_junction_id, heuristic=heuristic)[1]
+        if shortest_route is None:  # No path exists
+            print(f"No path exists between junction '{start_junction_id}' and junction '{target_junction_id}'")
+            return None
+        limit: float = round(c * shortest_route.traverse()[0], 3)
+        found_routes: List[Route] = [shortest_route]
+        found_edges: List[Set[int]] = [set(shortest_route.get_edge_ids(True))]
+        # Multipliers of route weights
+        penalties: Dict[Route, float] = {}
+        last_route: Optional[Route] = shortest_route
+        # -------------------------------- Algorithm --------------------------------
+        for _ in range(attempts):
+            if len(found_routes) >= k:
+                break
+            # Penalize routes of the last found path (even if rejected), so that search moves elsewhere
+            for route in self.road_network.get_routes(self.find_routes(last_route)):
+                penalties[route] = penalties.get(route, 1) * penalty
+            last_route = self.a_star(start_junction_id, target_junction_id, heuristic=heuristic, penalties=penalties)[1]
+            # Found path is too long, further penalties would only move search farther away
+            if last_route is None or last_route.traverse()[0] > limit:
+                break
+            edges: Set[int] = set(last_route.get_edge_ids(True))
+            if all(self.jaccard_similarity(edges, other) < max_similarity for other in found_edges):
+                found_routes.append(last_route)
+                found_edges.append(edges)
+        return found_routes
+
     def a_star(
             self, start_junction_id: str,
-            end_junction_id: str, in_route: Route = None
+            end_junction_id: str, in_route: Route = None,
+            heuristic: str = "euclidean", penalties: Optional[Dict[Route, float]] = None
         ) -> Tuple[List[tuple], Optional[Route]]:
         """
         Standard implementation of A* algorithm, with added support for multi-graphs (which
@@ -111,6 +182,8 @@ class PathFinder(GraphModule):
         :param start_junction_id: starting junction
         :param end_junction_id: goal junction
         :param in_route: incoming route to starting junction (Default None)
+        :param heuristic: estimate of distance to target, either 'euclidean' (default), 'landmarks' or 'tree'
+        :param penalties: multipliers (at least 1) of route lengths, used as weights of routes (default None)
         :return: Queue containing unexplored junctions, shortest route (None if it could not be found)
         """
         # print(f"Finding shortest route from: {start_junction_id}, to: {end_junction_id} using A* algorithm")
@@ -120,7 +193,7 @@ class PathFinder(GraphModule):
         shortest_route: Optional[Route] = None
         if not self.check_junctions(start_junction_id, end_junction_id):
             return queue, shortest_route
-        destination_pos: Tuple[float, float] = self.road_network.get_junction(end_junction_id).get_position()
+        estimate: Callable[[Route], float] = self.get_heuristic(end_junction_id, heuristic)
         # For junction n, gScore[n] is the cost of the cheapest path from start to n currently known,
         # reworked to be mapping to routes (since road-network, can be multi-graph)
         g_score: Dict[Route, float] = {route: float("inf") for route in self.road_network.routes.values()}
@@ -129,12 +202,10 @@ class PathFinder(GraphModule):
             for out_route in self.road_network.junctions[start_junction_id].get_out_routes():
                 if not out_route.allowed_first:
                     continue
-                distance, neigh_junction_id = out_route.traverse()
-                # Current position
-                pos: Tuple[float, float] = self.road_network.junctions[neigh_junction_id].get_position()
+                distance: float = self.get_weight(out_route, penalties)
                 g_score[out_route] = distance  # Update distances
                 heapq.heappush(queue, (
-                    distance + self.coord_distance(destination_pos, pos), out_route,
+                    distance + estimate(out_route), out_route,
                     distance, out_route.get_edge_ids(True)
                     )
                 )
@@ -159,13 +230,11 @@ class PathFinder(GraphModule):
                 shortest_route = Route(self.road_network.get_edges(path))
                 break
             for route in self.road_network.junctions[in_route.get_destination()].travel(in_route):
-                distance, neigh_junction_id = route.traverse()
-                distance += g_score[in_route]
+                distance: float = self.get_weight(route, penalties) + g_score[in_route]
                 if distance < g_score[route] and not self.has_loop(route, path):
-                    pos: Tuple[float, float] = self.road_network.junctions[neigh_junction_id].get_position()
                     g_score[route] = distance
                     heapq.heappush(queue, (
-                        distance + self.coord_distance(destination_pos, pos), route,
+                        distance + estimate(route), route,
                         distance, path + route.get_edge_ids(True)
                         )
                     )
@@ -174,6 +243,130 @@ class PathFinder(GraphModule):
 
     # -------------------------------------- Utils --------------------------------------
 
+    def get_heuristic(self, target_junction_id: str, heuristic: str = "euclidean") -> Callable[[Route], float]:
+        """
+        :param target_junction_id: goal junction of search
+        :param heuristic: either 'euclidean' (distance of coordinates), 'landmarks' (ALT lower
+        bounds, have to be prepared by 'landmarks' beforehand, otherwise euclidean is used), or 'tree'
+        (exact distances from reverse search tree of target, shared by queries with the same destination)
+        :return: Function mapping route to estimate of distance from its destination to target
+        """
+        if heuristic == "tree":
+            tree: Dict[int, float] = self.reverse_tree(target_junction_id)
+            return lambda route: tree.get(route.get_id(True), float("inf"))
+        elif heuristic == "landmarks":
+            estimate: Optional[Callable[[str], float]] = self.landmarks.get_heuristic(target_junction_id)
+            if estimate is not None:
+                return lambda route: estimate(route.get_destination())
+            print(f"Landmarks are not prepared for junction: '{target_junction_id}', using euclidean heuristic")
+        elif heuristic != "euclidean":
+            print(f"Unknown heuristic: '{heuristic}', using euclidean heuristic")
+        destination_pos: Tuple[float, float] = self.road_network.get_junction(target_junction_id).get_position()
+        return lambda route: self.coord_distance(
+            destination_pos, self.road_network.junctions[route.get_destination()].get_position()
+        )
+
+    def reverse_tree(self, target_junction_id: str) -> Dict[int, float]:
+        """
+        Reverse Dijkstra search over routes from the allowed (last) routes of target junction,
+        trees are cached, so that queries sharing the destination (e.g. vehicles leaving
+        region by the same exit) are answered by the same tree.
+
+        :param target_junction_id: goal junction of search
+        :return: Mapping of route (internal id) to length of the shortest path from its destination to target
+        (only routes from which target is reachable are present)
+        """
+        ending: FrozenSet[int] = frozenset([
+            route.get_id(True) for route in self.road_network.get_junction(target_junction_id).get_in_routes()
+            if route.allowed_last
+        ])
+        key: Tuple[str, FrozenSet[int]] = (target_junction_id, ending)
+        if key in self.trees:
+            return self.trees[key]
+        distances: Dict[int, float] = {route_id: 0 for route_id in ending}
+        queue: List[Tuple[float, int]] = [(0, route_id) for route_id in ending]
+        while queue:
+            distance, route_id = heapq.heappop(queue)
+            if distance > distances[route_id]:
+                continue
+            route: Route = self.road_network.get_route(route_id)
+            distance += route.traverse()[0]
+            # Routes leading to this one
+            for in_route, out_routes in self.road_network.junctions[route.get_start()].connections.items():
+                if in_route is None or route not in out_routes:
+                    continue
+                elif distance < distances.get(in_route.get_id(True), float("inf")):
+                    distances[in_route.get_id(True)] = distance
+                    heapq.heappush(queue, (distance, in_route.get_id(True)))
+        # Remove the oldest tree
+        if len(self.trees) >= self.tree_limit:
+            self.trees.pop(next(iter(self.trees)))
+        self.trees[key] = distances
+        return distances
+
+    def clear_trees(self) -> None:
+        """
+        :return: None
+        """
+        self.trees.clear()
+
+    def invalidate(self, routes: Set[int]) -> None:
+        """
+        Drops pre-computed data depending on changed routes (after network was patched), reverse search trees
+        are dropped only if they contain any of the routes, landmarks are cleared,
+        since their distances cover the whole network.
+
+        :param routes: internal id's of changed routes
+        :return: None
+        """
+        if not routes:
+            return
+        for key in [key for key, tree in self.trees.items() if not routes.isdisjoint(tree)]:
+            self.trees.pop(key)
+        self.landmarks.clear()
+
+    # noinspection PyMethodMayBeStatic
+    def get_weight(self, route: Route, penalties: Optional[Dict[Route, float]] = None) -> float:
+        """
+        :param route: currently considered route
+        :param penalties: multipliers of route lengths (default None)
+        :return: Length of route multiplied by its penalty
+        """
+        if penalties is None:
+            return route.traverse()[0]
+        return route.traverse()[0] * penalties.get(route, 1)
+
+    def find_routes(self, path: Route) -> List[int]:
+        """
+        :param path: found route (sequence of edges)
+        :return: List of internal id's of network routes forming path
+        """
+        route_ids: List[int] = []
+        index: int = 0
+        edges: List[int] = path.get_edge_ids(True)
+        junction_id: str = path.get_start()
+        while index < len(edges):
+            for route in self.road_network.get_junction(junction_id).get_out_routes():
+                route_edges: List[int] = route.get_edge_ids(True)
+                if edges[index:index + len(route_edges)] == route_edges:
+                    route_ids.append(route.get_id(True))
+                    index += len(route_edges)
+                    junction_id = route.get_destination()
+                    break
+            else:
+                break
+        return route_ids
+
+    # noinspection PyMethodMayBeStatic
+    def jaccard_similarity(self, edges_a: Set[int], edges_b: Set[int]) -> float:
+        """
+        :param edges_a: internal id's of edges of first route
+        :param edges_b: internal id's of edges of second route
+        :return: Jaccard similarity between two sets -> [0, 1]
+        """
+        intersect: int = len(edges_a & edges_b)
+        return intersect / (len(edges_a) + len(edges_b) - intersect)
+
     # noinspection PyMethodMayBeStatic
     def has_loop(self, route: Route, path: List[int]) -> bool:
         """
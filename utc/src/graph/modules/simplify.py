@@ -92,6 +92,8 @@ class Simplify(GraphModule):
         #     f"Finished simplifying junctions, removed: {len(connections)} junctions "
         #     f"and {routes_count - len(self.road_network.routes)} routes"
         # )
+        # Connections were changed directly on junctions
+        self.road_network.update_fingerprint()
         return True
 
     def simplify_roundabouts(self, plot: Display = None) -> bool:
@@ -211,6 +213,7 @@ class Simplify(GraphModule):
             for junction_id in roundabout:
                 self.road_network.remove_junction(junction_id)
         print("Done simplifying roundabouts")
+        self.road_network.update_fingerprint()
         return True
 
     # ----------------------------------- Utils -----------------------------------
@@ -1,3 +1,5 @@
 from utc.src.graph.network.parts import Edge, Junction, Route
+from utc.src.graph.network.spatial_index import SpatialIndex
+from utc.src.graph.network.diff import NetworkDiff
 from utc.src.graph.network.road_network import RoadNetwork
 # Forward imports
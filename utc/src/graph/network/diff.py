@@ -0,0 +1,170 @@
+from utc.src.graph.network.parts import Junction, Edge, Route
+from typing import Dict, List, Set, Tuple, Optional
+
+
+# Routes are identified by their edges (route id's are not stable between networks)
+RouteKey = Tuple[str, ...]
+# Connection (in-coming route, out-going route), in-coming is None for starting junctions,
+# out-going is None for in-coming route without connections (marks its presence in junction)
+ConnectionKey = Tuple[Optional[RouteKey], Optional[RouteKey]]
+
+
+class NetworkDiff:
+    """
+    Class holding differences between two road networks (old and new), i.e. added,
+    removed and modified junctions, edges, routes and connections of junctions,
+    junctions and edges are identified by their id's, routes by sequence of their edges.
+    Objects of new network are only referenced, patching creates new ones.
+    """
+    def __init__(self, old_name: str = "", new_name: str = ""):
+        """
+        :param old_name: name of old network
+        :param new_name: name of new network
+        """
+        self.old_name: str = old_name
+        self.new_name: str = new_name
+        # Junctions
+        self.added_junctions: Dict[str, Junction] = {}
+        self.removed_junctions: Set[str] = set()
+        self.modified_junctions: Dict[str, Junction] = {}
+        # Edges
+        self.added_edges: Dict[str, Edge] = {}
+        self.removed_edges: Set[str] = set()
+        self.modified_edges: Dict[str, Edge] = {}
+        # Routes
+        self.added_routes: Dict[RouteKey, Route] = {}
+        self.removed_routes: Set[RouteKey] = set()
+        # Junction id -> connections of junction in new network (only for junctions with changed connections)
+        self.connections: Dict[str, List[ConnectionKey]] = {}
+        # Roundabouts of new network, None if they did not change
+        self.roundabouts: Optional[List[List[str]]] = None
+
+    # ------------------------------------------ Comparison ------------------------------------------
+
+    def compute(
+            self, old_objects: Tuple[Dict[str, Junction], Dict[str, Edge], Dict[str, Route]],
+            new_objects: Tuple[Dict[str, Junction], Dict[str, Edge], Dict[str, Route]]
+        ) -> None:
+        """
+        :param old_objects: junctions, edges and routes of old network
+        :param new_objects: junctions, edges and routes of new network
+        :return: None
+        """
+        (old_junctions, old_edges, old_routes), (new_junctions, new_edges, new_routes) = old_objects, new_objects
+        # Junctions
+        self.added_junctions = {
+            junction_id: new_junctions[junction_id] for junction_id in (new_junctions.keys() - old_junctions.keys())
+        }
+        self.removed_junctions = set(old_junctions.keys() - new_junctions.keys())
+        self.modified_junctions = {
+            junction_id: new_junctions[junction_id] for junction_id in (old_junctions.keys() & new_junctions.keys())
+            if self.junction_state(old_junctions[junction_id]) != self.junction_state(new_junctions[junction_id])
+        }
+        # Edges, those which changed their junctions are replaced
+        self.added_edges = {edge_id: new_edges[edge_id] for edge_id in (new_edges.keys() - old_edges.keys())}
+        self.removed_edges = set(old_edges.keys() - new_edges.keys())
+        self.modified_edges = {}
+        for edge_id in (old_edges.keys() & new_edges.keys()):
+            old_edge, new_edge = old_edges[edge_id], new_edges[edge_id]
+            if old_edge.get_junctions() != new_edge.get_junctions():
+                self.removed_edges.add(edge_id)
+                self.added_edges[edge_id] = new_edge
+            elif self.edge_state(old_edge) != self.edge_state(new_edge):
+                self.modified_edges[edge_id] = new_edge
+        # Routes, those going trough replaced edges are replaced
+        replaced: Set[str] = (self.removed_edges & self.added_edges.keys())
+        old_keys: Dict[RouteKey, Route] = self.get_route_keys(old_routes.values())
+        new_keys: Dict[RouteKey, Route] = self.get_route_keys(new_routes.values())
+        self.added_routes = {
+            key: route for key, route in new_keys.items()
+            if key not in old_keys or any(edge_id in replaced for edge_id in key)
+        }
+        self.removed_routes = {
+            key for key in old_keys if key not in new_keys or any(edge_id in replaced for edge_id in key)
+        }
+        # Connections (junctions of replaced routes are re-connected, even if route keys stayed the same)
+        replaced_routes: Set[RouteKey] = (self.removed_routes & self.added_routes.keys())
+        self.connections = {}
+        for junction_id, junction in new_junctions.items():
+            connections: List[ConnectionKey] = self.get_connection_keys(junction)
+            if junction_id not in old_junctions or set(connections) != set(
+                    self.get_connection_keys(old_junctions[junction_id])
+                    ) or any(key in replaced_routes for connection in connections for key in connection):
+                self.connections[junction_id] = connections
+        return
+
+    # ------------------------------------------ Getters ------------------------------------------
+
+    def get_affected_junctions(self) -> Set[str]:
+        """
+        :return: Id's of junctions which are changed by patch (including removed ones)
+        """
+        affected: Set[str] = (
+            self.added_junctions.keys() | self.removed_junctions |
+            self.modified_junctions.keys() | self.connections.keys()
+        )
+        for edge in (list(self.added_edges.values()) + list(self.modified_edges.values())):
+            affected.update(edge.get_junctions())
+        return affected
+
+    # noinspection PyMethodMayBeStatic
+    def get_route_keys(self, routes: List[Route]) -> Dict[RouteKey, Route]:
+        """
+        :param routes: of network
+        :return: Mapping of route keys (sequence of edge id's) to routes
+        """
+        return {tuple(route.get_edge_ids()): route for route in routes}
+
+    # noinspection PyMethodMayBeStatic
+    def get_connection_keys(self, junction: Junction) -> List[ConnectionKey]:
+        """
+        :param junction: of network
+        :return: List of connections of junction, represented by route keys
+        """
+        connections: List[ConnectionKey] = []
+        for in_route, out_routes in junction.connections.items():
+            in_key: Optional[RouteKey] = None if in_route is None else tuple(in_route.get_edge_ids())
+            connections.append((in_key, None))
+            connections.extend((in_key, tuple(out_route.get_edge_ids())) for out_route in out_routes)
+        return connections
+
+    # noinspection PyMethodMayBeStatic
+    def junction_state(self, junction: Junction) -> tuple:
+        """
+        :param junction: of network
+        :return: Attributes of junction compared between networks
+        """
+        return junction.x, junction.y, junction.traffic_lights
+
+    # noinspection PyMethodMayBeStatic
+    def edge_state(self, edge: Edge) -> tuple:
+        """
+        :param edge: of network
+        :return: Attributes of edge compared between networks
+        """
+        return edge.length, edge.speed, edge.lanes
+
+    # ------------------------------------------ Utils ------------------------------------------
+
+    def is_empty(self) -> bool:
+        """
+        :return: True if networks do not differ, False otherwise
+        """
+        return not (
+            self.added_junctions or self.removed_junctions or self.modified_junctions or
+            self.added_edges or self.removed_edges or self.modified_edges or
+            self.added_routes or self.removed_routes or self.connections or self.roundabouts is not None
+        )
+
+    def info(self) -> str:
+        """
+        :return: Summary of differences
+        """
+        return (
+            f"Difference of networks: '{self.old_name}' -> '{self.new_name}'\n"
+            f"Junctions: +{len(self.added_junctions)}, -{len(self.removed_junctions)}, "
+            f"~{len(self.modified_junctions)}\n"
+            f"Edges: +{len(self.added_edges)}, -{len(self.removed_edges)}, ~{len(self.modified_edges)}\n"
+            f"Routes: +{len(self.added_routes)}, -{len(self.removed_routes)}\n"
+            f"Junctions with changed connections: {len(self.connections)}"
+        )
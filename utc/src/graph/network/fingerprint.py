@@ -0,0 +1,113 @@
+from utc.src.graph.network.parts import Junction, Edge, Route
+from hashlib import sha256
+from typing import Dict, Optional
+
+
+class NetworkFingerprint:
+    """
+    Class holding structural fingerprint of road network, each component (junctions, edges, routes,
+    connections) has its own digest, formed by sum of hashes of its elements (so that they can be
+    updated incrementally, independent of order), root digest is the hash of component digests.
+    """
+    MODULUS: int = 2 ** 128
+    COMPONENTS: tuple = ("junctions", "edges", "routes", "connections")
+
+    def __init__(self):
+        self.digests: Dict[str, int] = {component: 0 for component in self.COMPONENTS}
+        self._root: Optional[str] = None
+
+    def add(self, component: str, value: int) -> None:
+        """
+        :param component: of network (junctions, edges, routes, connections)
+        :param value: hash of element added to component
+        :return: None
+        """
+        self.digests[component] = (self.digests[component] + value) % self.MODULUS
+        self._root = None
+
+    def remove(self, component: str, value: int) -> None:
+        """
+        :param component: of network (junctions, edges, routes, connections)
+        :param value: hash of element removed from component
+        :return: None
+        """
+        self.add(component, -value)
+
+    def load(self, other: 'NetworkFingerprint') -> None:
+        """
+        :param other: fingerprint to be copied
+        :return: None
+        """
+        self.digests = dict(other.digests)
+        self._root = other._root
+
+    def clear(self) -> None:
+        """
+        :return: None
+        """
+        self.digests = {component: 0 for component in self.COMPONENTS}
+        self._root = None
+
+    def get_digest(self) -> str:
+        """
+        :return: Root digest (hexadecimal) of network
+        """
+        if self._root is None:
+            self._root = sha256(
+                ":".join(f"{self.digests[component]:032x}" for component in self.COMPONENTS).encode()
+            ).hexdigest()
+        return self._root
+
+    # ------------------------------------------ Element hashes ------------------------------------------
+
+    @staticmethod
+    def element_hash(*parts) -> int:
+        """
+        :param parts: values describing element
+        :return: 128-bit hash of element
+        """
+        return int.from_bytes(sha256("|".join(map(str, parts)).encode()).digest()[:16], "big")
+
+    @staticmethod
+    def junction_hash(junction: Junction) -> int:
+        """
+        :param junction: of network
+        :return: Hash of junction (without its connections)
+        """
+        return NetworkFingerprint.element_hash(
+            "junction", junction.id, junction.internal_id, junction.x, junction.y, junction.traffic_lights
+        )
+
+    @staticmethod
+    def edge_hash(edge: Edge) -> int:
+        """
+        :param edge: of network
+        :return: Hash of edge (including shapes of its lanes)
+        """
+        return NetworkFingerprint.element_hash(
+            "edge", edge.id, edge.internal_id, edge.from_junction,
+            edge.to_junction, edge.length, edge.speed, edge.get_lane_count(),
+            *((lane_id, lane.get("shape")) for lane_id, lane in sorted(edge.lanes.items()))
+        )
+
+    @staticmethod
+    def route_hash(route: Route) -> int:
+        """
+        :param route: of network
+        :return: Hash of route (given by its edges)
+        """
+        return NetworkFingerprint.element_hash("route", route.id, route.internal_id, *route.get_edge_ids(True))
+
+    @staticmethod
+    def connections_hash(junction: Junction) -> int:
+        """
+        :param junction: of network
+        :return: Sum of hashes of junction connections (including in-coming routes without connections)
+        """
+        value: int = 0
+        for in_route, out_routes in junction.connections.items():
+            in_id: int = -1 if in_route is None else in_route.get_id(True)
+            value += NetworkFingerprint.element_hash("connection", junction.id, in_id, None)
+            for out_route in out_routes:
+                value += NetworkFingerprint.element_hash("connection", junction.id, in_id, out_route.get_id(True))
+        return value % NetworkFingerprint.MODULUS
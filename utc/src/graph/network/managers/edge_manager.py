@@ -1,5 +1,6 @@
 from utc.src.graph.network.managers.container import Container
 from utc.src.graph.network.parts import Edge
+import numpy as np
 from typing import Optional, Union, Iterable, Dict, List, Set, Tuple
 
 
@@ -128,6 +129,59 @@ class EdgeManager:
             temp.append(current)
         return result, (best_left, best_right)
 
+    def get_longest_sequences(self, sequences: List[List[str]]) -> List[Tuple[int, int]]:
+        """
+        Bulk version of 'get_longest_sequence', validating all sequences at once, edges are mapped
+        to integers, consecutive edges must also be connected (same rules as in 'check_edge_sequence').
+
+        :param sequences: of edge id's (original)
+        :return: Indexes (left, right - exclusive) of the longest valid sub-sequence in graph
+        for each sequence (the first one in case of tie), (-1, -1) if sequence has no edges in graph
+        """
+        ret_val: List[Tuple[int, int]] = [(-1, -1)] * len(sequences)
+        lengths: np.ndarray = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+        if not lengths.sum():
+            return ret_val
+        mapping: Dict[str, int] = {edge_id: index for index, edge_id in enumerate(self.edges.keys())}
+        edges: np.ndarray = np.fromiter(
+            (mapping.get(edge_id, -1) for sequence in sequences for edge_id in sequence),
+            dtype=np.int64, count=int(lengths.sum())
+        )
+        starts: np.ndarray = np.cumsum(lengths) - lengths
+        # Sequence (index) and position in it for each edge
+        owner: np.ndarray = np.repeat(np.arange(len(sequences)), lengths)
+        position: np.ndarray = np.arange(len(edges)) - starts[owner]
+        # Pairs of connected edges, encoded as single (sorted) integers, edges without incoming edges accept any
+        size: int = len(mapping) + 1
+        pairs: np.ndarray = np.sort(np.fromiter((
+            mapping[from_edge] * size + mapping[to_edge] for to_edge, incoming in self.edge_connections.items()
+            if to_edge in mapping for from_edge in incoming if from_edge in mapping
+        ), dtype=np.int64))
+        free: np.ndarray = np.ones(size, dtype=bool)
+        free[[mapping[edge_id] for edge_id in self.edge_connections if edge_id in mapping]] = False
+        valid: np.ndarray = (edges >= 0)
+        # Edge starts new run, if it is first in sequence, or previous edge is missing or not connected to it
+        codes: np.ndarray = np.roll(edges, 1) * size + edges
+        connected: np.ndarray = np.zeros(len(edges), dtype=bool)
+        if len(pairs):
+            found: np.ndarray = np.minimum(np.searchsorted(pairs, codes), len(pairs) - 1)
+            connected = (pairs[found] == codes)
+        connected |= free[edges]
+        new_run: np.ndarray = valid & ((position == 0) | ~np.roll(valid, 1) | ~connected)
+        if not new_run.any():
+            return ret_val
+        run: np.ndarray = np.cumsum(new_run) - 1
+        run_lengths: np.ndarray = np.bincount(run[valid], minlength=int(run[-1]) + 1)
+        run_starts: np.ndarray = np.flatnonzero(new_run)
+        run_owner: np.ndarray = owner[run_starts]
+        # The longest run of each sequence (the first one on tie)
+        order: np.ndarray = np.lexsort((run_starts, -run_lengths, run_owner))
+        sequence_ids, first = np.unique(run_owner[order], return_index=True)
+        for sequence_id, best in zip(sequence_ids.tolist(), order[first].tolist()):
+            left: int = int(position[run_starts[best]])
+            ret_val[sequence_id] = (left, left + int(run_lengths[best]))
+        return ret_val
+
     def check_edge_sequence(self, sequence: List[Union[int, str, Edge]]) -> bool:
         """
         :param sequence: of edges
@@ -1,5 +1,9 @@
 from utc.src.graph.network import Junction, Edge, Route
 from utc.src.graph.network.managers import JunctionManager, EdgeManager, RouteManager
+from utc.src.graph.network.spatial_index import SpatialIndex
+from utc.src.graph.network.fingerprint import NetworkFingerprint
+from utc.src.graph.network.diff import NetworkDiff, RouteKey
+from copy import copy, deepcopy
 from typing import Dict, List, Set, Optional, Union
 
 
@@ -15,9 +19,25 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         self.name: str = name
         self.map_name: str = ""  # Name of map network was loaded from
         self.roundabouts: List[List[str]] = []
+        # Built on demand, invalidated when junctions or edges change
+        self.spatial_index: Optional[SpatialIndex] = None
+        # Structural digest of network, updated on each change made trough network methods
+        self.fingerprint: NetworkFingerprint = NetworkFingerprint()
 
     # -------------------------------------------------- Adders --------------------------------------------------
 
+    def add_junction(self, junction: Junction, replace: bool = False) -> bool:
+        previous: Optional[Junction] = self.junctions.get(junction.id) if replace else None
+        if not super().add_junction(junction, replace):
+            return False
+        self.spatial_index = None
+        if previous is not None:
+            self.fingerprint.remove("junctions", NetworkFingerprint.junction_hash(previous))
+            self.fingerprint.remove("connections", NetworkFingerprint.connections_hash(previous))
+        self.fingerprint.add("junctions", NetworkFingerprint.junction_hash(junction))
+        self.fingerprint.add("connections", NetworkFingerprint.connections_hash(junction))
+        return True
+
     def add_edge(self, edge: Edge, replace: bool = False) -> bool:
         """
         :param edge: to be added (must be added in order of their internal id's)
@@ -26,12 +46,25 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         """
         if not (self.junction_exists(edge.from_junction) and self.junction_exists(edge.to_junction)):
             return False
-        return super().add_edge(edge, replace)
+        previous: Optional[Edge] = self.edges.get(edge.id) if replace else None
+        if not super().add_edge(edge, replace):
+            return False
+        self.spatial_index = None
+        if previous is not None:
+            self.fingerprint.remove("edges", NetworkFingerprint.edge_hash(previous))
+        self.fingerprint.add("edges", NetworkFingerprint.edge_hash(edge))
+        return True
 
     def add_route(self, route: Route, replace: bool = False) -> bool:
         if not all(self.edge_exists(edge) for edge in route.edge_list):
             return False
-        return super().add_route(route, replace)
+        previous: Optional[Route] = self.routes.get(route.id) if replace else None
+        if not super().add_route(route, replace):
+            return False
+        if previous is not None:
+            self.fingerprint.remove("routes", NetworkFingerprint.route_hash(previous))
+        self.fingerprint.add("routes", NetworkFingerprint.route_hash(route))
+        return True
 
     # -------------------------------------------------- Removers --------------------------------------------------
 
@@ -49,6 +82,7 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         junction: Optional[Junction] = self.get_junction(junction)
         if junction is None:
             return False
+        self.spatial_index = None
         # Remove outgoing routes first
         # Transform into set -> can have multiple same out-routes, coming from different in-routes
         if route_removal:
@@ -59,7 +93,11 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
             for in_route in junction.get_in_routes():
                 if not self.remove_route(in_route, edge_removal):
                     return False
-        return super().remove_junction(junction)
+        if not super().remove_junction(junction):
+            return False
+        self.fingerprint.remove("junctions", NetworkFingerprint.junction_hash(junction))
+        self.fingerprint.remove("connections", NetworkFingerprint.connections_hash(junction))
+        return True
 
     def remove_edge(self, edge: Union[str, int, Edge], route_removal: bool = True) -> bool:
         """
@@ -71,13 +109,19 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         edge: Optional[Edge] = self.get_edge(edge)
         if edge is None:
             return False
+        self.spatial_index = None
         # Find all routes containing this edge, remove them
         if route_removal and edge.references != 0:
             for route in list(self.routes.values()):  # Convert to list to iterate and remove
                 if route.has_edge(edge) and not self.remove_route(route):
                     return False
         # Edge may already be removed when corresponding route was removed
-        return not self.edge_exists(edge, False) or super().remove_edge(edge)
+        if not self.edge_exists(edge, False):
+            return True
+        elif not super().remove_edge(edge):
+            return False
+        self.fingerprint.remove("edges", NetworkFingerprint.edge_hash(edge))
+        return True
 
     def remove_route(self, route: Union[str, int, Route], edge_removal: bool = True) -> bool:
         """
@@ -92,12 +136,16 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         start_junction: Junction = self.get_junction(route.get_start())
         end_junction: Junction = self.get_junction(route.get_destination())
         assert(self.junction_exists(start_junction) and self.junction_exists(end_junction))
+        connections: int = sum(map(NetworkFingerprint.connections_hash, {start_junction, end_junction}))
         if not start_junction.remove_out_route(route):
             return False
         elif not end_junction.replace_in_route(route, None):
             return False
         elif not super().remove_route(route):
             return False
+        self.fingerprint.remove("routes", NetworkFingerprint.route_hash(route))
+        connections -= sum(map(NetworkFingerprint.connections_hash, {start_junction, end_junction}))
+        self.fingerprint.remove("connections", connections)
         # Check reference counter, remove edges with 0 references
         if edge_removal:
             for edge in route.edge_list:
@@ -185,8 +233,51 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         self.name = other.name
         self.map_name = other.map_name
         self.roundabouts = [] + other.roundabouts
+        self.spatial_index = None
+        self.fingerprint.load(other.fingerprint)
         return True
 
+    def update_fingerprint(self) -> str:
+        """
+        Computes fingerprint of network anew, has to be called after connections
+        of junctions were changed directly (not trough methods of network).
+
+        :return: Digest of network
+        """
+        self.fingerprint.clear()
+        for junction in self.junctions.values():
+            self.fingerprint.add("junctions", NetworkFingerprint.junction_hash(junction))
+            self.fingerprint.add("connections", NetworkFingerprint.connections_hash(junction))
+        for edge in self.edges.values():
+            self.fingerprint.add("edges", NetworkFingerprint.edge_hash(edge))
+        for route in self.routes.values():
+            self.fingerprint.add("routes", NetworkFingerprint.route_hash(route))
+        return self.fingerprint.get_digest()
+
+    def get_fingerprint(self) -> str:
+        """
+        :return: Digest of network structure (junctions, edges, routes and connections),
+        networks with equal structure have the same digest
+        """
+        return self.fingerprint.get_digest()
+
+    def same_fingerprint(self, other: 'RoadNetwork') -> bool:
+        """
+        Fast check of equality (does not compare networks object by object, as '__eq__' does).
+
+        :param other: Road network class to check against
+        :return: True if road networks have the same fingerprint (structure), False otherwise
+        """
+        return isinstance(other, RoadNetwork) and self.get_fingerprint() == other.get_fingerprint()
+
+    def get_spatial_index(self) -> SpatialIndex:
+        """
+        :return: Spatial index over junctions and edges of network (built on first call after change)
+        """
+        if self.spatial_index is None:
+            self.spatial_index = SpatialIndex(self.junctions.values(), self.edges.values())
+        return self.spatial_index
+
     # -------------------------------------------- Set Operators --------------------------------------------
 
     def intersection(self, other: 'RoadNetwork') -> Optional['RoadNetwork']:
@@ -212,20 +303,69 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
             ret_val.remove_junction(junction_id)
         return ret_val
 
-    def union(self, other: 'RoadNetwork') -> Optional['RoadNetwork']:
+    def union(self, other: 'RoadNetwork', reference: Optional['RoadNetwork'] = None) -> Optional['RoadNetwork']:
         """
         Performs set union on RoadNetwork classes (graphs of road networks), based on objects id's.
+        Objects are not copied (new network references objects of both networks), only junctions
+        on the seam (common for both networks) are created anew, with connections of both networks merged,
+        use method 'load' on the result to get independent copy.
 
-        :param other: RoadNetwork class, must have at least one common junction
+        :param other: RoadNetwork class (loaded from the same network), can be disjoint with this one
+        :param reference: network both were created from (optional), if given, connections of junctions
+        on the seam are taken from it (connections between routes of different networks are restored)
         :return: New RoadNetwork class, None if error occurred
         """
         if not isinstance(other, RoadNetwork):
             print(f"Graph union operation expects 'other' to be of type 'RoadNetwork', got: '{type(other)}'")
             return None
-        elif not (self.edges.keys() & other.edges.keys()):
-            print(f"Graph union cannot be executed, graphs have no common edge!")
-            return None
-        raise NotImplementedError("Error, union of graphs is not implemented!")
+        seam: Set[str] = (self.junctions.keys() & other.junctions.keys())
+        # Objects with the same id must have the same internal id
+        for objects, other_objects in (
+                (self.junctions, other.junctions), (self.edges, other.edges), (self.routes, other.routes)
+                ):
+            for object_id in (objects.keys() & other_objects.keys()):
+                if objects[object_id].internal_id != other_objects[object_id].internal_id:
+                    print(f"Graph union cannot be executed, object: '{object_id}' has different internal id's!")
+                    return None
+        ret_val: RoadNetwork = RoadNetwork(self.name)
+        ret_val.map_name = self.map_name
+        ret_val.roundabouts = self.roundabouts + [
+            roundabout for roundabout in other.roundabouts if roundabout not in self.roundabouts
+        ]
+        # Merge containers by id's (objects of self take precedence)
+        for container, self_container, other_container in (
+                (ret_val._junction_container, self._junction_container, other._junction_container),
+                (ret_val._edge_container, self._edge_container, other._edge_container),
+                (ret_val._route_container, self._route_container, other._route_container)
+                ):
+            container.objects.update(other_container.objects)
+            container.objects.update(self_container.objects)
+            container.internal_objects.update(other_container.internal_objects)
+            container.internal_objects.update(self_container.internal_objects)
+        # Create junctions on the seam
+        for junction_id in seam:
+            junction: Junction = copy(self.junctions[junction_id])
+            junction.connections = {}
+            if reference is not None and reference.junction_exists(junction_id, False):
+                ret_val.reconnect(junction, reference.get_junction(junction_id))
+            else:
+                for connections in (self.junctions[junction_id].connections, other.junctions[junction_id].connections):
+                    for in_route, out_routes in connections.items():
+                        merged: List[Route] = junction.connections.setdefault(in_route, [])
+                        merged.extend(out_route for out_route in out_routes if out_route not in merged)
+            ret_val.junctions[junction_id] = junction
+        # Merge connections of edges and fringe junctions
+        for connections in (other.edge_connections, self.edge_connections):
+            for edge_id, incoming in connections.items():
+                ret_val.edge_connections.setdefault(edge_id, set()).update(incoming)
+        for edge_id, incoming in ret_val.get_edges_connections(seam).items():
+            ret_val.edge_connections.setdefault(edge_id, set()).update(incoming)
+        ret_val.starting_junctions = (self.starting_junctions | other.starting_junctions) - seam
+        ret_val.ending_junctions = (self.ending_junctions | other.ending_junctions) - seam
+        for junction_id in seam:
+            ret_val.check_fringe(ret_val.junctions[junction_id])
+        ret_val.update_fingerprint()
+        return ret_val
 
     def difference(self, other: 'RoadNetwork') -> Optional['RoadNetwork']:
         """
@@ -237,16 +377,155 @@ class RoadNetwork(JunctionManager, EdgeManager, RouteManager):
         if not isinstance(other, RoadNetwork):
             print(f"Graph difference operation expects 'other' to be of type 'RoadNetwork', got: '{type(other)}'")
             return None
-        # Prepare new Graph
+        # Unite both together, prepare new Graph (union shares objects with both graphs)
+        united: Optional[RoadNetwork] = self.union(other)
+        if united is None:
+            return None
         ret_val: RoadNetwork = RoadNetwork()
-        ret_val.load(self)
-        # Unite both together
-        ret_val = ret_val.union(other)
+        ret_val.load(united)
         # Remove what is common for both graphs
         for common_junction_id in (self.junctions.keys() & other.junctions.keys()):
             ret_val.remove_junction(common_junction_id)
         return ret_val
 
+    def reconnect(self, junction: Junction, reference: Junction) -> None:
+        """
+        Sets connections of junction to those of reference junction, limited to routes of this network,
+        out-going routes of missing in-coming routes become starting (same as when removing routes).
+
+        :param junction: of this network
+        :param reference: the same junction in the network this one was created from
+        :return: None
+        """
+        for in_route, out_routes in reference.connections.items():
+            out_routes = [
+                self.get_route(out_route.get_id(True)) for out_route in out_routes
+                if self.route_exists(out_route.get_id(True), False)
+            ]
+            if in_route is not None and self.route_exists(in_route.get_id(True), False):
+                in_route = self.get_route(in_route.get_id(True))
+            elif not out_routes:
+                continue
+            else:
+                in_route = None
+            merged: List[Route] = junction.connections.setdefault(in_route, [])
+            merged.extend(out_route for out_route in out_routes if out_route not in merged)
+        return
+
+    # -------------------------------------------- Diff & Patch --------------------------------------------
+
+    def diff(self, other: 'RoadNetwork') -> Optional[NetworkDiff]:
+        """
+        :param other: newer version of this network (e.g. map after modification)
+        :return: Differences needed to turn this network into the other one, None if error occurred
+        """
+        if not isinstance(other, RoadNetwork):
+            print(f"Graph diff operation expects 'other' to be of type 'RoadNetwork', got: '{type(other)}'")
+            return None
+        ret_val: NetworkDiff = NetworkDiff(self.name, other.name)
+        ret_val.compute((self.junctions, self.edges, self.routes), (other.junctions, other.edges, other.routes))
+        if self.roundabouts != other.roundabouts:
+            ret_val.roundabouts = [list(roundabout) for roundabout in other.roundabouts]
+        return ret_val
+
+    def patch(self, diff: NetworkDiff) -> Optional[Set[int]]:
+        """
+        Applies differences to this network in place, only objects affected by differences are changed,
+        spatial index is invalidated only when junctions or edges change.
+
+        :param diff: differences computed by 'diff' method (against this network)
+        :return: Internal id's of routes whose lengths or connections changed (of both old and new routes),
+        used to invalidate dependent caches, None if error occurred
+        """
+        if diff.removed_junctions - self.junctions.keys() or diff.removed_edges - self.edges.keys():
+            print(f"Unable to patch network: '{self.name}', difference was not computed against it!")
+            return None
+        routes: Dict[RouteKey, Route] = diff.get_route_keys(self.routes.values())
+        affected: Set[str] = diff.get_affected_junctions()
+        # Routes which are removed, change their length, or go trough junctions of changed connections
+        changed: Set[int] = {
+            route.internal_id for key, route in routes.items()
+            if key in diff.removed_routes or any(edge_id in diff.modified_edges for edge_id in key)
+        }
+        changed.update(
+            route.internal_id for junction_id in (affected & self.junctions.keys())
+            for route in self.junctions[junction_id].get_routes()
+        )
+        # -------------------------- Removal --------------------------
+        for key in diff.removed_routes:
+            if key in routes and self.route_exists(routes[key], False):
+                self.remove_route(routes.pop(key), False)
+        for edge_id in diff.removed_edges:
+            if self.edge_exists(edge_id, False) and not self.remove_edge(edge_id):
+                return None
+        for junction_id in diff.removed_junctions:
+            if self.junction_exists(junction_id, False) and not self.remove_junction(junction_id):
+                return None
+        routes = {key: route for key, route in routes.items() if self.route_exists(route, False)}
+        # -------------------------- Modification --------------------------
+        for junction_id, new_junction in diff.modified_junctions.items():
+            junction: Junction = self.get_junction(junction_id)
+            self.fingerprint.remove("junctions", NetworkFingerprint.junction_hash(junction))
+            junction.x, junction.y, junction.traffic_lights = diff.junction_state(new_junction)
+            junction.attributes = dict(new_junction.attributes)
+            self.fingerprint.add("junctions", NetworkFingerprint.junction_hash(junction))
+        for edge_id, new_edge in diff.modified_edges.items():
+            edge: Edge = self.get_edge(edge_id)
+            self.fingerprint.remove("edges", NetworkFingerprint.edge_hash(edge))
+            edge.length, edge.speed, edge.lanes = new_edge.length, new_edge.speed, deepcopy(new_edge.lanes)
+            edge.attributes = dict(new_edge.attributes)
+            self.fingerprint.add("edges", NetworkFingerprint.edge_hash(edge))
+        if diff.modified_junctions or diff.modified_edges:
+            self.spatial_index = None
+        # -------------------------- Addition --------------------------
+        for junction_id, new_junction in diff.added_junctions.items():
+            internal_id: int = max(self._junction_container.internal_objects, default=-1) + 1
+            if not self.add_junction(Junction(dict(new_junction.attributes, id=junction_id), internal_id)):
+                return None
+        for edge_id, new_edge in diff.added_edges.items():
+            internal_id: int = max(self._edge_container.internal_objects, default=-1) + 1
+            if not self.add_edge(Edge(dict(new_edge.attributes), deepcopy(new_edge.lanes), internal_id)):
+                return None
+        for key, new_route in diff.added_routes.items():
+            internal_id: int = max(self._route_container.internal_objects, default=-1) + 1
+            route_id, suffix = new_route.id, internal_id
+            while route_id in self.routes:
+                route_id = f"r{suffix}"
+                suffix += 1
+            route: Route = Route(self.get_edges(list(key)), route_id, internal_id)
+            if not self.add_route(route):
+                return None
+            routes[key] = route
+            changed.add(route.internal_id)
+        # -------------------------- Connections --------------------------
+        for junction_id, connections in diff.connections.items():
+            junction: Junction = self.get_junction(junction_id)
+            self.fingerprint.remove("connections", NetworkFingerprint.connections_hash(junction))
+            junction.connections = {}
+            for in_key, out_key in connections:
+                in_route: Optional[Route] = None if in_key is None else routes[in_key]
+                out_routes: List[Route] = junction.connections.setdefault(in_route, [])
+                if out_key is not None and routes[out_key] not in out_routes:
+                    out_routes.append(routes[out_key])
+            self.fingerprint.add("connections", NetworkFingerprint.connections_hash(junction))
+        # Connections of edges and fringe junctions
+        affected &= self.junctions.keys()
+        for edge_id in list(self.edge_connections.keys()):
+            if edge_id not in self.edges or self.edges[edge_id].from_junction in affected:
+                self.edge_connections.pop(edge_id)
+        for edge_id, incoming in self.get_edges_connections(affected).items():
+            self.edge_connections.setdefault(edge_id, set()).update(incoming)
+        for junction_id in affected:
+            self.starting_junctions.discard(junction_id)
+            self.ending_junctions.discard(junction_id)
+            self.check_fringe(self.junctions[junction_id])
+        if diff.roundabouts is not None:
+            self.roundabouts = [list(roundabout) for roundabout in diff.roundabouts]
+        changed.update(
+            route.internal_id for junction_id in affected for route in self.junctions[junction_id].get_routes()
+        )
+        return changed
+
     # -------------------------------------------------- Magics --------------------------------------------------
 
     def __eq__(self, other: 'RoadNetwork') -> bool:
@@ -0,0 +1,249 @@
+from utc.src.graph.network.parts import Edge, Junction
+import numpy as np
+from typing import List, Tuple, Optional, Iterable
+
+
+class GridIndex:
+    """
+    Class indexing points by uniform grid, points are sorted by their cell, so that
+    each column of cells (and its rows in range) forms contiguous slice of sorted points
+    """
+    def __init__(self, points: np.ndarray, cell_size: float):
+        """
+        :param points: array of (x, y) coordinates, shape (n, 2)
+        :param cell_size: size (width and height) of grid cells
+        """
+        self.points: np.ndarray = points.reshape(-1, 2).astype(np.float64)
+        self.cell_size: float = cell_size
+        self.origin: np.ndarray = self.points.min(axis=0) if len(self.points) else np.zeros(2)
+        cells: np.ndarray = self.get_cells(self.points)
+        self.rows: int = int(cells[:, 1].max()) + 1 if len(cells) else 1
+        keys: np.ndarray = cells[:, 0] * self.rows + cells[:, 1]
+        self.order: np.ndarray = np.argsort(keys, kind="stable")
+        self.keys: np.ndarray = keys[self.order]
+
+    def get_cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        :param points: array of (x, y) coordinates
+        :return: Array of (column, row) of cells points belong to
+        """
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def query_bbox(self, bbox: Tuple[float, float, float, float]) -> np.ndarray:
+        """
+        :param bbox: bounding box (min_x, min_y, max_x, max_y)
+        :return: Indexes of points inside bounding box
+        """
+        if not len(self.points):
+            return np.zeros(0, dtype=np.int64)
+        (min_col, min_row), (max_col, max_row) = self.get_cells(np.array([bbox[:2], bbox[2:]], dtype=np.float64))
+        columns: np.ndarray = np.arange(max(min_col, 0), min(max_col, self.get_columns() - 1) + 1)
+        candidates: np.ndarray = self.query_cells(
+            columns, np.full(len(columns), min_row), np.full(len(columns), max_row)
+        )
+        points: np.ndarray = self.points[candidates]
+        inside: np.ndarray = (
+            (points[:, 0] >= bbox[0]) & (points[:, 0] <= bbox[2]) &
+            (points[:, 1] >= bbox[1]) & (points[:, 1] <= bbox[3])
+        )
+        return candidates[inside]
+
+    def query_radius(self, point: Tuple[float, float], radius: float) -> np.ndarray:
+        """
+        :param point: center of circle (x, y)
+        :param radius: of circle
+        :return: Indexes of points inside circle, sorted by distance to center
+        """
+        candidates: np.ndarray = self.query_bbox(
+            (point[0] - radius, point[1] - radius, point[0] + radius, point[1] + radius)
+        )
+        distances: np.ndarray = np.hypot(*(self.points[candidates] - np.array(point, dtype=np.float64)).T)
+        inside: np.ndarray = (distances <= radius)
+        return candidates[inside][np.argsort(distances[inside], kind="stable")]
+
+    def query_nearest(self, point: Tuple[float, float], k: int = 1) -> np.ndarray:
+        """
+        Searches rings of cells around the cell of point, until k points are found and
+        no point outside of searched cells can be closer than the k-th found one.
+
+        :param point: (x, y) coordinates
+        :param k: number of nearest points
+        :return: Indexes of k nearest points, sorted by distance (fewer if there are less points)
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        center: np.ndarray = np.array(point, dtype=np.float64)
+        column, row = self.get_cells(center.reshape(1, 2))[0].tolist()
+        columns_count: int = self.get_columns()
+        candidates: np.ndarray = np.zeros(0, dtype=np.int64)
+        distances: np.ndarray = np.zeros(0, dtype=np.float64)
+        # Rings between the first one reaching the grid (point can be outside) and the one covering it whole
+        first: int = max(0, -column, column - columns_count + 1, -row, row - self.rows + 1)
+        last: int = max(column, columns_count - 1 - column, row, self.rows - 1 - row)
+        for ring in range(first, last + 1):
+            # Columns on the sides of ring contain all its rows, the other columns only the top and bottom cell
+            columns: np.ndarray = np.arange(max(column - ring, 0), min(column + ring, columns_count - 1) + 1)
+            side: np.ndarray = (np.abs(columns - column) == ring)
+            inner: np.ndarray = columns[~side]
+            top, bottom = np.full(len(inner), row - ring), np.full(len(inner), row + ring)
+            found: np.ndarray = self.query_cells(
+                np.concatenate((columns[side], inner, inner)),
+                np.concatenate((np.full(side.sum(), row - ring), top, bottom)),
+                np.concatenate((np.full(side.sum(), row + ring), top, bottom))
+            )
+            candidates = np.concatenate((candidates, found))
+            distances = np.concatenate((distances, np.hypot(*(self.points[found] - center).T)))
+            if len(candidates) < k:
+                continue
+            # Distance from point to the border of searched cells
+            low: np.ndarray = self.origin + (np.array([column, row]) - ring) * self.cell_size
+            high: np.ndarray = low + (2 * ring + 1) * self.cell_size
+            if np.partition(distances, k - 1)[k - 1] <= min(np.min(center - low), np.min(high - center)):
+                break
+        return candidates[np.argsort(distances, kind="stable")[:k]]
+
+    def query_cells(self, columns: np.ndarray, min_rows: np.ndarray, max_rows: np.ndarray) -> np.ndarray:
+        """
+        :param columns: of cells (must be inside of grid)
+        :param min_rows: first row of cells in each column
+        :param max_rows: last row of cells in each column (included)
+        :return: Indexes of points inside given cells
+        """
+        min_rows, max_rows = np.maximum(min_rows, 0), np.minimum(max_rows, self.rows - 1)
+        valid: np.ndarray = (min_rows <= max_rows)
+        columns, min_rows, max_rows = columns[valid], min_rows[valid], max_rows[valid]
+        starts: np.ndarray = np.searchsorted(self.keys, columns * self.rows + min_rows, side="left")
+        ends: np.ndarray = np.searchsorted(self.keys, columns * self.rows + max_rows, side="right")
+        if not len(columns) or not (ends - starts).sum():
+            return np.zeros(0, dtype=np.int64)
+        return self.order[np.concatenate([
+            np.arange(start, end) for start, end in zip(starts, ends) if end > start
+        ])]
+
+    def get_columns(self) -> int:
+        """
+        :return: Number of columns of grid (up to the last one containing points)
+        """
+        return int(self.keys[-1] // self.rows) + 1 if len(self.keys) else 0
+
+
+class SpatialIndex:
+    """
+    Class providing spatial queries (bounding box, radius, k-nearest) over
+    junctions (by coordinates) and edges (by centroids and bounding boxes of lane shapes)
+    """
+    def __init__(self, junctions: Iterable[Junction], edges: Iterable[Edge], cell_size: float = 0):
+        """
+        :param junctions: to be indexed
+        :param edges: to be indexed
+        :param cell_size: size of grid cells, if 0 it is derived from the average edge length (default)
+        """
+        self.junction_ids: List[str] = []
+        junction_points: List[Tuple[float, float]] = []
+        for junction in junctions:
+            self.junction_ids.append(junction.id)
+            junction_points.append(junction.get_position())
+        self.edge_ids: List[str] = []
+        self.edge_internal: List[int] = []
+        lengths: List[float] = []
+        bounds: List[Tuple[float, float, float, float]] = []
+        centroids: List[Tuple[float, float]] = []
+        for edge in edges:
+            shape: np.ndarray = np.concatenate([
+                np.asarray(lane["shape"], dtype=np.float64).reshape(-1, 2) for lane in edge.lanes.values()
+            ])
+            self.edge_ids.append(edge.id)
+            self.edge_internal.append(edge.internal_id)
+            lengths.append(edge.length)
+            centroids.append(tuple(np.round(shape.mean(axis=0), 3)))
+            bounds.append((*shape.min(axis=0), *shape.max(axis=0)))
+        self.junction_points: np.ndarray = np.array(junction_points, dtype=np.float64).reshape(-1, 2)
+        self.edge_centroids: np.ndarray = np.array(centroids, dtype=np.float64).reshape(-1, 2)
+        self.edge_bounds: np.ndarray = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        if cell_size <= 0:
+            cell_size = max(float(np.mean(lengths)) * 2, 1.) if lengths else 100.
+        self.junction_grid: GridIndex = GridIndex(self.junction_points, cell_size)
+        self.edge_grid: GridIndex = GridIndex(self.edge_centroids, cell_size)
+        # Largest distance of edge bounding box from its centroid (for overlap queries)
+        self.edge_extent: np.ndarray = np.zeros(2)
+        if len(self.edge_bounds):
+            self.edge_extent = np.max(np.maximum(
+                self.edge_centroids - self.edge_bounds[:, :2], self.edge_bounds[:, 2:] - self.edge_centroids
+            ), axis=0)
+
+    # ------------------------------------------ Junctions ------------------------------------------
+
+    def junctions_in_bbox(self, bbox: Tuple[float, float, float, float]) -> List[str]:
+        """
+        :param bbox: bounding box (min_x, min_y, max_x, max_y)
+        :return: List of junction id's inside bounding box
+        """
+        return [self.junction_ids[index] for index in self.junction_grid.query_bbox(bbox)]
+
+    def junctions_in_radius(self, point: Tuple[float, float], radius: float) -> List[str]:
+        """
+        :param point: center of circle (x, y)
+        :param radius: of circle
+        :return: List of junction id's inside circle (sorted by distance)
+        """
+        return [self.junction_ids[index] for index in self.junction_grid.query_radius(point, radius)]
+
+    def nearest_junctions(self, point: Tuple[float, float], k: int = 1) -> List[str]:
+        """
+        :param point: (x, y) coordinates
+        :param k: number of junctions
+        :return: List of k nearest junction id's (sorted by distance)
+        """
+        return [self.junction_ids[index] for index in self.junction_grid.query_nearest(point, k)]
+
+    # ------------------------------------------ Edges ------------------------------------------
+
+    def edges_in_bbox(self, bbox: Tuple[float, float, float, float], overlap: bool = False) -> List[str]:
+        """
+        :param bbox: bounding box (min_x, min_y, max_x, max_y)
+        :param overlap: True if edges whose shape overlaps bounding box should be returned,
+        False if only those with centroid inside (default)
+        :return: List of edge id's
+        """
+        if not overlap:
+            return [self.edge_ids[index] for index in self.edge_grid.query_bbox(bbox)]
+        candidates: np.ndarray = self.edge_grid.query_bbox((
+            bbox[0] - self.edge_extent[0], bbox[1] - self.edge_extent[1],
+            bbox[2] + self.edge_extent[0], bbox[3] + self.edge_extent[1]
+        ))
+        bounds: np.ndarray = self.edge_bounds[candidates]
+        overlapping: np.ndarray = (
+            (bounds[:, 0] <= bbox[2]) & (bounds[:, 2] >= bbox[0]) &
+            (bounds[:, 1] <= bbox[3]) & (bounds[:, 3] >= bbox[1])
+        )
+        return [self.edge_ids[index] for index in candidates[overlapping]]
+
+    def edges_in_radius(self, point: Tuple[float, float], radius: float) -> List[str]:
+        """
+        :param point: center of circle (x, y)
+        :param radius: of circle
+        :return: List of edge id's with centroid inside circle (sorted by distance)
+        """
+        return [self.edge_ids[index] for index in self.edge_grid.query_radius(point, radius)]
+
+    def nearest_edges(self, point: Tuple[float, float], k: int = 1) -> List[str]:
+        """
+        :param point: (x, y) coordinates
+        :param k: number of edges
+        :return: List of k edge id's with the nearest centroids (sorted by distance)
+        """
+        return [self.edge_ids[index] for index in self.edge_grid.query_nearest(point, k)]
+
+    # ------------------------------------------ Utils ------------------------------------------
+
+    def get_centroid_matrix(self, size: Optional[int] = None) -> np.ndarray:
+        """
+        :param size: number of rows (default is the highest internal id of edge + 1)
+        :return: Matrix of edge centroids, indexed by internal id's of edges
+        """
+        if size is None:
+            size = (max(self.edge_internal) + 1) if self.edge_internal else 0
+        matrix: np.ndarray = np.zeros(shape=(size, 2), dtype=np.float64)
+        matrix[self.edge_internal] = self.edge_centroids
+        return matrix
@@ -0,0 +1,100 @@
+from utc.src.routing.pddl.base.pddl_struct import PddlStruct
+import re
+from hashlib import sha256
+from typing import Dict, List
+
+
+class PddlFingerprint:
+    """
+    Class computing canonical fingerprint of pddl problem, which is invariant
+    to the ordering of objects and states and to the naming of vehicles
+    (including their artificial starting and ending junctions).
+    Provides methods to translate plans between canonical and problem representation.
+    """
+    # Pattern matching pddl tokens (names, numbers) in states
+    _token = re.compile(r"[^\s()]+")
+
+    def __init__(self, problem: PddlStruct, domain: str, vehicle_group: str = "car", network: str = ""):
+        """
+        :param problem: pddl problem (before its objects and states are cleared)
+        :param domain: name of pddl domain of the problem
+        :param vehicle_group: name of group used by vehicles
+        :param network: fingerprint of road network of the problem (plans of patched networks are not shared)
+        """
+        self.digest: str = ""
+        # Mapping of: pddl name -> canonical name (vehicles and their junctions)
+        self.to_canonical: Dict[str, str] = {}
+        # Mapping of: canonical name -> pddl name
+        self.from_canonical: Dict[str, str] = {}
+        self.compute(problem, domain, vehicle_group, network)
+
+    def compute(self, problem: PddlStruct, domain: str, vehicle_group: str, network: str = "") -> str:
+        """
+        Vehicles are ordered by their signature (states they appear in, with their own name
+        replaced by placeholder), vehicles with the same signature are interchangeable.
+
+        :param problem: pddl problem (before its objects and states are cleared)
+        :param domain: name of pddl domain of the problem
+        :param vehicle_group: name of group used by vehicles
+        :param network: fingerprint of road network of the problem
+        :return: Hexadecimal digest of canonical problem
+        """
+        vehicles: List[str] = problem.object.get(vehicle_group, [])
+        # Mapping of names related to vehicles (vehicle, starting & ending junction) to vehicle
+        owners: Dict[str, str] = {}
+        for vehicle in vehicles:
+            owners[vehicle] = owners[f"js{vehicle}"] = owners[f"je{vehicle}"] = vehicle
+        signatures: Dict[str, List[str]] = {vehicle: [] for vehicle in vehicles}
+        for state in (problem.init + problem.goal):
+            for vehicle in {owners[token] for token in self._token.findall(state) if token in owners}:
+                signatures[vehicle].append(self._rename(state, {
+                    vehicle: "?", f"js{vehicle}": "js?", f"je{vehicle}": "je?"
+                }))
+        ordered: List[str] = sorted(vehicles, key=lambda vehicle_id: sorted(signatures[vehicle_id]))
+        for index, vehicle in enumerate(ordered):
+            self.to_canonical[vehicle] = f"c{index}"
+            self.to_canonical[f"js{vehicle}"] = f"jsc{index}"
+            self.to_canonical[f"je{vehicle}"] = f"jec{index}"
+        self.from_canonical = {value: key for key, value in self.to_canonical.items()}
+        # Construct canonical problem
+        canonical: List[str] = [f"(:domain {domain})", f"(:network {network})"]
+        for group in sorted(problem.object.keys()):
+            canonical.append(
+                " ".join(sorted(self.to_canonical.get(name, name) for name in problem.object[group])) + f" - {group}"
+            )
+        canonical += sorted(self._rename(state, self.to_canonical) for state in problem.init)
+        canonical += sorted(self._rename(state, self.to_canonical) for state in problem.goal)
+        self.digest = sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+        return self.digest
+
+    # ------------------------------------ Utils ------------------------------------
+
+    def canonize_plan(self, plan: List[str]) -> List[str]:
+        """
+        :param plan: lines of pddl result file (actions) of this problem
+        :return: Lines of plan with canonical names
+        """
+        return [self._rename(line, self.to_canonical) for line in plan]
+
+    def restore_plan(self, plan: List[str]) -> List[str]:
+        """
+        :param plan: lines of pddl result file with canonical names
+        :return: Lines of plan with names of this problem
+        """
+        return [self._rename(line, self.from_canonical) for line in plan]
+
+    def _rename(self, state: str, mapping: Dict[str, str]) -> str:
+        """
+        :param state: pddl state (or action)
+        :param mapping: of names to be replaced
+        :return: State with replaced names
+        """
+        return self._token.sub(lambda match: mapping.get(match.group(0), match.group(0)), state)
+
+    # ------------------------------------ Magic Methods ------------------------------------
+
+    def __str__(self) -> str:
+        """
+        :return: Digest of fingerprint
+        """
+        return self.digest
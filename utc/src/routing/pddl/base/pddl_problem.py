@@ -1,5 +1,6 @@
 from utc.src.constants.static import FileExtension
 from utc.src.routing.pddl.base.pddl_struct import PddlStruct
+from utc.src.routing.pddl.base.pddl_fingerprint import PddlFingerprint
 from utc.src.routing.pddl.base.vehicle_container import VehicleContainer
 from utc.src.routing.pddl.info.episode_info import ProblemInfo
 from utc.src.graph import RoadNetwork
@@ -35,6 +36,8 @@ class PddlProblem(PddlStruct):
         self.network: Optional[RoadNetwork] = network
         self.container: Optional[VehicleContainer] = vehicles
         self.info: ProblemInfo = ProblemInfo(self.name)
+        # Canonical fingerprint, computed on demand (by ResultGenerator, when plan store is used)
+        self.fingerprint: Optional[PddlFingerprint] = None
 
     # ------------------------------------ Utils ------------------------------------
 
@@ -1,7 +1,8 @@
 from utc.src.constants.static.file_constants import FileExtension
 from utc.src.constants.file_system.my_file import MyFile
 from utc.src.routing.pddl.info.episode_info import ResultInfo
-from typing import Dict, List
+from os.path import basename
+from typing import Dict, List, Tuple
 
 
 class PddlResult:
@@ -31,7 +32,7 @@ class PddlResult:
     def parse_result(self) -> Dict[str, List[int]]:
         """
         Parses result files of this pddl result file, replaces results (car and route pairs) in case of multiple
-        being generated for the same problem file (assumes lexicographical ordering).
+        being generated for the same problem file (assumes files are ordered by plan index, see 'sort_files').
 
         :return: Dictionary mapping vehicle id (abstract) to list of route id's (internal)
         :raise ValueError: if files are empty
@@ -40,12 +41,15 @@ class PddlResult:
         if not self.files:
             raise ValueError(f"Error, empty list of files in pddl result: '{self.name}'")
         paths: Dict[str, List[int]] = {}
-        # Replace previous pddl result by next (assuming lexicographical ordering for better results)
+        # Replace previous pddl result by next (later plans are better)
         for file in self.files:
             curr_paths: Dict[str, List[int]] = {}
             with open(file, "r") as pddl_result:
                 for line in pddl_result:
                     line = line.rstrip()
+                    # Skip comments (e.g. plan cost) and empty lines
+                    if not line or line.startswith(";"):
+                        continue
                     assert(line.startswith("(") and line.endswith(")"))
                     line = line[1:-1].split()
                     assert(line[1].startswith("v"))
@@ -57,3 +61,55 @@ class PddlResult:
             # Replaces keys by new ones
             paths |= curr_paths
         return paths
+
+    @staticmethod
+    def sort_files(files: List[str]) -> List[str]:
+        """
+        :param files: pddl result files (plans) of the same problem, e.g. 'result.pddl.2', 'result.pddl.10'
+        :return: Files sorted by plan index (file without index first), i.e. the best plan is the last one
+        """
+        def plan_index(file: str) -> Tuple[int, str]:
+            """
+            :param file: pddl result file
+            :return: Index of plan (-1 if file has none) and path to file
+            """
+            indexes: List[str] = [part for part in basename(file).split(".")[1:] if part.isdigit()]
+            return (int(indexes[-1]) if indexes else -1), file
+        return sorted(files, key=plan_index)
+
+    @staticmethod
+    def is_complete(file: str) -> bool:
+        """
+        :param file: pddl result file (plan), possibly still being written by planner
+        :return: True if planner finished writing the plan (its last line is the
+        cost comment '; cost = X'), False otherwise
+        """
+        last: str = ""
+        try:
+            with open(file, "r") as pddl_result:
+                for line in pddl_result:
+                    if line.strip():
+                        last = line
+        except OSError:
+            return False
+        return last.endswith("\n") and last.startswith(";") and "cost" in last and "=" in last
+
+    @staticmethod
+    def get_cost(file: str) -> float:
+        """
+        :param file: pddl result file (plan)
+        :return: Cost of plan given by planner (comment '; cost = X'), number of actions
+        if planner did not state it, infinity if file cannot be read
+        """
+        actions: int = 0
+        try:
+            with open(file, "r") as pddl_result:
+                for line in pddl_result:
+                    line = line.strip()
+                    if line.startswith(";") and "cost" in line and "=" in line:
+                        return float(line.split("=")[1].split()[0])
+                    actions += line.startswith("(")
+        except (OSError, ValueError, IndexError) as e:
+            print(f"Error: '{e}' while reading cost of pddl result: '{file}'")
+            return float("inf")
+        return actions
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from copy import deepcopy
 
 
@@ -84,6 +84,37 @@ class PddlStruct:
             ret_val += (goal_state + "\n")
         return ret_val + "))\n"
 
+    def load(self, file_path: str) -> bool:
+        """
+        Loads ':objects', ':init', ':goal' from pddl problem file (written by this class),
+        previous data structures are cleared.
+
+        :param file_path: path to pddl problem file
+        :return: True on success, false otherwise
+        """
+        self.clear()
+        try:
+            with open(file_path, "r") as pddl_file:
+                lines: List[str] = pddl_file.read().splitlines()
+        except OSError as e:
+            print(f"Error: '{e}' while reading pddl problem file: {file_path}!")
+            return False
+        # Header of the current section, None if line is outside of sections
+        section: Optional[str] = None
+        for line in lines:
+            if line in ("(:objects", "(:init", "(:goal (and"):
+                section = line
+            elif line in (")", "))"):
+                section = None
+            elif section == "(:objects":
+                objects, group_name = line.rsplit(" - ", 1)
+                self.object.setdefault(group_name, []).extend(objects.split())
+            elif section == "(:init":
+                self.init.append(line)
+            elif section is not None:
+                self.goal.append(line)
+        return True
+
     def clear(self) -> None:
         """
         Clears all data structures
@@ -143,16 +143,8 @@ class NetworkDomain:
                 problem.add_init_state(predicate)
             # Maximum capacity (after it becomes congested)
             problem.add_init_state(f"(cap r{route.get_id(True)} use{capacity})")
-            # Check current number of cars on route
-            vehicle_count: int = 0
-            if occupied:
-                # Check how many edges does route have in common with occupied edges, add vehicles
-                for edge_id in (occupied.keys() & set(route.get_edge_ids())):
-                    vehicle_count += occupied[edge_id]
-                # Maximal amount of vehicles cannot surpass capacity
-                vehicle_count = min(vehicle_count, capacity)
             # Add predicate with the current usage of road
-            problem.add_init_state(f"(using r{route.get_id(True)} use{vehicle_count})")
+            problem.add_init_state(f"(using r{route.get_id(True)} use{self.get_usage(route, occupied)})")
         # Add 'use', 'next' predicate (to calculate how many cars are on road)
         for i in range(max_capacity):
             problem.add_init_state(f"(next use{i} use{i + 1})")
@@ -173,6 +165,7 @@ class NetworkDomain:
         for pddl_vehicle in problem.container.get_planned_vehicles():
             for route_id in pddl_vehicle.sub_graph:
                 problem.add_init_state(f"(allowed {pddl_vehicle.pddl_id} r{route_id})")
+            problem.info.allowed += len(pddl_vehicle.sub_graph)
         # print("Finished generating allowed predicate for sub-graphs")
         return True
     # ---------------------------------------- Utils ----------------------------------------
@@ -221,6 +214,22 @@ class NetworkDomain:
                 connection_added = True
         return routes_mapping
 
+    # noinspection PyMethodMayBeStatic
+    def get_usage(self, route: Route, occupied: Dict[str, int]) -> int:
+        """
+        :param route: of road network
+        :param occupied: mapping of edges to number of vehicles currently driving on them
+        :return: Number of vehicles currently on route (cannot surpass its capacity)
+        """
+        vehicle_count: int = 0
+        if occupied:
+            # Check how many edges does route have in common with occupied edges, add vehicles
+            for edge_id in (occupied.keys() & set(route.get_edge_ids())):
+                vehicle_count += occupied[edge_id]
+            # Maximal amount of vehicles cannot surpass capacity
+            vehicle_count = min(vehicle_count, route.get_capacity())
+        return vehicle_count
+
     # noinspection PyMethodMayBeStatic
     def get_thresholds(self, capacity: int) -> Dict[str, int]:
         """
@@ -264,15 +273,26 @@ class NetworkDomain:
         :param route: to be calculated
         :return: List of predicates representing penalization based on route congestion
         """
+        route_id: str = f"r{route.get_id(True)}"
+        return [
+            f"(= (length-{density_type} {route_id}) {length})"
+            for density_type, length in self.get_penalization(route).items()
+        ]
+
+    # noinspection PyMethodMayBeStatic
+    def get_penalization(self, route: Route) -> Dict[str, int]:
+        """
+        :param route: to be calculated
+        :return: Mapping of traffic density to cost of driving on route
+        """
         assert(len(route.edge_list) == 1)
         cost: float = route.get_average_traveling_time()
         if cost < 1:
             print(f"Route cost: {cost} of: {route}")
             quit()
         assert (cost >= 1)
-        route_id: str = f"r{route.get_id(True)}"
-        return [
-            f"(= (length-light {route_id}) {int(cost * NetworkCapacity.LIGHT_CAPACITY_MULTIPLIER)})",
-            f"(= (length-medium {route_id}) {int(cost * NetworkCapacity.MEDIUM_CAPACITY_MULTIPLIER)})",
-            f"(= (length-heavy {route_id}) {int(cost * NetworkCapacity.HEAVY_CAPACITY_MULTIPLIER)})"
-        ]
+        return {
+            "light": int(cost * NetworkCapacity.LIGHT_CAPACITY_MULTIPLIER),
+            "medium": int(cost * NetworkCapacity.MEDIUM_CAPACITY_MULTIPLIER),
+            "heavy": int(cost * NetworkCapacity.HEAVY_CAPACITY_MULTIPLIER)
+        }
@@ -0,0 +1,52 @@
+from utc.src.routing.pddl.domains.network_domain import NetworkDomain
+from utc.src.routing.pddl.base.pddl_problem import PddlProblem
+from utc.src.graph import Route
+from typing import Dict, List
+
+
+class NumericNetworkDomain(NetworkDomain):
+    """
+    Class holding representation of road networks for '.pddl' problem files
+    of numeric domain ('utc_numeric'), usage of roads is represented by numeric
+    fluents instead of 'use' objects, which keeps the number of ground actions
+    independent of road capacities.
+    """
+    def __init__(self):
+        super().__init__()
+
+    def process_routes(self, problem: PddlProblem) -> bool:
+        """
+        Adds functions related to routes, e.g.: object definition, capacity thresholds, penalization, usage
+
+        :param problem: instance of pddl problem
+        :return: True on success, false otherwise
+        """
+        #  --------------- Extend network ---------------
+        # Add functions: 'usage', 'light-cap', 'medium-cap', 'cap', 'length-light/medium/heavy'
+        occupied: Dict[str, int] = problem.container.get_occupied_edges()
+        for route in problem.network.routes.values():
+            problem.add_object(self.route_group_name, f"r{route.get_id(True)}")
+            assert (route.get_capacity() > 0)
+            # Route penalization
+            for predicate in self.add_penalization(route):
+                problem.add_init_state(predicate)
+            # Route capacity thresholds
+            for predicate in self.add_thresholds(route):
+                problem.add_init_state(predicate)
+            # Current usage of road
+            problem.add_init_state(f"(= (usage r{route.get_id(True)}) {self.get_usage(route, occupied)})")
+        problem.info.routes = len(problem.network.routes)
+        return True
+
+    def add_thresholds(self, route: Route) -> List[str]:
+        """
+        :param route: to be calculated
+        :return: List of functions representing cumulative capacity of each congestion type (light/medium/heavy)
+        """
+        route_id: str = f"r{route.get_id(True)}"
+        thresholds: Dict[str, int] = self.get_thresholds(route.get_capacity())
+        return [
+            f"(= (light-cap {route_id}) {thresholds['light']})",
+            f"(= (medium-cap {route_id}) {thresholds['light'] + thresholds['medium']})",
+            f"(= (cap {route_id}) {route.get_capacity()})"
+        ]
@@ -1,6 +1,6 @@
 import time
 from dataclasses import dataclass, asdict
-from typing import Optional
+from typing import Optional, Dict
 
 
 @dataclass
@@ -11,6 +11,10 @@ class VehicleInfo:
     routed: int = 0         # How many vehicles were routed by planner
     short_route: int = 0    # How many were discarded because of short route (<3 edges)
     invalid_route: int = 0  # No route found (self loop), or only 1 route found
+    fallback: int = 0       # How many vehicles were routed by fallback router (instead of planner)
+    assigned: int = 0       # How many new routes were assigned to vehicles in simulation (online mode)
+    late: int = 0           # Vehicle left simulation or passed divergence of its new route before assignment
+    rejected: int = 0       # New route was invalid (disconnected, not matching vehicle's route) or refused
 
     def __add__(self, other: 'VehicleInfo') -> 'VehicleInfo':
         """
@@ -22,6 +26,10 @@ class VehicleInfo:
         self.routed += other.routed
         self.short_route += other.short_route
         self.invalid_route += other.invalid_route
+        self.fallback += other.fallback
+        self.assigned += other.assigned
+        self.late += other.late
+        self.rejected += other.rejected
         return self
 
 
@@ -32,6 +40,7 @@ class ProblemInfo:
     time: float         # Time taken (seconds) to generate & save problem file to disk (3 digit precision)
     routes: int = 0     # Total number of routes (in the network)
     junctions: int = 0  # Total number of junctions (in the network, does not account for splitting)
+    allowed: int = 0    # Total number of allowed predicates (sizes of vehicles sub-graphs)
 
     def __init__(self, name: str):
         """
@@ -56,6 +65,7 @@ class ProblemInfo:
         self.time += other.time
         self.routes += other.routes
         self.junctions += other.junctions
+        self.allowed += other.allowed
         return self
 
 
@@ -66,6 +76,8 @@ class ResultInfo:
     cost: int = 0         # Plan cost
     plans: int = 0        # How many plan files were generated for this problem
     timeout: float = 0.0  # How much time did planner have ? (3 digit precision)
+    stored: int = 0       # If plan was loaded from plan store (i.e. planner was not called)
+    time: float = 0.0     # Time (seconds) planner took to find the first plan (3 digit precision)
 
     def __add__(self, other: 'ResultInfo') -> 'ResultInfo':
         """
@@ -75,6 +87,8 @@ class ResultInfo:
         self.cost += other.cost
         self.plans += other.plans
         self.timeout += other.timeout
+        self.stored += other.stored
+        self.time += other.time
         return self
 
 
@@ -97,6 +111,8 @@ class EpisodeInfo:
         self.vehicle_info: VehicleInfo = vehicle_info
         self.problem_info: ProblemInfo = problem_info
         self.result_info: Optional[ResultInfo] = result_info
+        # Vehicle id -> outcome of assignment of its new route (online mode)
+        self.assignment: Dict[str, str] = {}
 
     def is_valid(self) -> bool:
         """
@@ -112,7 +128,8 @@ class EpisodeInfo:
             f"e{self.id}": {
                 "problem": asdict(self.problem_info),
                 "vehicle": asdict(self.vehicle_info),
-                "result": None if self.result_info is None else asdict(self.result_info)
+                "result": None if self.result_info is None else asdict(self.result_info),
+                "assignment": self.assignment
             }
         }
 
@@ -123,6 +140,7 @@ class EpisodeInfo:
         """
         assert(self.is_valid() and other.is_valid())
         self.vehicle_info += other.vehicle_info
+        self.assignment |= other.assignment
         self.problem_info += other.problem_info
         if self.is_valid() and other.is_valid():
             self.result_info += other.result_info
@@ -2,7 +2,8 @@ from utc.src.constants.options.options import Options
 from utc.src.constants.options.logging_options import LoggingOptions
 from utc.src.constants.options.misc_options import CpuOptions, InfoOptions
 from utc.src.constants.options.network_options import NetworkOptions
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+from typing import List
 
 
 @dataclass
@@ -13,6 +14,10 @@ class PddlInitOptions(Options):
     network: str
     mode: str = "offline"
     snapshot: str = None
+    # Backend running simulation in online mode (traci, libsumo, fake)
+    backend: str = "traci"
+    # Routes and vehicles of new scenario are compressed by gzip
+    compress: bool = False
 
     def validate_options(self) -> bool:
         return self.validate_data(asdict(self), "PddlInitOptions")
@@ -23,11 +28,25 @@ class PddlPlanningOptions(Options):
     """ Data class for planning """
     window: int = 30
     timeout: float = 27
+    adaptive: bool = False
+    min_window: int = 10
+    max_window: int = 120
+    # Pddl info file of previous planning, from which planning cost (of adaptive windows) is fitted
+    cost_model: str = ""
     planner: str = "Mercury"
+    # Planners (defined in PLANNERS) racing on the same problem, if empty only 'planner' is used
+    portfolio: List[str] = field(default_factory=list)
+    # Which plan of portfolio is accepted, either the 'first' found or 'best' by the timeout
+    race: str = "first"
+    # Greedy router used when planner found no result ('timeout'), or instead of planner ('baseline')
+    fallback: str = "none"
+    # Planner runs in background, while simulation continues (online mode)
+    asynchronous: bool = False
     domain: str = "utc_allowed"
     keep_problems: bool = True
     keep_results: bool = True
     keep_planner_output: bool = False
+    plan_store: bool = False
 
     def validate_options(self) -> bool:
         return self.validate_data(asdict(self), "PddlPlanningOptions")
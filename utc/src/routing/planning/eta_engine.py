@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Dict, List, Tuple, Iterable
+
+
+class EtaEngine:
+    """
+    Class estimating arrival times of vehicles trough their remaining routes, travel times of edges
+    are kept in array (indexed by internal indexes of edges), routes of vehicles are stored as arrays of
+    edge indexes in single buffer, so that ETA's of all vehicles are computed by single gather and cumulative sum.
+    """
+    def __init__(self, travel_times: Dict[str, float], alpha: float = 0.5):
+        """
+        :param travel_times: initial travel times of edges
+        :param alpha: smoothing factor of exponentially weighted moving average of travel
+        times (weight of new value), 1 means new values replace the old ones
+        """
+        assert(0 < alpha <= 1)
+        self.alpha: float = alpha
+        # Edge id -> index in array of travel times
+        self.edges: Dict[str, int] = {edge_id: index for index, edge_id in enumerate(travel_times.keys())}
+        self.travel_times: np.ndarray = np.fromiter(travel_times.values(), dtype=np.float64, count=len(travel_times))
+        # Routes of vehicles (edge indexes), vehicle id -> (offset, length) in buffer
+        self.buffer: np.ndarray = np.zeros(1024, dtype=np.int64)
+        self.size: int = 0
+        self.routes: Dict[str, Tuple[int, int]] = {}
+        self.unused: int = 0
+
+    # ------------------------------------------- Vehicles -------------------------------------------
+
+    def add_vehicle(self, vehicle_id: str, route: Iterable[str]) -> None:
+        """
+        :param vehicle_id: id of vehicle
+        :param route: edges of vehicle's route (replaces the previous one)
+        :return: None
+        """
+        self.remove_vehicle(vehicle_id)
+        indexes: np.ndarray = np.array([self.get_index(edge_id) for edge_id in route], dtype=np.int64)
+        if self.size + len(indexes) > len(self.buffer):
+            self.compact(len(indexes))
+        self.buffer[self.size:self.size + len(indexes)] = indexes
+        self.routes[vehicle_id] = (self.size, len(indexes))
+        self.size += len(indexes)
+
+    def remove_vehicle(self, vehicle_id: str) -> None:
+        """
+        :param vehicle_id: id of vehicle
+        :return: None
+        """
+        if vehicle_id in self.routes:
+            self.unused += self.routes.pop(vehicle_id)[1]
+        return
+
+    def get_edges(self, vehicle_id: str, start: int, end: int) -> np.ndarray:
+        """
+        :param vehicle_id: id of vehicle
+        :param start: index in vehicle's route
+        :param end: index in vehicle's route (excluded)
+        :return: Indexes of edges on vehicle's route between start and end
+        """
+        offset, length = self.routes[vehicle_id]
+        return self.buffer[offset + min(start, length):offset + min(end, length)]
+
+    # ------------------------------------------- Estimation -------------------------------------------
+
+    def update(self, travel_times: Dict[str, float], tolerance: float = 0.) -> np.ndarray:
+        """
+        :param travel_times: current travel times of edges (e.g. from simulation)
+        :param tolerance: relative change of travel time, for which edge is considered changed
+        :return: Indexes of edges, whose travel time changed by more than tolerance
+        """
+        if not travel_times:
+            return np.zeros(0, dtype=np.int64)
+        indexes: np.ndarray = np.fromiter(
+            (self.get_index(edge_id) for edge_id in travel_times.keys()), dtype=np.int64, count=len(travel_times)
+        )
+        values: np.ndarray = np.fromiter(travel_times.values(), dtype=np.float64, count=len(travel_times))
+        previous: np.ndarray = self.travel_times[indexes]
+        current: np.ndarray = self.alpha * values + (1 - self.alpha) * previous
+        self.travel_times[indexes] = current
+        return indexes[np.abs(current - previous) > tolerance * np.maximum(previous, 1e-3)]
+
+    def estimate(self, vehicle_ids: List[str], starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        :param vehicle_ids: id's of vehicles
+        :param starts: indexes of current edges in routes of vehicles
+        :param ends: indexes of the first edges in region (excluded from ETA)
+        :return: Estimated travel times of vehicles from their current edges to the region
+        """
+        if not vehicle_ids:
+            return np.zeros(0, dtype=np.float64)
+        offsets, lengths = np.array([self.routes[vehicle_id] for vehicle_id in vehicle_ids], dtype=np.int64).T
+        starts = np.clip(np.asarray(starts, dtype=np.int64), 0, lengths)
+        counts: np.ndarray = np.maximum(np.minimum(np.asarray(ends, dtype=np.int64), lengths) - starts, 0)
+        bounds: np.ndarray = np.concatenate(([0], np.cumsum(counts)))
+        # Positions in buffer of all remaining edges (routes of vehicles placed one after another)
+        positions: np.ndarray = (
+            np.arange(bounds[-1]) + np.repeat(offsets + starts - bounds[:-1], counts)
+        )
+        cumulative: np.ndarray = np.concatenate(([0.], np.cumsum(self.travel_times[self.buffer[positions]])))
+        return cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+
+    # ------------------------------------------- Utils -------------------------------------------
+
+    def get_index(self, edge_id: str) -> int:
+        """
+        :param edge_id: id of edge
+        :return: Index of edge (unknown edges are added with zero travel time)
+        """
+        index: int = self.edges.get(edge_id, -1)
+        if index == -1:
+            index = self.edges[edge_id] = len(self.edges)
+            self.travel_times = np.append(self.travel_times, 0.)
+        return index
+
+    def compact(self, required: int = 0) -> None:
+        """
+        Removes routes of removed vehicles from buffer, enlarges it if needed.
+
+        :param required: number of free positions required after compaction
+        :return: None
+        """
+        capacity: int = len(self.buffer)
+        while (self.size - self.unused + required) * 2 > capacity:
+            capacity *= 2
+        buffer: np.ndarray = np.zeros(capacity, dtype=np.int64)
+        size: int = 0
+        for vehicle_id, (offset, length) in self.routes.items():
+            buffer[size:size + length] = self.buffer[offset:offset + length]
+            self.routes[vehicle_id] = (size, length)
+            size += length
+        self.buffer, self.size, self.unused = buffer, size, 0
@@ -1,9 +1,9 @@
 from utc.src.routing.pddl.pddl_episode import PddlEpisode
 from utc.src.routing.pddl.pddl_options import PddlOptions
-from utc.src.routing.traffic import ResultGenerator, ProblemGenerator, Parser
+from utc.src.routing.traffic import ResultGenerator, ProblemGenerator, Parser, FallbackRouter
 from utc.src.simulator.scenario import Scenario
 from utc.src.graph import Graph, RoadNetwork
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 
 class Mode:
@@ -22,6 +22,7 @@ class Mode:
         self.problem_generator: Optional[ProblemGenerator] = None
         self.result_generator: Optional[ResultGenerator] = None
         self.parser: Optional[Parser] = None
+        self.fallback_router: Optional[FallbackRouter] = None
         assert(self._initialize())
         print(f"Successfully initialized PDDL {self.__class__.__name__} mode.")
 
@@ -39,6 +40,9 @@ class Mode:
             return False
         elif not self.scenario.exists():
             return False
+        # New routes and vehicles are written to files as they are planned
+        elif not self.new_scenario.stream(self.options.init.compress):
+            return False
         # Initialize graph
         self.graph: Graph = Graph(RoadNetwork())
         if not self.graph.loader.load_map(self.scenario.config_file.get_network()):
@@ -51,8 +55,10 @@ class Mode:
                 return False
         # Initialize pddl classes
         self.problem_generator = ProblemGenerator(self.new_scenario, self.options.network, self.graph, sub_graph)
-        self.result_generator = ResultGenerator(self.new_scenario.scenario_dir)
+        self.result_generator = ResultGenerator(self.options.planning)
         self.parser = Parser(self.problem_generator.network_builder.graph, self.problem_generator.network_builder.sub_graph)
+        if self.options.planning.fallback != "none":
+            self.fallback_router = FallbackRouter()
         return True
 
     def generate_episodes(self) -> Optional[List[PddlEpisode]]:
@@ -73,7 +79,12 @@ class Mode:
         if episode is None or episode.problem is None:
             print("Error, received invalid episode!")
             return False
-        for (vehicle, route) in self.parser.process_result(episode).items():
+        # Route vehicles by fallback router, if planner did not find any result
+        paths: Optional[Dict[str, List[int]]] = None
+        if self.fallback_router is not None and not episode.is_valid() and episode.problem.is_valid():
+            paths = self.fallback_router.route_vehicles(episode.problem)
+            episode.problem.container.info.fallback = len(paths)
+        for (vehicle, route) in self.parser.process_result(episode, paths).items():
             route_id: str = self.new_scenario.routes_file.add_route(route, re_index=True)
             vehicle.attrib["route"] = route_id
             self.new_scenario.vehicles_file.add_vehicle(vehicle)
@@ -1,4 +1,5 @@
 from utc.src.routing.planning.mode import Mode, PddlOptions
+from utc.src.routing.planning.window_scheduler import WindowScheduler
 from utc.src.routing.pddl.pddl_episode import PddlEpisode, PddlProblem, PddlResult
 from utc.src.utils.vehicle_extractor import VehicleExtractor, VehicleEntry
 import time
@@ -23,23 +24,28 @@ class Offline(Mode):
         problems: List[PddlProblem] = [problem for problem in it]
         self.problem_generator = None  # Free memory of problem generator
         print(f"Generated: {len(problems)} problems in: {round(time.time() - now, 3)} sec.")
-        # From generate problem files, generate results
-        results: List[Optional[PddlResult]] = self.result_generator.generate_results(
-            problems, self.options.planning.domain,
-            self.options.planning.planner,
-            self.new_scenario.scenario_dir,
-            self.options.planning.timeout,
-            self.options.cpu.processes
-        )
+        # From generate problem files, generate results (planner is not used for baseline)
+        results: List[Optional[PddlResult]] = [None] * len(problems)
+        if self.options.planning.fallback != "baseline":
+            results = self.result_generator.generate_results(
+                problems, self.options.planning.domain,
+                self.options.planning.planner,
+                self.new_scenario.scenario_dir,
+                self.options.planning.timeout,
+                self.options.cpu.processes
+            )
         if not results:
             print("Error while generating pddl results!")
             return None
         assert(len(problems) == len(results))
+        # Vehicles are written in order of departure, once none of remaining episodes has earlier one
+        departs: List[float] = self.compute_departs(problems)
         # Generate pddl episodes classes
         print("Generating episodes and saving results")
         for i, (problem, result) in enumerate(zip(problems, results)):
             episodes.append(PddlEpisode(i, problem, result))
             assert(self.save_result(episodes[-1], free_mem=True))
+            self.new_scenario.vehicles_file.flush(departs[i + 1])
         return episodes
 
     def generate_problems(self) -> Optional[Iterator[PddlProblem]]:
@@ -51,6 +57,13 @@ class Offline(Mode):
             print("Error, starting time and ending time of simulation are invalid!")
             return None
         window: int = self.options.planning.window
+        # Windows are sized by the estimated planning cost
+        if self.options.planning.adaptive:
+            scheduler: WindowScheduler = WindowScheduler(
+                self.options.planning, self.problem_generator, self.vehicle_extractor
+            )
+            yield from scheduler.generate_problems(start_time, start_time + epi_count * window)
+            return
         for i in range(1, epi_count+1):
             print(f"***" * 15)
             print(f"Generating pddl problem: {i}/{epi_count}")
@@ -71,6 +84,22 @@ class Offline(Mode):
 
     # ----------------------------------- Utils -----------------------------------
 
+    # noinspection PyMethodMayBeStatic
+    def compute_departs(self, problems: List[PddlProblem]) -> List[float]:
+        """
+        :param problems: generated pddl problems
+        :return: Earliest departure of vehicles in problems starting at each index (one
+        extra value is appended for the end, equal to infinity)
+        """
+        departs: List[float] = [float("inf")] * (len(problems) + 1)
+        for i in reversed(range(len(problems))):
+            departs[i] = departs[i + 1]
+            if problems[i].container is not None:
+                departs[i] = min(
+                    [departs[i]] + [vehicle.vehicle.get_depart() for vehicle in problems[i].container.vehicles.values()]
+                )
+        return departs
+
     def compute_time(self) -> Tuple[int, int]:
         """
         :return: Total number of episodes, start time
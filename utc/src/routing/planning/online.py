@@ -1,131 +1,138 @@
 from utc.src.routing.planning.mode import Mode, PddlOptions, RoadNetwork
 from utc.src.routing.pddl.pddl_episode import PddlEpisode, PddlProblem, PddlResult
-from utc.src.routing.planning.scheduler import Scheduler
+from utc.src.routing.planning.scheduler import Scheduler, VehicleQueue
+from utc.src.routing.planning.route_assigner import RouteAssigner
 from utc.src.simulator.vehicle import Vehicle, VehicleEntry
-from utc.src.simulator.simulation import Simulation, traci
+from utc.src.simulator.simulation import Simulation
+from concurrent.futures import ThreadPoolExecutor, Future
 from copy import deepcopy
+import xml.etree.ElementTree as ET
 from typing import Optional, List, Set, Tuple, Dict
 
 
-class Flags:
-    UNKNOWN: int = -1
-    MISSED: int = 0
-    SCHEDULED: int = 1
-
-
 class Online(Mode):
-    """ Class representing 'online' mode of planning """
+    """
+    Class representing 'online' mode of planning, vehicles are scheduled for planning from running
+    simulation, if planning is asynchronous, planner runs in background while simulation continues.
+    """
     def __init__(self, options: PddlOptions):
         super().__init__(options)
         self.entry: Optional[VehicleEntry] = None
+        self.simulation: Optional[Simulation] = None
         self.sub_network: RoadNetwork = self.problem_generator.network_builder.sub_graph.road_network
-        self.travel_times: Dict[str, float] = {}
-        self.etas: Dict[str, Tuple[float, float, int]] = {}
-        self.actual: Dict[str, float] = {}
+        self.scheduler: Scheduler = Scheduler(
+            [self.sub_network],
+            {edge.id: edge.get_travel_time() for edge in self.graph.road_network.edges.values()},
+            self.options.planning.window, self.options.planning.min_window
+        )
+        # Worker running planner (asynchronous planning), problems being planned (id, problem, result, vehicles)
+        self.worker: Optional[ThreadPoolExecutor] = None
+        self.pending: List[Tuple[int, PddlProblem, Optional[Future], List[str]]] = []
+        self.counter: int = 0
+        # New routes are assigned to vehicles together, vehicle id -> (episode, vehicle, route) waiting for assignment
+        self.assigner: RouteAssigner = RouteAssigner(self.graph.road_network)
+        self.assigning: Dict[str, Tuple[PddlEpisode, ET.Element, ET.Element]] = {}
+        # Planned departures of vehicles (written to new scenario in order of departure)
+        self.departs: Dict[str, float] = {}
 
     def generate_episodes(self) -> List[PddlEpisode]:
         episodes: List[PddlEpisode] = []
-        vehicle_queue: Set[str] = set()  # Vehicles being considered for planning
-        planning_vehicles: Set[str] = set()  # Vehicles scheduled for planning
-        planned_vehicles: Set[str] = set()  # Already planned vehicles
-        arrived_vehicles: Set[str] = set()
-        # int(self.options.planning.window / self.scenario.config_file.get_step_length())
-        steps: int = int(10 / self.scenario.config_file.get_step_length())
-        assert(steps == 20)
-        region = self.sub_network.edges.keys()
         options: Dict[str, str] = {
             "--save-state.rng": "",
             "-W": ""
         }
-        counter: int = 0
-        to_plan: int = 0
-        missed_vehicles: int = 0
-        for edge in self.graph.road_network.edges.values():
-            self.travel_times[edge.id] = edge.get_travel_time()
-
-        with Simulation(self.scenario.config_file, options) as simulation:
-            while simulation.is_running():
-                # planning_vehicles ^= (planning_vehicles & planned_vehicles)
-                print(f"Current time: {simulation.get_time(False)}")
-                # Simulation stopped during advancement
-                if not self.advance(simulation):
-                    break
-
-
-                # After each time-step go over vehicles, and estimate if they are able to arrive
-                # within X seconds to the region (if they already arrived, remove them from queue)
-                for vehicle_id in vehicle_queue:
-                    if vehicle_id not in arrived_vehicles:
-                        eta: float = self.estimate_arrival(vehicle_id)
-                        flag: int = Flags.UNKNOWN
-                        # Evaluate it next time, the data will be too imprecise for now
-                        if eta >= 20:
-                            continue
-                        elif eta < 10:
-                            flag = Flags.MISSED
-                        else:
-                            flag = Flags.SCHEDULED
-                        self.etas[vehicle_id] = (simulation.get_time(False), eta, flag)
-                    # else:
-                    #     missed_vehicles += 1
-                planning_vehicles |= vehicle_queue
-                vehicle_queue ^= (vehicle_queue & self.etas.keys())
-                vehicle_queue ^= (vehicle_queue & arrived_vehicles)
-                counter += 1
-                if counter > 100:
+        if self.options.planning.asynchronous:
+            self.worker = ThreadPoolExecutor(max_workers=1)
+        # Simulation is fast-forwarded between departures of vehicles visiting the region
+        routes: Dict[str, List[str]] = {
+            route.attrib["id"]: route.attrib["edges"].split() for route in self.scenario.routes_file.root.iter("route")
+        }
+        self.departs = {
+            vehicle.attrib["id"]: float(vehicle.attrib["depart"])
+            for vehicle in self.scenario.vehicles_file.root.iter("vehicle")
+        }
+        self.scheduler.set_departures(
+            (self.departs[vehicle.attrib["id"]], routes.get(vehicle.attrib["route"], []))
+            for vehicle in self.scenario.vehicles_file.root.iter("vehicle")
+        )
+        with Simulation(self.scenario.config_file, options, backend=self.options.init.backend) as simulation:
+            self.simulation = simulation
+            while simulation is not None and simulation.is_running():
+                # Results of planning are checked each step
+                simulation.step(0. if self.pending else self.scheduler.next_event(simulation))
+                batches: Optional[Dict[int, List[str]]] = self.scheduler.step(simulation)
+                if batches is None:
                     break
-        good: Tuple[int, int, int, int, int] = (0, 0, 0, 0, 0)
-        worse: Tuple[int, int, int, int, int] = (0, 0, 0, 0, 0)
-        bad: Tuple[int, int, int, int, int] = (0, 0, 0, 0, 0)
-        for vehicle, arrival_time in self.actual.items():
-            if vehicle not in self.etas:
-                continue
-            diff = abs((self.etas[vehicle][0] + self.etas[vehicle][1]) - arrival_time)
-            flag = (self.etas[vehicle][-1] == Flags.MISSED)
-            over_estimated: bool = (self.etas[vehicle][0] + self.etas[vehicle][1]) > arrival_time
-            if diff < 10:
-                good = (good[0]+1, good[1] + (not over_estimated), good[2] + over_estimated, good[3] + flag, good[4] + (not flag))
-            elif diff < 20:
-                worse = (worse[0]+1, worse[1] + (not over_estimated), worse[2] + over_estimated, worse[3] + flag, worse[4] + (not flag))
-            else:
-                bad = (bad[0]+1, bad[1] + (not over_estimated), bad[2] + over_estimated, bad[3] + flag, bad[4] + (not flag))
-        print(f"Performance after {counter} steps for {len(self.actual)} vehicles")
-        print(f"{good, worse, bad}, planned: {to_plan}, missed: {missed_vehicles}")
-        print(f"Under estimated: {good[1]+worse[1]+bad[1]}, over: {good[2]+worse[2]+bad[2]}")
-        print(f"Missed: {good[3]+worse[3]+bad[3]}, scheduled: {good[4]+worse[4]+bad[4]}")
-        quit()
+                for vehicle_ids in batches.values():
+                    self.submit(vehicle_ids, simulation)
+                episodes += self.collect()
+            # Results which did not finish before the end of simulation are discarded
+            if self.pending:
+                print(f"Discarding: {len(self.pending)} late results, simulation ended")
+                for _, _, result, vehicle_ids in self.pending:
+                    if result is not None:
+                        result.cancel()
+                    self.scheduler.queue.set_planned(vehicle_ids)
+                self.pending.clear()
+        if self.worker is not None:
+            self.worker.shutdown(wait=True)
+            self.worker = None
+        print(f"Finished online planning, generated: {len(episodes)} episodes")
         return episodes
 
-    # -------------------------------------------- Simulation --------------------------------------------
+    # -------------------------------------------- Planning --------------------------------------------
 
-    def advance(self, simulation: Simulation) -> bool:
+    def submit(self, vehicle_ids: List[str], simulation: Simulation) -> bool:
         """
-        :return:
+        Generates problem from current (predicted) state of vehicles, which is then planned,
+        either immediately, or by background worker (if planning is asynchronous).
+
+        :param vehicle_ids: vehicles scheduled for planning
+        :param simulation: running simulation
+        :return: True on success, False otherwise
         """
-        # Simulate to future and observe vehicles
-        for _ in range(steps):
-            simulation.step()
-            arrived_vehicles |= set(traci.simulation.getArrivedIDList())
-            # Find all vehicles which just departed and drive on sub-region, add them to queue
-            for vehicle_id in traci.simulation.getDepartedIDList():
-                assert (vehicle_id not in planned_vehicles and vehicle_id not in vehicle_queue)
-                route_edges: Tuple[str] = traci.vehicle.getRoute(vehicle_id)
-                # Make sure vehicle does not start inside the region
-                if (set(route_edges) & region) and route_edges[0] not in region:
-                    vehicle_queue.add(vehicle_id)
-            # For each ETA vehicle, check if it arrived and the diff
-            for vehicle_id in planning_vehicles:
-                if vehicle_id not in arrived_vehicles:
-                    if traci.vehicle.getRoadID(vehicle_id) in region:
-                        planned_vehicles.add(vehicle_id)
-                        self.actual[vehicle_id] = simulation.get_time(False)
-                else:
-                    self.actual[vehicle_id] = simulation.get_time(False)
-        # Update average travel time on edges
-        for edge in self.graph.road_network.edges.keys():
-            self.travel_times[edge] = (self.travel_times[edge] + traci.edge.getTraveltime(edge)) / 2
+        print(f"Starting planning for: {len(vehicle_ids)} vehicles.")
+        problem: Optional[PddlProblem] = self.generate_problem(set(vehicle_ids), simulation)
+        if problem is None:
+            self.scheduler.queue.set_planned(vehicle_ids)
+            return False
+        result: Optional[Future] = None
+        if self.options.planning.fallback != "baseline":
+            args: tuple = (
+                [problem], self.options.planning.domain, self.options.planning.planner,
+                self.new_scenario.scenario_dir, self.options.planning.timeout
+            )
+            if self.worker is not None:
+                result = self.worker.submit(self.result_generator.generate_results, *args)
+            else:
+                result = Future()
+                result.set_result(self.result_generator.generate_results(*args))
+        self.pending.append((self.counter, problem, result, vehicle_ids))
+        self.counter += 1
         return True
 
+    def collect(self) -> List[PddlEpisode]:
+        """
+        Assigns routes of finished results to vehicles (which did not yet pass
+        the point where their new route diverges from the current one).
+
+        :return: List of finished episodes (in order of their submission)
+        """
+        episodes: List[PddlEpisode] = []
+        while self.pending and (self.pending[0][2] is None or self.pending[0][2].done()):
+            identifier, problem, result, vehicle_ids = self.pending.pop(0)
+            results: List[Optional[PddlResult]] = []
+            try:
+                results = [] if result is None else result.result()
+            except Exception as e:  # Failure of planning must not stop the simulation
+                print(f"Error: '{e}' while planning problem: '{problem.name}'!")
+            episode: PddlEpisode = PddlEpisode(identifier, problem, results[0] if results else None)
+            if self.save_result(episode, free_mem=True):
+                episodes.append(episode)
+            self.scheduler.queue.set_planned(vehicle_ids)
+        if self.assigning:
+            self.assign_routes()
+        return episodes
 
     def generate_problem(self, planning_vehicles: Set[str], simulation: Simulation) -> Optional[PddlProblem]:
         """
@@ -147,43 +154,9 @@ class Online(Mode):
 
     # ------------------------------- Utils -------------------------------
 
-    def init(self) -> None:
-        """
-        :return:
-        """
-        pass
-
-    def estimate_arrival(self, vehicle_id: str) -> float:
-        """
-        :param vehicle_id:
-        :return:
-        """
-        # print(f"Estimating arrival of vehicle: '{vehicle_id}'")
-        route: Tuple[str] = traci.vehicle.getRoute(vehicle_id)
-        index: int = traci.vehicle.getRouteIndex(vehicle_id)
-        # print(f"Route: '{route}'")
-        # print(f"Current edge(id): '{index}' <-> '{route[index]}'")
-        # Find the first edge in the region
-        sub_index, sub_edge = None, None
-        for i, edge in enumerate(route):
-            if edge in self.sub_network.edges:
-                sub_index, sub_edge = i, edge
-                break
-        # print(f"Region index: '{sub_index}', edge: '{sub_edge}'")
-        # print(f"Path till region: '{route[index:sub_index]}'")
-        # print(f"Path to be traveled: '{route[index+1:sub_index-1]}'")
-        # Estimate the arrival time
-        # traci.edge.getTraveltime()
-        # self.travel_times[edge.id]
-        eta: float = sum([self.travel_times[edge.id] for edge in self.graph.road_network.get_edges(route[index:sub_index])])
-        # print(f"Naive ETA: {eta}")
-        # quit()
-        return eta
-
-
     def save_result(self, episode: PddlEpisode, free_mem: bool = True) -> bool:
         """
-        :param episode: to be saved (i.e. vehicles and their new routes)
+        :param episode: to be saved (i.e. vehicles and their new routes, which are assigned at the end of step)
         :param free_mem: True if memory of episode should be freed (network, vehicles, etc.)
         :return: True on success, false otherwise
         """
@@ -191,96 +164,57 @@ class Online(Mode):
         if episode is None or episode.problem is None:
             print("Error, received invalid episode!")
             return False
-        for (vehicle, route) in self.parser.process_result(episode).items():
-            route_id: str = self.new_scenario.routes_file.add_route(route, re_index=True)
-            vehicle.attrib["route"] = route_id
-            self.new_scenario.vehicles_file.add_vehicle(vehicle)
-            orig_route = episode.problem.container.vehicles[vehicle.attrib['id']].original_route
-            orig_edges: List[str] = orig_route.attrib["edges"].split()
-            if not (tuple(orig_edges) == traci.vehicle.getRoute(vehicle.attrib['id'])):
-                print(f"Vehicle: {vehicle.attrib['id']}")
-                print(f"Orig route: {tuple(orig_edges)}")
-                print(f"Traci route: {traci.vehicle.getRoute(vehicle.attrib['id'])}")
-                print(f"Equal id: {traci.vehicle.getRouteID(vehicle.attrib['id']) == orig_route.attrib['id']}")
-                if traci.vehicle.getRouteID(vehicle.attrib['id']) in self.entry.original_routes:
-                    print(f"Entry route: {self.entry.original_routes[traci.vehicle.getRouteID(vehicle.attrib['id'])].attrib['edges']}")
-                else:
-                    print("Entry route: None!")
-                raise ValueError("Error")
-            self.assign_route(vehicle.attrib['id'], route.attrib["edges"].split())
+        # Route vehicles by fallback router, if planner did not find any result (or was not called)
+        paths: Optional[Dict[str, List[int]]] = None
+        if self.fallback_router is not None and not episode.is_valid() and episode.problem.is_valid():
+            paths = self.fallback_router.route_vehicles(episode.problem)
+            episode.problem.container.info.fallback = len(paths)
+        for (vehicle, route) in self.parser.process_result(episode, paths).items():
+            vehicle_id: str = vehicle.attrib["id"]
+            self.assigner.add_route(vehicle_id, route.attrib["edges"].split())
+            self.assigning[vehicle_id] = (episode, vehicle, route)
         if free_mem:
             episode.free_mem()
         return True
 
-    def assign_route(self, vehicle_id: str, edges: List[str]) -> bool:
+    def assign_routes(self) -> None:
         """
-        :param vehicle_id: to which route is assigned
-        :param edges: route
-        :return: True on success, False otherwise
-        """
-        # Perform some checks
-        assert (edges[0] == traci.vehicle.getRoute(vehicle_id)[0])
-        assert (edges[-1] == traci.vehicle.getRoute(vehicle_id)[-1])
-        try:
-            route_index: int = traci.vehicle.getRouteIndex(vehicle_id)
-            if route_index >= 0:
-                current_edge: str = traci.vehicle.getRoute(vehicle_id)[route_index]
-                if current_edge in edges:
-                    traci.vehicle.setRoute(vehicle_id, edges[edges.index(current_edge):])
-                else:
-                    print(f"Vehicle departed at: {traci.vehicle.getDeparture(vehicle_id)}")
-                    print(f"Current time: {traci.simulation.getTime()}")
-                    print(f"New route: {edges}")
-                    print(f"Index: {route_index}")
-                    print(f"{traci.vehicle.getRoute(vehicle_id)}")
-                    print(f"Error at vehicle: {vehicle_id}, missing edge in route")
-                    return False
-            else:  # Vehicle has not yet departed, route can be assigned entirely
-                traci.vehicle.setRoute(vehicle_id, edges)
-        except traci.exceptions.TraCIException as e:
-            print(f"Error: {e}")
-            return False
-        return True
-
-
-# for edge_id in region:
-#     edge = self.sub_network.get_edge(edge_id)
-#     edge.attributes["travelTime"] = edge.get_travel_time()
-# Start simulation and planning
-#     # Update travel time
-#     for edge_id in region:
-#         self.sub_network.get_edge(edge_id).attributes["travelTime"] += traci.edge.getTraveltime(edge_id)
-# # Average observed travel time
-# for edge_id in region:
-#     self.sub_network.get_edge(edge_id).attributes["travelTime"] /= (steps+1)
-#     self.sub_network.get_edge(edge_id).attributes["travelTime"] = max(
-#         self.sub_network.get_edge(edge_id).attributes["travelTime"], 1
-#     )
-# if len(planning_vehicles) >= 10:
-#     problem: PddlProblem = self.generate_problem(planning_vehicles, simulation)
-#     assert(problem is not None)
-#     result: Optional[PddlResult] = self.result_generator.generate_results(
-#         [problem], self.options.planning.domain,
-#         self.options.planning.planner,
-#         self.new_scenario.scenario_dir,
-#         self.options.planning.timeout
-#     )[0]
-#     # Generate episode, save to file and assign new routes to running vehicles
-#     episodes.append(PddlEpisode(counter, problem, result))
-#     self.save_result(episodes[-1], free_mem=True)
-#     counter += 1
-# Continue simulation to the previous end-point
-# else:
-#     print(f"Too few vehicles for planning, skipping ...")
-
-# Generate problem from found vehicles
-# if planning_vehicles:
-#     print(f"Starting planning for: {len(planning_vehicles)} vehicles.")
-#     vehicle_queue ^= planning_vehicles
-#     planned_vehicles |= planning_vehicles
-#     planning_vehicles.clear()
-# else:
-#     print("No vehicles entered sub-region")
-
-
+        Assigns new routes to vehicles in simulation, saves those which were
+        assigned to new scenario, outcomes are recorded in episodes.
 
+        :return: None
+        """
+        outcomes: Dict[str, str] = self.assigner.assign(self.simulation.backend, self.scheduler.queue.arrived)
+        skipped: int = 0
+        for vehicle_id, outcome in outcomes.items():
+            episode, vehicle, route = self.assigning.pop(vehicle_id)
+            episode.info.assignment[vehicle_id] = outcome
+            if outcome == RouteAssigner.ASSIGNED:
+                episode.info.vehicle_info.assigned += 1
+                route_id: str = self.new_scenario.routes_file.add_route(route, re_index=True)
+                vehicle.attrib["route"] = route_id
+                self.new_scenario.vehicles_file.add_vehicle(vehicle)
+                continue
+            elif outcome in (RouteAssigner.ARRIVED, RouteAssigner.PASSED):
+                episode.info.vehicle_info.late += 1
+            else:
+                episode.info.vehicle_info.rejected += 1
+            skipped += 1
+        if skipped:
+            print(f"Routes of: {skipped}/{len(outcomes)} vehicles could not be assigned")
+        self.new_scenario.vehicles_file.flush(self.get_watermark())
+        return
+
+    def get_watermark(self) -> float:
+        """
+        :return: Time before which no vehicle can be added to new scenario anymore, i.e. the
+        earliest departure of vehicles, which can still be planned (running or scheduled in queue,
+        waiting for assignment, or insertion into simulation) and current time (for the rest)
+        """
+        watermark: float = self.simulation.get_time()
+        queue: VehicleQueue = self.scheduler.queue
+        candidates: tuple = (queue.running, queue.scheduled, self.assigning, self.simulation.backend.get_pending_ids())
+        for vehicle_ids in candidates:
+            for vehicle_id in vehicle_ids:
+                watermark = min(watermark, self.departs.get(vehicle_id, watermark))
+        return watermark
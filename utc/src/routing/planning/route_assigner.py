@@ -0,0 +1,105 @@
+from utc.src.graph import RoadNetwork
+from utc.src.simulator.backend import SimulationBackend, SimulationError
+from typing import Dict, List, Set, Tuple
+
+
+class RouteAssigner:
+    """
+    Class collecting new routes of vehicles, which are validated against the road network
+    and current positions of vehicles and then assigned to vehicles at once (at step boundary).
+    """
+    # Outcomes of route assignment
+    ASSIGNED: str = "assigned"  # Route was assigned to vehicle
+    ARRIVED: str = "arrived"    # Vehicle left simulation before route could be assigned
+    PASSED: str = "passed"      # Vehicle already passed the point where its new route diverges
+    INVALID: str = "invalid"    # Route is not connected in network, or does not match current route of vehicle
+    FAILED: str = "failed"      # Simulation refused route
+
+    def __init__(self, network: RoadNetwork):
+        """
+        :param network: road network of simulation (used to check connectivity of routes)
+        """
+        # Edge id -> id's of edges reachable from edge
+        self.successors: Dict[str, Set[str]] = {}
+        for route in network.routes.values():
+            edges: List[str] = route.get_edge_ids()
+            for edge_id, next_edge in zip(edges, edges[1:]):
+                self.successors.setdefault(edge_id, set()).add(next_edge)
+        for junction in network.junctions.values():
+            for in_route, out_routes in junction.connections.items():
+                if in_route is None:
+                    continue
+                self.successors.setdefault(in_route.last_edge().id, set()).update(
+                    out_route.first_edge().id for out_route in out_routes
+                )
+        # Vehicle id -> new route (waiting for assignment)
+        self.routes: Dict[str, List[str]] = {}
+
+    def add_route(self, vehicle_id: str, edges: List[str]) -> None:
+        """
+        :param vehicle_id: id of vehicle
+        :param edges: new route of vehicle (replaces the previous one, if not yet assigned)
+        :return: None
+        """
+        self.routes[vehicle_id] = edges
+
+    def assign(self, backend: SimulationBackend, arrived: Set[str]) -> Dict[str, str]:
+        """
+        Validates all collected routes, valid routes are then assigned to vehicles in single pass.
+
+        :param backend: of running simulation
+        :param arrived: vehicles which already left simulation
+        :return: Mapping of vehicle id to outcome of assignment
+        """
+        outcomes: Dict[str, str] = {}
+        valid: Dict[str, List[str]] = {}
+        for vehicle_id, edges in self.routes.items():
+            if vehicle_id in arrived:
+                outcomes[vehicle_id] = self.ARRIVED
+            elif not self.is_connected(edges):
+                outcomes[vehicle_id] = self.INVALID
+            else:
+                outcomes[vehicle_id], start = self.check_position(backend, vehicle_id, edges)
+                if outcomes[vehicle_id] == self.ASSIGNED:
+                    valid[vehicle_id] = edges[start:]
+        self.routes.clear()
+        for vehicle_id in backend.set_routes(valid):
+            print(f"Simulation refused route of vehicle: '{vehicle_id}'")
+            outcomes[vehicle_id] = self.FAILED
+        return outcomes
+
+    # ------------------------------------------- Checks -------------------------------------------
+
+    def is_connected(self, edges: List[str]) -> bool:
+        """
+        :param edges: route
+        :return: True if all consecutive edges of route are connected in network, False otherwise
+        """
+        return bool(edges) and all(
+            next_edge in self.successors.get(edge_id, ()) for edge_id, next_edge in zip(edges, edges[1:])
+        )
+
+    # noinspection PyMethodMayBeStatic
+    def check_position(self, backend: SimulationBackend, vehicle_id: str, edges: List[str]) -> Tuple[str, int]:
+        """
+        :param backend: of running simulation
+        :param vehicle_id: id of vehicle
+        :param edges: new route of vehicle
+        :return: Outcome of check, index of new route from which it can be assigned to vehicle
+        """
+        try:
+            current: Tuple[str, ...] = backend.get_route(vehicle_id)
+            route_index: int = backend.get_route_index(vehicle_id)
+        except SimulationError:
+            return RouteAssigner.ARRIVED, 0
+        if not current or edges[0] != current[0] or edges[-1] != current[-1]:
+            return RouteAssigner.INVALID, 0
+        # Index of the first edge, on which the new route differs
+        divergence: int = next(
+            (index for index, (edge, new_edge) in enumerate(zip(current, edges)) if edge != new_edge),
+            min(len(current), len(edges))
+        )
+        if route_index >= divergence:
+            return RouteAssigner.PASSED, 0
+        # Route is assigned from the current edge (entirely, if vehicle has not yet departed)
+        return RouteAssigner.ASSIGNED, max(route_index, 0)
@@ -1,8 +1,11 @@
 from utc.src.graph import RoadNetwork
-from utc.src.simulator.vehicle import Vehicle, VehicleEntry
-from utc.src.simulator.simulation import Simulation, traci
-from copy import deepcopy
-from typing import Optional, List, Set, Tuple, Dict
+from utc.src.simulator.vehicle import Vehicle
+from utc.src.simulator.simulation import Simulation
+from utc.src.simulator.backend import SimulationBackend, SimulationError
+from utc.src.routing.planning.eta_engine import EtaEngine
+import numpy as np
+import heapq
+from typing import Optional, List, Set, Tuple, Dict, FrozenSet, Iterable, Sequence
 
 
 class SumoVehicle(Vehicle):
@@ -13,37 +16,24 @@ class SumoVehicle(Vehicle):
         super().__init__(attributes)
         self.route: Tuple[str] = route
         self.departed: float = departed
-        # Vehicle can have multiple eta's due to arriving at multiple regions
-        self.eta: List[float] = []
+        # Expected (absolute) time of arrival to the current region
+        self.eta: float = -1
         self.arrived: float = -1
         # Vehicle visits of regions (regionID, routeIndex)
         self.visits: List[Tuple[int, int]] = []
         self.current_visit: int = -1
-
-    def add_eta(self, eta: float) -> None:
-        """
-        :param eta:
-        :return:
-        """
-        assert(eta > 0)
-        self.eta.append(eta)
+        # Edges (their indexes) on which the current ETA depends (remaining route to region)
+        self.watched: FrozenSet[int] = frozenset()
 
     def add_visit(self, region_id: int, route_index: int) -> None:
         """
-        :param region_id:
-        :param route_index:
-        :return:
+        :param region_id: id of region visited by vehicle
+        :param route_index: index of the first edge of route in region
+        :return: None
         """
         self.visits.append((region_id, route_index))
-
-    def get_expected_arrival(self) -> float:
-        """
-        :return:
-        """
-        if not self.eta:
-            print(f"Error, vehicle: '{self.id}' does not have an ETA!")
-            return -1
-        return self.departed + self.eta[-1]
+        if self.current_visit == -1:
+            self.current_visit = 0
 
     def get_current_visit(self) -> Tuple[int, float]:
         """
@@ -52,21 +42,30 @@ class SumoVehicle(Vehicle):
         if not self.visits or self.current_visit == -1:
             print(f"Error, vehicle: '{self.id}' was not assigned visited regions!")
             return -1, -1
-        return self.visits[self.current_visit][0], self.get_expected_arrival()
+        return self.visits[self.current_visit][0], self.eta
 
-    def get_current_route(self, index: int) -> Tuple[int]:
+    def get_current_route(self, index: int) -> Tuple[str]:
         """
+        :param index: of the current edge in route
         :return: The current sub-route to region
         """
         assert((0 <= index <= len(self.route)) and self.current_visit != -1)
         return self.route[index:self.visits[self.current_visit][1]]
 
-
+    def next_visit(self) -> bool:
+        """
+        :return: True if vehicle visits another region, False otherwise
+        """
+        if self.current_visit + 1 >= len(self.visits):
+            return False
+        self.current_visit += 1
+        return True
 
 
 class VehicleQueue:
     """
-    Class holding vehicles in different queues from running simulation.
+    Class holding vehicles of running simulation, running vehicles are kept in priority
+    queue ordered by their ETA to region (entries of re-estimated vehicles are invalidated lazily).
     """
     def __init__(self):
         self.vehicles: Dict[str, SumoVehicle] = {}
@@ -74,165 +73,363 @@ class VehicleQueue:
         self.scheduled: Set[str] = set()  # Vehicle currently considered for planning
         self.arrived: Set[str] = set()  # Vehicles which already left the simulation
         self.planned: Set[str] = set()  # Vehicles which were planned
+        # (eta, vehicle id), entries whose eta does not match vehicle's eta are outdated
+        self.heap: List[Tuple[float, str]] = []
+        # Edge index -> running vehicles, whose ETA depends on the edge
+        self.watchers: Dict[int, Set[str]] = {}
+
+    # ------------------------------------------- Queue -------------------------------------------
+
+    def push(self, vehicle: SumoVehicle, eta: float, watched: Iterable[int]) -> None:
+        """
+        :param vehicle: running vehicle
+        :param eta: new expected time of arrival to region
+        :param watched: indexes of edges on which the ETA depends
+        :return: None
+        """
+        self.unwatch(vehicle)
+        vehicle.eta, vehicle.watched = eta, frozenset(watched)
+        for edge_index in vehicle.watched:
+            self.watchers.setdefault(edge_index, set()).add(vehicle.id)
+        heapq.heappush(self.heap, (eta, vehicle.id))
+
+    def peek(self) -> Optional[SumoVehicle]:
+        """
+        :return: Running vehicle with the lowest ETA, None if there is no such vehicle
+        """
+        while self.heap:
+            eta, vehicle_id = self.heap[0]
+            if vehicle_id in self.running and self.vehicles[vehicle_id].eta == eta:
+                return self.vehicles[vehicle_id]
+            heapq.heappop(self.heap)
+        return None
+
+    def pop(self) -> Optional[SumoVehicle]:
+        """
+        :return: Removes running vehicle with the lowest ETA from queue, None if there is no such vehicle
+        """
+        vehicle: Optional[SumoVehicle] = self.peek()
+        if vehicle is not None:
+            heapq.heappop(self.heap)
+            self.unwatch(vehicle)
+        return vehicle
+
+    def unwatch(self, vehicle: SumoVehicle) -> None:
+        """
+        :param vehicle: whose ETA no longer depends on its watched edges
+        :return: None
+        """
+        for edge_index in vehicle.watched:
+            watchers: Set[str] = self.watchers[edge_index]
+            watchers.discard(vehicle.id)
+            if not watchers:
+                self.watchers.pop(edge_index)
+        vehicle.watched = frozenset()
+
+    # ------------------------------------------- States -------------------------------------------
 
-    def remove_schedule(self, vehicle: SumoVehicle, time: float) -> None:
+    def add_vehicle(self, vehicle: SumoVehicle) -> None:
         """
-        :param vehicle:
-        :param time:
-        :return:
+        :param vehicle: which departed and visits regions
+        :return: None
         """
-        assert(vehicle.id in self.scheduled)
-        print(f"Vehicle: '{vehicle.id}' arrived to region before plan was made, by: "
-              f"{round(abs(vehicle.get_expected_arrival() - time), 3)}[s]."
+        self.vehicles[vehicle.id] = vehicle
+        self.running.add(vehicle.id)
+
+    def schedule(self, vehicle: SumoVehicle) -> None:
+        """
+        :param vehicle: running vehicle selected for planning (already removed from queue)
+        :return: None
+        """
+        self.running.discard(vehicle.id)
+        self.scheduled.add(vehicle.id)
+
+    def set_planned(self, vehicle_ids: List[str]) -> None:
+        """
+        :param vehicle_ids: scheduled vehicles, for which planning finished
+        :return: None
+        """
+        for vehicle_id in vehicle_ids:
+            if vehicle_id in self.scheduled:
+                self.scheduled.remove(vehicle_id)
+                self.planned.add(vehicle_id)
+        return
+
+    def remove_schedule(self, vehicle: SumoVehicle, time: float) -> bool:
+        """
+        :param vehicle: vehicle which arrived to region before plan was made
+        :param time: current time
+        :return: True if vehicle visits other regions (and was moved back to running), False otherwise
+        """
+        assert(vehicle.id in self.scheduled or vehicle.id in self.running)
+        print(
+            f"Vehicle: '{vehicle.id}' arrived to region before plan was made, by: "
+            f"{round(abs(vehicle.eta - time), 3)}[s]."
         )
-        self.scheduled.remove(vehicle.id)
-        if vehicle.current_visit + 1 == len(vehicle.visits):
-            print("Vehicle does not visit any more regions, discarding it ...")
+        self.scheduled.discard(vehicle.id)
+        self.running.discard(vehicle.id)
+        self.unwatch(vehicle)
+        if not vehicle.next_visit():
             self.vehicles.pop(vehicle.id)
-        else:
-            print("Vehicle moved back to running queue as it visits another region\s in future.")
-            vehicle.current_visit += 1
-            self.running.add(vehicle.id)
-        return
+            return False
+        self.running.add(vehicle.id)
+        return True
 
     def set_arrival(self, vehicle_id: str, time: float) -> None:
         """
-        :param vehicle_id:
-        :param time:
-        :return:
+        :param vehicle_id: id of vehicle which left the simulation
+        :param time: current time
+        :return: None
         """
-        # Vehicle was not considered (does not go to the regions)
+        # Vehicle was not considered (does not go to the regions), or its arrival was already processed
         if vehicle_id not in self.vehicles:
             return
-        assert(vehicle_id not in self.arrived)
-        assert(vehicle_id in self.running or vehicle_id in self.scheduled or vehicle_id in self.planned)
         self.arrived.add(vehicle_id)
-        self.vehicles[vehicle_id].arrived = time
+        # Arrived vehicles are no longer kept (sets of vehicles do not grow with history of simulation)
+        vehicle: SumoVehicle = self.vehicles.pop(vehicle_id)
+        vehicle.arrived = time
+        self.unwatch(vehicle)
         if vehicle_id in self.running:
             print(f"Vehicle: '{vehicle_id}' arrived at destination, but was not scheduled!")
             self.running.remove(vehicle_id)
-            return
         elif vehicle_id in self.scheduled:
-            diff: float = round(abs(self.vehicles[vehicle_id].get_expected_arrival() - time), 3)
+            diff: float = round(abs(vehicle.eta - time), 3)
             print(f"Vehicle: '{vehicle_id}' arrived at destination earlier than expected by: {diff}[s] !")
             self.scheduled.remove(vehicle_id)
-            return
-        # Else Already planned
+        else:  # Already planned
+            self.planned.discard(vehicle_id)
         return
 
 
 class Scheduler:
     """
-    Class scheduling vehicles from running simulation for online planning.
+    Class scheduling vehicles from running simulation for online planning, driven by events:
+    departures (vehicles are added to queue by their ETA), changes of travel time on edges (only
+    vehicles driving trough them are re-estimated), passed ETA (vehicle is re-estimated) and ETA
+    of the head of queue entering the planning horizon (batch of vehicles is scheduled for planning).
+    ETA's of vehicles are computed together (once per step) by EtaEngine. Between events, simulation
+    can be fast-forwarded (if departures of vehicles are known), see 'next_event'.
     """
-    def __init__(self, regions: List[RoadNetwork], interval: Tuple[float, float, float]):
+    def __init__(
+            self, regions: List[RoadNetwork], travel_times: Dict[str, float], horizon: float,
+            lead_time: float, update_period: float = 10, tolerance: float = 0.1, alpha: float = 0.5
+        ):
         """
-        :param regions:
-        :param interval:
+        :param regions: networks of regions, in which vehicles are planned
+        :param travel_times: initial travel times of edges (of the whole network)
+        :param horizon: vehicles with ETA in (now, now + horizon> are included in planning batch
+        :param lead_time: planning is triggered, once the ETA of head of queue is less than now + lead_time
+        :param update_period: how often travel times of edges are updated (seconds)
+        :param tolerance: relative change of edge travel time, after which vehicles are re-estimated
+        :param alpha: smoothing factor of travel times (weight of the new value)
         """
+        assert(0 <= lead_time <= horizon)
         self.regions: List[RoadNetwork] = regions
-        self.interval: Tuple[float, float, float] = interval
+        self.engine: EtaEngine = EtaEngine(travel_times, alpha)
+        self.horizon: float = horizon
+        self.lead_time: float = lead_time
+        self.update_period: float = update_period
+        self.tolerance: float = tolerance
         self.queue: VehicleQueue = VehicleQueue()
+        self.last_update: float = -1
+        # Time of the last processed step
+        self.last_step: float = -1
+        # Sorted planned departures of vehicles visiting regions, None if they are not known
+        self.departures: Optional[np.ndarray] = None
 
-    def step(self, simulation: Simulation) -> bool:
+    def step(self, simulation: Simulation) -> Optional[Dict[int, List[str]]]:
         """
-        :param simulation:
-        :return:
+        Processes events of the last simulation step.
+
+        :param simulation: running simulation
+        :return: Mapping of region id to vehicles scheduled for planning (can be empty), None if simulation ended
         """
         if not simulation.is_running():
-            return False
+            return None
+        backend: SimulationBackend = simulation.backend
+        time: float = simulation.get_time()
+        # Vehicles to be (re-)estimated, mapped to their current route index (-1 if unknown)
+        estimate: Dict[str, int] = {}
         # Process vehicles which arrived this time step
-        for vehicle_id in traci.simulation.getArrivedIDList():
-            self.queue.set_arrival(vehicle_id, simulation.get_time())
-        # Process vehicles which just arrived this time step, add them to queue
-        for vehicle_id in traci.simulation.getDepartedIDList():
-            pass
+        for vehicle_id in backend.get_arrived_ids():
+            self.set_arrival(vehicle_id, time)
+        # Simulation was fast-forwarded, arrivals of previous steps are found from running vehicles
+        if self.last_step >= 0 and time - self.last_step > 1.5 * simulation.step_length:
+            running: Set[str] = set(backend.get_vehicle_ids())
+            for vehicle_id in (self.queue.running | self.queue.scheduled | self.queue.planned) - running:
+                self.set_arrival(vehicle_id, time)
+        self.last_step = time
+        # Process vehicles which departed this time step, add them to queue
+        for vehicle_id in backend.get_departed_ids():
+            if self.add_vehicle(vehicle_id, backend, time):
+                estimate[vehicle_id] = 0
+        # Re-estimate vehicles whose upcoming edges changed travel time
+        if self.last_update < 0:
+            backend.subscribe_travel_times(list(self.engine.edges.keys()))
+            self.last_update = time
+        elif time - self.last_update >= self.update_period:
+            self.last_update = time
+            for edge in self.engine.update(backend.get_travel_times(), self.tolerance):
+                for vehicle_id in self.queue.watchers.get(int(edge), ()):
+                    estimate.setdefault(vehicle_id, -1)
         # For each scheduled vehicle, check if they have not yet arrived to region
-        for vehicle_id in self.queue.scheduled:
+        for vehicle_id in list(self.queue.scheduled):
             vehicle: SumoVehicle = self.queue.vehicles[vehicle_id]
-            region_id, _ = vehicle.get_current_visit()
             # Vehicle already arrived, sooner then plan was generated, remove schedule
-            if traci.vehicle.getRoadID(vehicle_id) in self.regions[region_id].edges:
-                self.queue.remove_schedule(vehicle, simulation.get_time())
+            index: Optional[int] = self.get_route_index(vehicle_id, backend, time)
+            if index is not None and (
+                    index >= vehicle.visits[vehicle.current_visit][1] and self.queue.remove_schedule(vehicle, time)):
+                estimate[vehicle_id] = index
+        # Vehicles which should already be in region, but are not
+        vehicle: Optional[SumoVehicle] = self.queue.peek()
+        while vehicle is not None and vehicle.eta <= time:
+            self.queue.pop()
+            index: Optional[int] = self.get_route_index(vehicle.id, backend, time)
+            if index is not None and (
+                    index < vehicle.visits[vehicle.current_visit][1] or self.queue.remove_schedule(vehicle, time)):
+                estimate[vehicle.id] = index
+            vehicle = self.queue.peek()
+        self.estimate(estimate, backend, time)
+        return self.schedule(time)
+
+    # ------------------------------------------- Events -------------------------------------------
+
+    def add_vehicle(self, vehicle_id: str, backend: SimulationBackend, time: float) -> bool:
+        """
+        :param vehicle_id: id of vehicle which departed
+        :param backend: of running simulation
+        :param time: current time
+        :return: True if vehicle visits regions (and was added to queue), False otherwise
+        """
+        try:
+            route: Tuple[str] = backend.get_route(vehicle_id)
+        except SimulationError:  # Vehicle left simulation in the same step
+            return False
+        vehicle: SumoVehicle = SumoVehicle({"id": vehicle_id}, route, time)
+        for region_id, index in self.get_visits(route):
+            vehicle.add_visit(region_id, index)
+        if not vehicle.visits:
+            return False
+        self.queue.add_vehicle(vehicle)
+        self.engine.add_vehicle(vehicle_id, route)
         return True
 
-    # def assign_routes(self, ):
-
-    # ------------------------------------------- Vehicle arrival -------------------------------------------
-
-
-    # 3 Problems of vehicle arrival:
-    # 1) Left simulation -> discard vehicle
-    # 2) Vehicle arriving sooner/later than expected, check interval then decide
-    # 3) Vehicle arrived prior to even ETA being decided, reschedule for later if possible
-
-    def check_arrival(self, vehicle_id: str, time: float) -> None:
+    def set_arrival(self, vehicle_id: str, time: float) -> None:
         """
-        :param vehicle_id: id of the vehicle
+        :param vehicle_id: id of vehicle which left the simulation
         :param time: current time
-        :return:
+        :return: None
         """
-        # Vehicle was discarded from routing (does not go to the regions)
-        if vehicle_id not in self.queue.vehicles:
-            return
-        # Make sure that vehicle is still in simulation
-        assert(vehicle_id not in self.queue.arrived)
-        vehicle: SumoVehicle = self.queue.vehicles[vehicle_id]
-        scheduled: bool = (vehicle_id in self.queue.scheduled)
-        running: bool = (vehicle_id in self.queue.running)
-        in_region: bool = ()
-        # Check if vehicle arrived earlier than expected
-
-
-
-        # Check if vehicle has not arrived withing provided time
-
-
+        self.queue.set_arrival(vehicle_id, time)
+        self.engine.remove_vehicle(vehicle_id)
 
+    def schedule(self, time: float) -> Dict[int, List[str]]:
+        """
+        If the ETA of head of queue is within lead time, all vehicles
+        with ETA inside horizon are scheduled for planning.
 
-        return
+        :param time: current time
+        :return: Mapping of region id to vehicles scheduled for planning
+        """
+        batches: Dict[int, List[str]] = {}
+        vehicle: Optional[SumoVehicle] = self.queue.peek()
+        if vehicle is None or vehicle.eta > time + self.lead_time:
+            return batches
+        while vehicle is not None and vehicle.eta <= time + self.horizon:
+            self.queue.pop()
+            self.queue.schedule(vehicle)
+            batches.setdefault(vehicle.visits[vehicle.current_visit][0], []).append(vehicle.id)
+            vehicle = self.queue.peek()
+        print(f"Scheduled: {sum(len(vehicles) for vehicles in batches.values())} vehicles for planning at: {time}")
+        return batches
+
+    # ------------------------------------------- Fast-forward -------------------------------------------
+
+    def set_departures(self, vehicles: Iterable[Tuple[float, Sequence[str]]]) -> None:
+        """
+        :param vehicles: planned departures and routes of all vehicles in simulation
+        :return: None
+        """
+        self.departures = np.sort(np.array(
+            [depart for depart, route in vehicles if self.get_visits(route)], dtype=np.float64
+        ))
 
+    def next_event(self, simulation: Simulation) -> float:
+        """
+        Finds time of the next event (departure of vehicle visiting regions, ETA of head
+        of queue entering lead time, update of travel times), until which nothing has to be
+        processed and simulation can be fast-forwarded.
 
+        :param simulation: running simulation
+        :return: Time of the next event, current time if simulation cannot be fast-forwarded
+        """
+        time: float = simulation.get_time()
+        # Departures are unknown, scheduled vehicles are checked each step, delayed vehicles can depart at any step
+        if self.departures is None or self.queue.scheduled or simulation.backend.get_pending_ids():
+            return time
+        events: List[float] = [time if self.last_update < 0 else self.last_update + self.update_period]
+        index: int = int(np.searchsorted(self.departures, time, side="right"))
+        if index < len(self.departures):
+            events.append(float(self.departures[index]))
+        vehicle: Optional[SumoVehicle] = self.queue.peek()
+        if vehicle is not None:
+            events.append(vehicle.eta - self.lead_time)
+        return max(min(events), time)
 
     # ------------------------------------------- Utils -------------------------------------------
 
-    def compute_etas(self, network: RoadNetwork, simulation: Simulation) -> bool:
+    def get_visits(self, route: Sequence[str]) -> List[Tuple[int, int]]:
         """
-        :param network:
-        :return:
+        :param route: edges of vehicle's route
+        :return: Entries into regions (region id, route index), sorted by route index
         """
-        if not simulation.is_running():
-            return False
-        # Update average travel time on edges
-        for edge in network.edges.values():
-            edge.attributes["travelTime"] = (edge.attributes["travelTime"] + traci.edge.getTraveltime(edge)) / 2
-        # Update ETA's of vehicles based on new information
-        for vehicle_id in self.queue.running:
-            vehicle: SumoVehicle = self.queue.vehicles[vehicle_id]
-            current: int = traci.vehicle.getRoadID(vehicle_id)
-            if current >= vehicle.visits[vehicle.current_visit][1]:
-                diff: float = round(abs(vehicle.get_expected_arrival()), 3)
-                print(f"Vehicle '{vehicle_id}' arrived to region earlier than expected by: {diff} [s]")
-            else:
-                vehicle.set_eta(sum(
-                    [edge.attributes["travelTime"] for edge in network.get_edges(vehicle.get_current_route(current))]
-                ))
-            # If vehicle ETA is within expected interval, consider it for scheduling
-
-
-
-        return True
-
-
-
-
-
-
-
-
-
-
-
-
+        visits: List[Tuple[int, int]] = []
+        # Vehicle must not start inside of region
+        for region_id, region in enumerate(self.regions):
+            for index in range(1, len(route)):
+                if route[index] in region.edges and route[index - 1] not in region.edges:
+                    visits.append((region_id, index))
+        visits.sort(key=lambda visit: visit[1])
+        return visits
+
+    def get_route_index(self, vehicle_id: str, backend: SimulationBackend, time: float) -> Optional[int]:
+        """
+        :param vehicle_id: id of running vehicle
+        :param backend: of running simulation
+        :param time: current time
+        :return: Index of current edge in vehicle's route, None if vehicle already
+            left simulation (failed lookup is processed as arrival of vehicle)
+        """
+        try:
+            return backend.get_route_index(vehicle_id)
+        except SimulationError:
+            self.set_arrival(vehicle_id, time)
+        return None
 
+    def estimate(self, vehicles: Dict[str, int], backend: SimulationBackend, time: float) -> None:
+        """
+        Estimates arrival of vehicles to their current regions and updates their positions in queue.
 
+        :param vehicles: mapping of running vehicles to their current index in route (-1 if it should be queried)
+        :param backend: of running simulation
+        :param time: current time
+        :return: None
+        """
+        indexes: Dict[str, Optional[int]] = {
+            vehicle_id: index if index >= 0 else self.get_route_index(vehicle_id, backend, time)
+            for vehicle_id, index in vehicles.items() if vehicle_id in self.queue.running
+        }
+        vehicle_ids: List[str] = [vehicle_id for vehicle_id, index in indexes.items() if index is not None]
+        if not vehicle_ids:
+            return
+        starts: np.ndarray = np.array([indexes[vehicle_id] for vehicle_id in vehicle_ids], dtype=np.int64).clip(0)
+        ends: np.ndarray = np.array([
+            self.queue.vehicles[vehicle_id].visits[self.queue.vehicles[vehicle_id].current_visit][1]
+            for vehicle_id in vehicle_ids
+        ], dtype=np.int64)
+        # Vehicle at region boundary is expected in the next step
+        etas: np.ndarray = np.maximum(time + self.engine.estimate(vehicle_ids, starts, ends), time + 1e-3)
+        for vehicle_id, eta, start, end in zip(vehicle_ids, etas.tolist(), starts.tolist(), ends.tolist()):
+            watched: List[int] = self.engine.get_edges(vehicle_id, start, end).tolist()
+            self.queue.push(self.queue.vehicles[vehicle_id], eta, watched)
+        return
@@ -0,0 +1,189 @@
+from utc.src.constants.static.pddl_constants import PlanningCost
+from utc.src.constants.file_system.file_types.json_file import JsonFile
+from utc.src.routing.pddl.base.pddl_problem import PddlProblem
+from utc.src.routing.pddl.base.pddl_vehicle import PddlVehicle
+from utc.src.routing.pddl.pddl_options import PddlPlanningOptions
+from utc.src.routing.traffic.problem_generator import ProblemGenerator
+from utc.src.utils.vehicle_extractor import VehicleExtractor, VehicleEntry
+import numpy as np
+from typing import Optional, Iterator, Tuple, List
+
+
+class WindowScheduler:
+    """
+    Class scheduling time windows of planning adaptively, based on predicted planning
+    cost of pddl problems (vehicles, size of sub-graph, allowed predicates), quiet windows
+    are merged and overloaded ones split, so that planning stays within the timeout budget.
+    Candidate windows are compared by cheap estimate (from the number of departing vehicles,
+    scaled by sizes of previously built problems), only the chosen window is built.
+    """
+    def __init__(
+            self, options: PddlPlanningOptions,
+            problem_generator: ProblemGenerator,
+            vehicle_extractor: VehicleExtractor
+        ):
+        """
+        :param options: of planning (window, minimal & maximal window, timeout)
+        :param problem_generator: generator of pddl problems
+        :param vehicle_extractor: extractor of vehicles from scenario
+        """
+        assert(options.min_window <= options.window <= options.max_window)
+        self.options: PddlPlanningOptions = options
+        self.problem_generator: ProblemGenerator = problem_generator
+        self.vehicle_extractor: VehicleExtractor = vehicle_extractor
+        # Maximal estimated planning time (seconds) of problem
+        self.budget: float = options.timeout * PlanningCost.BUDGET
+        # Coefficients of planning cost (vehicle, route, allowed), fitted from previous planning if available
+        self.coefficients: Tuple[float, float, float] = (
+            PlanningCost.VEHICLE, PlanningCost.ROUTE, PlanningCost.ALLOWED
+        )
+        if options.cost_model and not self.fit_cost(options.cost_model):
+            print(f"Unable to fit planning cost from: '{options.cost_model}', using default coefficients")
+        # Features (planned vehicles, routes, allowed) of built problems per departing vehicle
+        self.scale: Optional[np.ndarray] = None
+
+    def generate_problems(self, start_time: int, end_time: int) -> Iterator[PddlProblem]:
+        """
+        :param start_time: of the first window
+        :param end_time: time after which no more windows are created
+        :return: generator of (saved) PddlProblem classes
+        """
+        window: int = self.options.window
+        count: int = 0
+        while start_time < end_time:
+            print("***" * 15)
+            window = self.choose_window(start_time, end_time, window)
+            problem, cost = self.build_problem((start_time, start_time + window))
+            # Estimate was too optimistic, split overloaded window by estimate (scaled by the built problem)
+            while cost > self.budget and window > self.options.min_window:
+                window = self.split_window(start_time, window, cost)
+                problem, cost = self.build_problem((start_time, start_time + window))
+            count += 1
+            print(f"Window: {count}, interval: {(start_time, start_time + window)}, estimated cost: {round(cost, 3)}s")
+            if problem is None:
+                print(f"Unable to extract vehicles in interval: {start_time, start_time + window}")
+            elif self.problem_generator.save_problem(
+                    problem, self.problem_generator.new_scenario.scenario_dir.problems.format_file(problem.name)
+                    ):
+                yield problem
+            else:
+                print(f"Unable to save pddl problem: '{problem.name}'")
+            start_time += window
+
+    def choose_window(self, start_time: int, end_time: int, window: int) -> int:
+        """
+        Splits overloaded and merges quiet windows, based on cheap estimate of planning cost
+        (before any problem is built, previous window is kept).
+
+        :param start_time: of window
+        :param end_time: time after which no more windows are created
+        :param window: size of previous window
+        :return: Size of window
+        """
+        if self.scale is None:
+            return window
+        cost: float = self.estimate_cost((start_time, start_time + window))
+        if cost > self.budget:
+            window = self.split_window(start_time, window, cost)
+            cost = self.estimate_cost((start_time, start_time + window))
+        # Merge quiet windows
+        while cost < (self.budget / 2) and window < self.options.max_window and start_time + window < end_time:
+            larger: int = min(window * 2, self.options.max_window)
+            larger_cost: float = self.estimate_cost((start_time, start_time + larger))
+            if larger_cost > self.budget:
+                break
+            print(f"Estimated planning time: {round(cost, 3)}s is under budget, extending window to: {larger}s")
+            window, cost = larger, larger_cost
+        return window
+
+    def split_window(self, start_time: int, window: int, cost: float) -> int:
+        """
+        Halves overloaded window, until its estimated planning cost is within budget.
+
+        :param start_time: of window
+        :param window: size of window
+        :param cost: planning cost of window
+        :return: Size of window
+        """
+        while cost > self.budget and window > self.options.min_window:
+            window = max(window // 2, self.options.min_window)
+            print(f"Estimated planning time: {round(cost, 3)}s is over budget, shrinking window to: {window}s")
+            cost = self.estimate_cost((start_time, start_time + window))
+        return window
+
+    # ----------------------------------- Utils -----------------------------------
+
+    def build_problem(self, interval: Tuple[int, int]) -> Tuple[Optional[PddlProblem], float]:
+        """
+        :param interval: of vehicles arrival
+        :return: PddlProblem (not saved) and its estimated planning time, None and 0 if there are no vehicles
+        """
+        entry: Optional[VehicleEntry] = self.vehicle_extractor.estimate_arrival_naive(interval)
+        if entry is None or not entry.vehicles:
+            return None, 0.
+        problem: Optional[PddlProblem] = self.problem_generator.generate_problem(
+            entry, f"problem_{interval[0]}_{interval[1]}", self.options.domain, save=False
+        )
+        cost: float = self.predict_cost(problem)
+        # Remember size of problem relative to the number of departing vehicles
+        if problem is not None and problem.is_valid():
+            planned: List[PddlVehicle] = problem.container.get_planned_vehicles()
+            self.scale = np.array([
+                len(planned), len(problem.network.routes), sum(len(vehicle.sub_graph) for vehicle in planned)
+            ], dtype=float) / len(entry.vehicles)
+        return problem, cost
+
+    def estimate_cost(self, interval: Tuple[int, int]) -> float:
+        """
+        :param interval: of vehicles arrival
+        :return: Estimated planning time in seconds (without building problem), 0 if there are no vehicles
+        """
+        vehicles: Optional[list] = self.vehicle_extractor.get_vehicles(interval)
+        if not vehicles or self.scale is None:
+            return 0.
+        return PlanningCost.estimate(*(self.scale * len(vehicles)), coefficients=self.coefficients)
+
+    # noinspection PyMethodMayBeStatic
+    def predict_cost(self, problem: Optional[PddlProblem]) -> float:
+        """
+        :param problem: pddl problem with network and vehicles (before saving)
+        :return: Estimated planning time in seconds, 0 if problem is invalid
+        """
+        if problem is None or not problem.is_valid():
+            return 0.
+        planned: List[PddlVehicle] = problem.container.get_planned_vehicles()
+        return PlanningCost.estimate(
+            len(planned), len(problem.network.routes),
+            sum(len(vehicle.sub_graph) for vehicle in planned), coefficients=self.coefficients
+        )
+
+    def fit_cost(self, info_path: str) -> bool:
+        """
+        Fits coefficients of planning cost (least squares, non-negative) to planning times
+        recorded in pddl info file (problems solved by planner, not loaded from plan store).
+
+        :param info_path: path to pddl info file of previous planning
+        :return: True on success, False otherwise
+        """
+        data: Optional[dict] = JsonFile(info_path).load_data()
+        if data is None:
+            return False
+        features: List[Tuple[int, int, int]] = []
+        times: List[float] = []
+        for key, episode in data.items():
+            if not key.startswith("e") or not isinstance(episode, dict) or episode.get("result") is None:
+                continue
+            result: dict = episode["result"]
+            if result.get("plans", 0) == 0 or result.get("stored", 0) or result.get("time", 0) <= 0:
+                continue
+            features.append((
+                episode["vehicle"]["scheduled"], episode["problem"]["routes"], episode["problem"]["allowed"]
+            ))
+            times.append(result["time"])
+        if len(times) < len(self.coefficients):
+            print(f"Not enough solved problems to fit planning cost, got: {len(times)}")
+            return False
+        solution: np.ndarray = np.linalg.lstsq(np.array(features, dtype=float), np.array(times), rcond=None)[0]
+        self.coefficients = tuple(float(value) for value in np.clip(solution, 0, None))
+        print(f"Fitted planning cost coefficients (vehicle, route, allowed): {self.coefficients}")
+        return True
@@ -2,3 +2,4 @@ from utc.src.routing.traffic.result_generator import ResultGenerator
 from utc.src.routing.traffic.problem_generator import ProblemGenerator
 from utc.src.routing.traffic.parser import Parser
 
+from utc.src.routing.traffic.fallback_router import FallbackRouter
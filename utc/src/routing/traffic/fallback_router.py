@@ -0,0 +1,130 @@
+from utc.src.constants.static.pddl_constants import NetworkCapacity
+from utc.src.routing.pddl.base.pddl_problem import PddlProblem
+from utc.src.routing.pddl.base.pddl_vehicle import PddlVehicle
+from utc.src.routing.pddl.domains.network_domain import NetworkDomain
+from utc.src.graph import RoadNetwork, Route, Junction
+from heapq import heappush, heappop
+from typing import Optional, Dict, List, Tuple, Set
+
+
+class FallbackRouter:
+    """
+    Class routing vehicles of pddl problem greedily (one by one), on their allowed routes
+    (sub-graph formed by alternatives filtered by DBSCAN), with the same capacity thresholds
+    and penalization as pddl domains. Used when planner did not find any result
+    (or as baseline to compare planner with), results are in the same format as parsed pddl results.
+    """
+    def __init__(self):
+        self.network_domain: NetworkDomain = NetworkDomain()
+
+    def route_vehicles(self, problem: PddlProblem) -> Dict[str, List[int]]:
+        """
+        Vehicles are routed in the order of their pddl id's, each vehicle
+        increases the usage of routes it drives on for the following ones.
+
+        :param problem: pddl problem (already saved, i.e. vehicles are scheduled)
+        :return: Dictionary mapping vehicle id (abstract) to list of route id's (internal)
+        """
+        paths: Dict[str, List[int]] = {}
+        if problem is None or not problem.is_valid():
+            print("Unable to route vehicles of invalid pddl problem!")
+            return paths
+        print(f"Routing vehicles of problem: '{problem.name}' by fallback router")
+        network: RoadNetwork = problem.network
+        occupied: Dict[str, int] = problem.container.get_occupied_edges()
+        # Current usage of routes, thresholds and costs
+        usage: Dict[int, int] = {}
+        thresholds: Dict[int, Tuple[int, int, int]] = {}
+        costs: Dict[int, Dict[str, int]] = {}
+        for route in network.routes.values():
+            route_id: int = route.get_id(True)
+            usage[route_id] = self.network_domain.get_usage(route, occupied)
+            threshold: Dict[str, int] = self.network_domain.get_thresholds(route.get_capacity())
+            thresholds[route_id] = (
+                threshold["light"], threshold["light"] + threshold["medium"], route.get_capacity()
+            )
+            costs[route_id] = self.network_domain.get_penalization(route)
+        # Route vehicles one by one
+        for pddl_vehicle in sorted(problem.container.get_planned_vehicles(), key=lambda v: int(v.pddl_id[1:])):
+            path: Optional[List[int]] = self.find_path(pddl_vehicle, network, usage, thresholds, costs)
+            if path is None:
+                print(f"Fallback router was unable to find route for vehicle: '{pddl_vehicle.pddl_id}'")
+                continue
+            for route_id in path:
+                # Congested roads do not increase usage (same as in pddl domain)
+                if usage[route_id] < thresholds[route_id][2]:
+                    usage[route_id] += 1
+            paths[pddl_vehicle.pddl_id] = path
+        print(f"Fallback router routed: {len(paths)}/{len(problem.container.get_planned_vehicles())} vehicles")
+        return paths
+
+    def find_path(
+            self, pddl_vehicle: PddlVehicle, network: RoadNetwork, usage: Dict[int, int],
+            thresholds: Dict[int, Tuple[int, int, int]], costs: Dict[int, Dict[str, int]]
+        ) -> Optional[List[int]]:
+        """
+        Finds the cheapest path (Dijkstra) for vehicle on its allowed routes,
+        given the current usage of routes.
+
+        :param pddl_vehicle: vehicle to be routed
+        :param network: road network of pddl problem
+        :param usage: current number of vehicles on routes
+        :param thresholds: cumulative capacity thresholds of routes (light, medium, capacity)
+        :param costs: mapping of traffic density to cost of driving on routes
+        :return: List of route id's (internal), None if path does not exist
+        """
+        allowed: Set[int] = set(pddl_vehicle.sub_graph)
+        ending: Set[int] = set(pddl_vehicle.allowed_ending) & allowed
+        # (cost, route_id)
+        queue: List[Tuple[int, int]] = []
+        distance: Dict[int, int] = {}
+        previous: Dict[int, Optional[int]] = {}
+        for route_id in (set(pddl_vehicle.allowed_starting) & allowed):
+            if route_id not in usage:
+                continue
+            distance[route_id] = self.get_cost(route_id, usage, thresholds, costs)
+            previous[route_id] = None
+            heappush(queue, (distance[route_id], route_id))
+        while queue:
+            cost, route_id = heappop(queue)
+            if cost > distance[route_id]:
+                continue
+            elif route_id in ending:  # Reconstruct path
+                path: List[int] = []
+                while route_id is not None:
+                    path.append(route_id)
+                    route_id = previous[route_id]
+                return path[::-1]
+            route: Route = network.get_route(route_id)
+            junction: Junction = network.get_junction(route.get_destination())
+            for out_route in junction.connections.get(route, []):
+                out_id: int = out_route.get_id(True)
+                if out_id not in allowed or out_id not in usage:
+                    continue
+                new_cost: int = cost + self.get_cost(out_id, usage, thresholds, costs)
+                if new_cost < distance.get(out_id, new_cost + 1):
+                    distance[out_id] = new_cost
+                    previous[out_id] = route_id
+                    heappush(queue, (new_cost, out_id))
+        return None
+
+    # noinspection PyMethodMayBeStatic
+    def get_cost(
+            self, route_id: int, usage: Dict[int, int],
+            thresholds: Dict[int, Tuple[int, int, int]], costs: Dict[int, Dict[str, int]]
+        ) -> int:
+        """
+        :param route_id: internal id of route
+        :param usage: current number of vehicles on routes
+        :param thresholds: cumulative capacity thresholds of routes (light, medium, capacity)
+        :param costs: mapping of traffic density to cost of driving on routes
+        :return: Cost of driving on route, given its current usage
+        """
+        light, medium, capacity = thresholds[route_id]
+        if usage[route_id] < light:
+            return costs[route_id]["light"]
+        elif usage[route_id] < medium:
+            return costs[route_id]["medium"]
+        elif usage[route_id] < capacity:
+            return costs[route_id]["heavy"]
+        return NetworkCapacity.CONGESTED_COST
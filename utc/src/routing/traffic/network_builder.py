@@ -11,6 +11,9 @@ class NetworkBuilder:
     """
     Class building road networks for pddl problem files
     """
+    # Maximal number of memorized road networks of sub-graphs
+    MAX_PARTS: int = 1500
+
     def __init__(self, graph: Graph, sub_graph: Graph, options: NetworkOptions):
         """
         :param graph: on which vehicles are driving
@@ -22,9 +25,14 @@ class NetworkBuilder:
         self.sub_graph: Graph = sub_graph
         self.options: NetworkOptions = options
         self.allowed_edges: Dict[str, Set[str]] = self.prepare_graph(graph, sub_graph)
+        if options.topka.heuristic == "landmarks" and not sub_graph.path_finder.landmarks.prepare(options.topka.landmarks):
+            print("Unable to prepare landmarks for sub-graph, TopKA* will use euclidean heuristic")
         self.sim_clustering: SimilarityClustering = SimilarityClustering(options.dbscan)
-        # Memory of previously constructed sub-graphs
+        # Memory of previously constructed sub-graphs (valid for network with given fingerprint)
         self.cache: Cache = Cache()
+        # Road networks of sub-graphs (merged to form network of problem), ordered from the least recently used
+        self.parts: Dict[FrozenSet[int], RoadNetwork] = {}
+        self.fingerprint: str = sub_graph.road_network.get_fingerprint()
 
     # ------------------------------------------ Network construction ------------------------------------------
 
@@ -37,35 +45,83 @@ class NetworkBuilder:
         assert(container is not None)
         return self.combine_parts(self.build_parts(container))
 
-    def combine_parts(self, edges: Set[int]) -> Optional[RoadNetwork]:
+    def combine_parts(self, parts: Set[FrozenSet[int]]) -> Optional[RoadNetwork]:
         """
-        :param edges: which will form the road_network
+        Sub-graphs are merged by union in pairs, so that cost is proportional to their size
+        (instead of the size of the whole sub-graph network), the result is then copied,
+        since union shares objects with the memorized road networks of sub-graphs.
+
+        :param parts: sub-graphs (internal id's of edges) which will form the road_network
         :return: Road network build from combining all subgraph's, None if error occurred
         """
-        if edges is None or not edges:
+        if parts is None or not parts:
+            return None
+        networks: List[Optional[RoadNetwork]] = [self.get_part(part) for part in parts]
+        if any(network is None for network in networks):
+            return None
+        while len(networks) > 1:
+            merged: List[Optional[RoadNetwork]] = [
+                networks[i].union(networks[i + 1], self.sub_graph.road_network)
+                for i in range(0, len(networks) - 1, 2)
+            ]
+            if any(network is None for network in merged):
+                return None
+            networks = merged + networks[len(merged) * 2:]
+        network: RoadNetwork = RoadNetwork()
+        if not network.load(networks[0]):
             return None
-        return self.sub_graph.sub_graph.create_sub_graph(self.sub_graph.road_network.get_edges(edges))
+        network.edge_connections = {
+            edge_id: set(incoming) for edge_id, incoming in networks[0].edge_connections.items()
+        }
+        return network
+
+    def get_part(self, part: FrozenSet[int]) -> Optional[RoadNetwork]:
+        """
+        :param part: sub-graph (internal id's of edges)
+        :return: Road network of sub-graph (memorized, must not be modified), None if error occurred
+        """
+        # Re-inserted, so that the least recently used sub-graph is the first one
+        network: Optional[RoadNetwork] = self.parts.pop(part, None)
+        if network is None:
+            network = self.sub_graph.sub_graph.create_sub_graph(self.sub_graph.road_network.get_edges(part))
+            if network is None:
+                return None
+            elif len(self.parts) >= self.MAX_PARTS:
+                self.parts.pop(next(iter(self.parts)))
+        self.parts[part] = network
+        return network
 
-    def build_parts(self, container: VehicleContainer) -> Optional[Set[int]]:
+    def build_parts(self, container: VehicleContainer) -> Optional[Set[FrozenSet[int]]]:
         """
         :param container: of vehicles
-        :return: True on success, false otherwise
+        :return: Sub-graphs of vehicles (shared ones only once), None if error occurred
         """
         print(f"Building sub-graphs for {len(container.vehicles)} vehicles")
         # Checks
         if not container.vehicles:
             print("Invalid vehicles, mapping is empty, cannot construct subgraph!")
             return None
-        edges: Set[int] = set()
+        # Sub-graph was patched, previously constructed sub-graphs are no longer valid
+        if self.fingerprint != self.sub_graph.road_network.get_fingerprint():
+            print("Network of sub-graph changed, clearing memory of sub-graphs")
+            self.cache.clear()
+            self.parts.clear()
+            self.fingerprint = self.sub_graph.road_network.get_fingerprint()
+        parts: Set[FrozenSet[int]] = set()
         count: int = 0
+        vehicles: List[PddlVehicle] = list(container.vehicles.values())
+        # Group vehicles by destination, so that they share reverse search trees
+        if self.options.topka.heuristic == "tree":
+            vehicles.sort(key=self.get_destination)
         # For all vehicle generate corresponding sub-graph (all found edges)
-        for pddl_vehicle in container.vehicles.values():
+        for pddl_vehicle in vehicles:
             pddl_vehicle.sub_graph = self.generate_routes(pddl_vehicle, container.info)
             if pddl_vehicle.sub_graph is not None:
-                edges |= pddl_vehicle.sub_graph
+                parts.add(pddl_vehicle.sub_graph)
                 count += 1
+        self.sub_graph.path_finder.clear_trees()
         print(f"Found: {count} sub-graphs")
-        return edges
+        return parts
 
     # ------------------------------------------ Route generation ------------------------------------------
 
@@ -136,10 +192,18 @@ class NetworkBuilder:
         if self.cache.has_mapping(pddl_vehicle.allowed_starting, pddl_vehicle.allowed_ending):
             # print(f"Mapping for vehicle exists ...")
             return self.cache.get_mapping(pddl_vehicle.allowed_starting, pddl_vehicle.allowed_ending)
-        routes: List[Route] = self.sub_graph.path_finder.top_k_a_star(
-            start_junction.id, end_junction.id,
-            c=self.options.topka.c, k=self.options.topka.k
-        )
+        if self.options.alternatives == "penalty":
+            routes: List[Route] = self.sub_graph.path_finder.diverse_routes(
+                start_junction.id, end_junction.id, c=self.options.topka.c,
+                k=self.options.penalty.k, penalty=self.options.penalty.penalty,
+                max_similarity=self.options.penalty.max_similarity,
+                attempts=self.options.penalty.attempts, heuristic=self.options.topka.heuristic
+            )
+        else:
+            routes: List[Route] = self.sub_graph.path_finder.top_k_a_star(
+                start_junction.id, end_junction.id,
+                c=self.options.topka.c, k=self.options.topka.k, heuristic=self.options.topka.heuristic
+            )
         # Reset allowed on routes
         for out_route in start_junction.get_out_routes():
             out_route.allowed_first = True
@@ -157,7 +221,9 @@ class NetworkBuilder:
             tmp[indexes[0]:indexes[1]] = found_route.get_edge_ids()
             # print(f"Found route: {found_route}")
             assert(self.graph.road_network.check_edge_sequence(tmp))
-        # Apply clustering on routes
+        # Apply clustering on routes (routes of penalty method are already diverse)
+        if self.options.alternatives == "penalty":
+            return self.cache.save_mapping(pddl_vehicle.allowed_starting, pddl_vehicle.allowed_ending, routes)
         indexes: Optional[List[int]] = self.sim_clustering.calculate(routes)
         if indexes is not None and indexes:
             # print(f"Applied DBSCAN on routes ...")
@@ -166,6 +232,16 @@ class NetworkBuilder:
 
     # ---------------------------------------- Utils ----------------------------------------
 
+    def get_destination(self, pddl_vehicle: PddlVehicle) -> str:
+        """
+        :param pddl_vehicle: class holding attributes of vehicle
+        :return: Id of junction where vehicle leaves sub-graph, empty if it does not drive on it
+        """
+        edges, _ = self.sub_graph.road_network.get_longest_sequence(
+            pddl_vehicle.original_route.attrib["edges"].split()
+        )
+        return edges[-1].to_junction if edges else ""
+
     def prepare_graph(self, graph: Graph, sub_graph: Graph) -> Dict[str, Set[str]]:
         """
         :param graph: original graph
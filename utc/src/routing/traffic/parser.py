@@ -17,16 +17,20 @@ class Parser:
         self.graph: Graph = graph
         self.sub_graph: Optional[Graph] = sub_graph
 
-    def process_result(self, episode: PddlEpisode) -> Optional[Dict[Element, Element]]:
+    def process_result(
+            self, episode: PddlEpisode, paths: Optional[Dict[str, List[int]]] = None
+        ) -> Optional[Dict[Element, Element]]:
         """
         :param episode: pddl episode
+        :param paths: routes of vehicles (abstract id -> internal route id's), if not given
+        they are parsed from pddl result of episode (e.g. found by fallback router)
         :return: Mapping of vehicle paired with new routes in XML format
         """
         # print(f"Processing episode: {episode.id}")
         # Check episode
         if episode is None or episode.problem is None:
             raise ValueError("Error, received invalid episode!")
-        elif not episode.is_valid():
+        elif paths is None and not episode.is_valid():
             print("Unable to process episode, no results were generated, returning default paths")
             return {
                 vehicle.vehicle.to_xml(): vehicle.original_route
@@ -35,7 +39,8 @@ class Parser:
         # Parse result
         new_paths: Dict[Element, Element] = {}
         routed: Set[str] = set()
-        for vehicle_id, pddl_routes in episode.result.parse_result().items():
+        paths = episode.result.parse_result() if paths is None else paths
+        for vehicle_id, pddl_routes in paths.items():
             vehicle: PddlVehicle = episode.problem.container.get_vehicle(vehicle_id)
             routed.add(vehicle.vehicle.id)
             assert(vehicle is not None)
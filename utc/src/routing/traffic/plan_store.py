@@ -0,0 +1,98 @@
+from utc.src.constants.static import DirPaths, FileExtension
+from utc.src.constants.file_system.my_directory import MyDirectory
+from utc.src.constants.file_system.my_file import MyFile
+from utc.src.routing.pddl.base.pddl_problem import PddlProblem
+from utc.src.routing.pddl.base.pddl_result import PddlResult
+from typing import Optional, List
+
+
+class PlanStore:
+    """
+    Class storing plans found by planner on disk, plans are identified by canonical
+    fingerprint of pddl problems and planner which found them (and saved with canonical
+    names of vehicles), which enables re-using them for identical problems (e.g. from
+    different time windows).
+    """
+    def __init__(self, dir_path: str = DirPaths.PDDL_PLANS):
+        """
+        :param dir_path: path to directory in which plans are stored (created if it does not exist)
+        """
+        self.directory: MyDirectory = MyDirectory(dir_path)
+        assert(self.directory.initialize_dir())
+        self.hits: int = 0
+        self.misses: int = 0
+
+    # ------------------------------------ Getters ------------------------------------
+
+    def has_plan(self, problem: PddlProblem, planner: str) -> bool:
+        """
+        :param problem: pddl problem (already saved, i.e. with fingerprint)
+        :param planner: name of planner (or portfolio of planners)
+        :return: True if plan for the given problem is stored, False otherwise
+        """
+        if problem is None or problem.fingerprint is None:
+            return False
+        return MyFile.file_exists(self.get_path(problem, planner), message=False)
+
+    def load_plan(self, problem: PddlProblem, planner: str, out_dir: MyDirectory) -> Optional[PddlResult]:
+        """
+        :param problem: pddl problem (already saved, i.e. with fingerprint)
+        :param planner: name of planner (or portfolio of planners)
+        :param out_dir: directory where result file will be saved
+        :return: PddlResult of stored plan (with names of vehicles of given problem), None if it does not exist
+        """
+        if not self.has_plan(problem, planner):
+            self.misses += 1
+            return None
+        result_name: str = problem.name.replace("problem", "result")
+        result_path: str = out_dir.format_file(result_name + FileExtension.PDDL)
+        try:
+            with open(self.get_path(problem, planner), "r") as plan_file:
+                plan: List[str] = problem.fingerprint.restore_plan(plan_file.read().splitlines())
+            with open(result_path, "w") as result_file:
+                result_file.write("\n".join(plan) + "\n")
+        except OSError as e:
+            print(f"Error: '{e}' while loading stored plan of problem: '{problem.name}'!")
+            self.misses += 1
+            return None
+        self.hits += 1
+        result: PddlResult = PddlResult(result_name, [result_path])
+        result.info.plans = 1
+        result.info.stored = 1
+        cost: float = PddlResult.get_cost(result_path)
+        if cost != float("inf"):
+            result.info.cost = int(cost)
+        return result
+
+    def get_path(self, problem: PddlProblem, planner: str) -> str:
+        """
+        :param problem: pddl problem (already saved, i.e. with fingerprint)
+        :param planner: name of planner (or portfolio of planners)
+        :return: Path to stored plan of problem
+        """
+        return self.directory.format_file(f"{problem.fingerprint.digest}_{planner}" + FileExtension.PDDL)
+
+    # ------------------------------------ Utils ------------------------------------
+
+    def save_plan(self, problem: PddlProblem, planner: str, result: Optional[PddlResult]) -> bool:
+        """
+        Stores the last plan of result (the one used when parsing), previously stored plans are not replaced.
+
+        :param problem: pddl problem (already saved, i.e. with fingerprint)
+        :param planner: name of planner (or portfolio of planners) which found the plan
+        :param result: pddl result of the given problem
+        :return: True on success, False otherwise
+        """
+        if problem is None or problem.fingerprint is None or result is None or not result.files:
+            return False
+        elif self.has_plan(problem, planner):
+            return True
+        try:
+            with open(result.files[-1], "r") as result_file:
+                plan: List[str] = problem.fingerprint.canonize_plan(result_file.read().splitlines())
+            with open(self.get_path(problem, planner), "w") as plan_file:
+                plan_file.write("\n".join(plan) + "\n")
+        except OSError as e:
+            print(f"Error: '{e}' while storing plan of problem: '{problem.name}'!")
+            return False
+        return True
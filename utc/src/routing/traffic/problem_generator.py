@@ -2,11 +2,12 @@ from utc.src.routing.pddl.base.pddl_problem import PddlProblem, VehicleContainer
 from utc.src.routing.pddl.pddl_options import NetworkOptions
 from utc.src.routing.traffic.network_builder import NetworkBuilder
 from utc.src.routing.pddl.domains.network_domain import NetworkDomain
+from utc.src.routing.pddl.domains.numeric_domain import NumericNetworkDomain
 from utc.src.routing.pddl.domains.vehicle_domain import VehicleDomain
 from utc.src.graph import Graph
 from utc.src.simulator.scenario import Scenario
 from utc.src.simulator.vehicle.vehicle_entry import VehicleEntry
-from typing import Optional
+from typing import Optional, Dict
 
 
 class ProblemGenerator:
@@ -24,6 +25,10 @@ class ProblemGenerator:
         self.new_scenario: Scenario = new_scenario
         self.network_builder: NetworkBuilder = NetworkBuilder(graph, sub_graph, options)
         self.network_domain: NetworkDomain = NetworkDomain()
+        # Domains requiring different representation of network (default one is used otherwise)
+        self.network_domains: Dict[str, NetworkDomain] = {
+            "utc_numeric": NumericNetworkDomain()
+        }
         self.vehicle_domain: VehicleDomain = VehicleDomain()
 
     def generate_problem(self, entry: VehicleEntry, name: str, domain: str, save: bool = True) -> Optional[PddlProblem]:
@@ -57,7 +62,8 @@ class ProblemGenerator:
             return False
         elif not problem.container.schedule_task():
             return False
-        network_success: bool = self.network_domain.process_graph(problem)
+        network_domain: NetworkDomain = self.network_domains.get(problem.domain, self.network_domain)
+        network_success: bool = network_domain.process_graph(problem)
         vehicle_success: bool = self.vehicle_domain.process_vehicles(problem)
         if not (network_success and vehicle_success):
             raise ValueError(
@@ -3,10 +3,15 @@ from utc.src.constants.static.pddl_constants import PLANNERS
 from utc.src.constants.file_system.directory_types.scenario_dir import MyDirectory, ScenarioDir
 from utc.src.constants.file_system.my_file import MyFile
 from utc.src.routing.pddl.pddl_episode import PddlProblem, PddlResult
+from utc.src.routing.pddl.base.pddl_struct import PddlStruct
+from utc.src.routing.pddl.base.pddl_fingerprint import PddlFingerprint
 from utc.src.routing.pddl.pddl_options import PddlPlanningOptions
+from utc.src.routing.traffic.plan_store import PlanStore
 from utc.src.utils.task_manager import TaskManager
 import glob
-from typing import Optional, List
+import time
+from os.path import getmtime
+from typing import Optional, List, Callable
 
 
 class ResultGenerator:
@@ -14,7 +19,13 @@ class ResultGenerator:
     Class handling the generation of pddl result files
     """
     def __init__(self, options: Optional[PddlPlanningOptions] = None):
+        """
+        :param options: of planning, if 'plan_store' is set, previously found plans are re-used
+        """
         self.options: Optional[PddlPlanningOptions] = options
+        self.plan_store: Optional[PlanStore] = None
+        if self.options is not None and self.options.plan_store:
+            self.plan_store = PlanStore()
 
     def generate_results(
             self, problems: List[PddlProblem], domain: str, planner: str,
@@ -42,31 +53,68 @@ class ResultGenerator:
         elif scenario_dir is None or not scenario_dir.is_loaded():
             print("Scenario directory is invalid!")
             return results
+        # Either single planner, or portfolio of planners racing on each problem
+        generate: Callable[..., Optional[PddlResult]] = self.generate_result
+        # Plans in plan store are kept separately for each planner (or portfolio and its race mode)
+        key: str = planner
+        if self.options is not None and self.options.portfolio:
+            print(f"Using portfolio of planners: {self.options.portfolio}, accepting '{self.options.race}' plan")
+            key = "-".join(self.options.portfolio + [self.options.race])
+            generate, planner = self.generate_result_portfolio, self.options.portfolio
+        # Load plans of already solved problems (if plan store is used)
+        results = [None] * len(problems)
+        if self.plan_store is not None:
+            for problem in problems:
+                self.set_fingerprint(problem, scenario_dir.problems.format_file(problem.name + FileExtension.PDDL))
+            results = [self.plan_store.load_plan(problem, key, scenario_dir.results) for problem in problems]
+            print(f"Loaded: {self.plan_store.hits} plans from plan store, misses: {self.plan_store.misses}")
+        # Indexes of problems, which have to be planned
+        unsolved: List[int] = [index for index, result in enumerate(results) if result is None]
         # Decide between multi and single process approach
         out_dir: MyDirectory = scenario_dir.create_sub_dir("out")
-        if processes > 1:  # Multi
+        if processes > 1 and unsolved:  # Multi
             print(f"Starting multi-process queue with: {processes} processes")
             # Create
             task_manager: TaskManager = TaskManager(processes)
-            for index, problem in enumerate(problems):
-                task_manager.tasks.append((self.generate_result, tuple([
-                    scenario_dir.problems.format_file(problem.name + FileExtension.PDDL), domain, planner,
+            for index in unsolved:
+                task_manager.tasks.append((generate, tuple([
+                    scenario_dir.problems.format_file(problems[index].name + FileExtension.PDDL), domain, planner,
                     scenario_dir.results, timeout, out_dir.create_sub_dir(f"out{index}").dir_path
                 ])))
-            results = task_manager.start()
+            for index, result in zip(unsolved, task_manager.start()):
+                results[index] = result
         else:  # Single
-            results = [
-                self.generate_result(
-                    scenario_dir.problems.format_file(problem.name + FileExtension.PDDL),
+            for index in unsolved:
+                results[index] = generate(
+                    scenario_dir.problems.format_file(problems[index].name + FileExtension.PDDL),
                     domain, planner, scenario_dir.results, timeout, out_dir.dir_path
                 )
-                for problem in problems
-            ]
+        # Store newly found plans
+        if self.plan_store is not None:
+            for index in unsolved:
+                self.plan_store.save_plan(problems[index], key, results[index])
         # Delete temporary directories for planner output (if options is true)
         MyDirectory.delete_directory(out_dir.dir_path, recursive=True)
         print(f"Finished, generated: {len(scenario_dir.get_results())} PDDL result files")
         return results
 
+    # noinspection PyMethodMayBeStatic
+    def set_fingerprint(self, problem: PddlProblem, problem_file: str) -> None:
+        """
+        Computes canonical fingerprint of problem (identifying its plans in plan store), states
+        of problem are cleared once it is saved, so they are loaded from its file.
+
+        :param problem: saved pddl problem
+        :param problem_file: path to pddl problem file
+        :return: None
+        """
+        if problem.fingerprint is not None or not problem.is_valid():
+            return
+        struct: PddlStruct = PddlStruct()
+        if struct.load(problem_file):
+            problem.fingerprint = PddlFingerprint(struct, problem.domain, network=problem.network.get_fingerprint())
+        return
+
     def generate_result(
             self, problem_file: str, domain: str, planner: str,
             out_dir: MyDirectory, timeout: float = 27.0,
@@ -82,20 +130,7 @@ class ResultGenerator:
         :return: True on success, false otherwise
         """
         # ----- Checks -----
-        if timeout < 10:
-            print(f"Timeout has to be at least 10 seconds, got: {timeout}!")
-            return None
-        elif not MyFile.file_exists(problem_file):
-            return None
-        elif not MyFile.file_exists(FilePaths.PDDL_DOMAIN.format(domain)):
-            return None
-        elif not PLANNERS.get_planner(planner):
-            return None
-        elif not MyFile.get_file_name(problem_file).startswith("problem"):
-            print(f"Problem file names has to contain 'problem', got: {MyFile.get_file_name(problem_file)} !")
-            return None
-        elif out_dir is None or not out_dir.is_loaded():
-            print("Received invalid output directory for pddl result files")
+        if not self.check_input(problem_file, domain, [planner], out_dir, timeout):
             return None
         # Call planner
         result_name: str = MyFile.get_file_name(problem_file).replace("problem", "result")
@@ -103,15 +138,129 @@ class ResultGenerator:
         planner_call: str = PLANNERS.get_planner(planner).format(
             FilePaths.PDDL_DOMAIN.format(domain), problem_file, result_path
         )
+        start: float = time.time()
         success, _ = TaskManager.call_shell(planner_call, timeout=timeout, message=False, cwd=working_dir)
         if not success:
             return None
         # Find the generated files (if they exist)
-        files: List[str] = glob.glob(out_dir.format_file(result_name + ".*"))
+        files: List[str] = PddlResult.sort_files(glob.glob(out_dir.format_file(result_name + ".*")))
         if not files:
             return None
         result: PddlResult = PddlResult(result_name, files)
         result.info.timeout = timeout
         result.info.plans = len(files)
+        result.info.time = round(min(getmtime(file) for file in files) - start, 3)
+        return result
+
+    def generate_result_portfolio(
+            self, problem_file: str, domain: str, planners: List[str],
+            out_dir: MyDirectory, timeout: float = 27.0,
+            working_dir: Optional[str] = None
+        ) -> Optional[PddlResult]:
+        """
+        Runs all planners in parallel on the same problem, accepts either the first found plan,
+        or the best one (by cost) found by timeout (depending on options), other planners are killed.
+
+        :param problem_file: path to pddl problem file
+        :param domain: name of pddl domain
+        :param planners: names of planners
+        :param out_dir: directory where result files will be save
+        :param timeout: time limit of seconds planners can work
+        :param working_dir: current working directory (where planners store intermediate
+        results, each planner has its own sub-directory)
+        :return: PddlResult of chosen planner, None if no plan was found
+        """
+        # ----- Checks -----
+        if not self.check_input(problem_file, domain, planners, out_dir, timeout):
+            return None
+        result_name: str = MyFile.get_file_name(problem_file).replace("problem", "result")
+        commands: List[str] = []
+        directories: List[Optional[str]] = []
+        for index, planner in enumerate(planners):
+            commands.append(PLANNERS.get_planner(planner).format(
+                FilePaths.PDDL_DOMAIN.format(domain), problem_file,
+                out_dir.format_file(f"{result_name}_p{index}") + FileExtension.PDDL
+            ))
+            directories.append(
+                None if working_dir is None else MyDirectory(working_dir).create_sub_dir(f"p{index}").dir_path
+            )
+
+        def find_plans(planner_index: int) -> List[str]:
+            """
+            :param planner_index: index of planner
+            :return: Sorted result files generated by planner
+            """
+            return PddlResult.sort_files(glob.glob(out_dir.format_file(f"{result_name}_p{planner_index}.*")))
+
+        def has_plan(planner_index: int) -> bool:
+            """
+            :param planner_index: index of planner
+            :return: True if planner finished writing at least one plan
+            """
+            return any(PddlResult.is_complete(file) for file in find_plans(planner_index))
+
+        first: bool = (self.options is None or self.options.race == "first")
+        start: float = time.time()
+        winner: int = TaskManager.race_shell(
+            commands, timeout, directories, has_plan if first else (lambda _: False), message=False
+        )
+        # Plans which were not completely written before planners were killed are discarded
+        plans: List[List[str]] = [find_plans(index) for index in range(len(planners))]
+        for files in plans:
+            for file in [file for file in files if not PddlResult.is_complete(file)]:
+                MyFile.delete_file(file)
+                files.remove(file)
+        # Choose plans, either of the first planner or the best plan among planners
+        chosen: int = winner
+        if winner == -1:
+            costs: List[float] = [
+                PddlResult.get_cost(files[-1]) if files else float("inf") for files in plans
+            ]
+            chosen = min(range(len(planners)), key=lambda index: costs[index])
+            chosen = chosen if costs[chosen] != float("inf") else -1
+        # Remove plans of other planners
+        for index, files in enumerate(plans):
+            if index != chosen:
+                for file in files:
+                    MyFile.delete_file(file)
+        if chosen == -1:
+            return None
+        result: PddlResult = PddlResult(result_name, plans[chosen])
+        result.info.timeout = timeout
+        result.info.plans = len(plans[chosen])
+        result.info.time = round(min(getmtime(file) for file in plans[chosen]) - start, 3)
+        cost: float = PddlResult.get_cost(plans[chosen][-1])
+        if cost != float("inf"):
+            result.info.cost = int(cost)
+        print(f"Planner: '{planners[chosen]}' won the race for: '{result_name}'")
         return result
 
+    # noinspection PyMethodMayBeStatic
+    def check_input(
+            self, problem_file: str, domain: str, planners: List[str],
+            out_dir: MyDirectory, timeout: float
+        ) -> bool:
+        """
+        :param problem_file: path to pddl problem file
+        :param domain: name of pddl domain
+        :param planners: names of planners
+        :param out_dir: directory where result files will be save
+        :param timeout: time limit of seconds planner can work
+        :return: True if arguments for planner call are valid, False otherwise
+        """
+        if timeout < 10:
+            print(f"Timeout has to be at least 10 seconds, got: {timeout}!")
+            return False
+        elif not MyFile.file_exists(problem_file):
+            return False
+        elif not MyFile.file_exists(FilePaths.PDDL_DOMAIN.format(domain)):
+            return False
+        elif not planners or not all(PLANNERS.get_planner(planner) for planner in planners):
+            return False
+        elif not MyFile.get_file_name(problem_file).startswith("problem"):
+            print(f"Problem file names has to contain 'problem', got: {MyFile.get_file_name(problem_file)} !")
+            return False
+        elif out_dir is None or not out_dir.is_loaded():
+            print("Received invalid output directory for pddl result files")
+            return False
+        return True
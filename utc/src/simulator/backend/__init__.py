@@ -0,0 +1,4 @@
+from utc.src.simulator.backend.backend import SimulationBackend, SimulationError
+from utc.src.simulator.backend.fake_backend import FakeBackend
+from utc.src.simulator.backend.libsumo_backend import LibsumoBackend
+from utc.src.simulator.backend.traci_backend import TraciBackend
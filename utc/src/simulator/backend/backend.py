@@ -0,0 +1,216 @@
+from utc.src.utils.options.SumoOptions import SumoOptions
+from typing import List, Tuple, Dict
+
+
+class SimulationError(Exception):
+    """ Exception raised by simulation backends when command sent to simulation fails """
+    pass
+
+
+class SimulationBackend:
+    """
+    Interface of simulation backends (e.g. TraCI, libsumo) used by Simulation class,
+    provides commands querying and changing the running simulation.
+    """
+    def __init__(self, label: str = ""):
+        """
+        :param label: of simulation instance (identifies simulation in case of multiple running at once)
+        """
+        self.label: str = label
+        self._open: bool = False
+        # Edges whose travel times are collected each step
+        self.subscribed: List[str] = []
+
+    # ------------------------------------------------- Control -------------------------------------------------
+
+    def start(self, sumo_options: SumoOptions) -> bool:
+        """
+        :param sumo_options: options of simulation (configuration file, command)
+        :return: True on success, False otherwise
+        """
+        raise NotImplementedError("Error, method 'start' must be implemented by children of 'SimulationBackend'!")
+
+    def close(self) -> None:
+        """
+        :return: None
+        """
+        raise NotImplementedError("Error, method 'close' must be implemented by children of 'SimulationBackend'!")
+
+    def step(self, target_time: float = 0.) -> None:
+        """
+        :param target_time: time to which simulation should be advanced, if 0 only single step is performed
+        :return: None
+        """
+        raise NotImplementedError("Error, method 'step' must be implemented by children of 'SimulationBackend'!")
+
+    def save_state(self, file_path: str) -> None:
+        """
+        :param file_path: path to file in which state (snapshot) of simulation is saved
+        :return: None
+        :raises SimulationError: if state could not be saved
+        """
+        raise NotImplementedError("Error, method 'save_state' must be implemented by children of 'SimulationBackend'!")
+
+    def load_state(self, file_path: str) -> None:
+        """
+        :param file_path: path to file with state (snapshot) of simulation
+        :return: None
+        :raises SimulationError: if state could not be loaded
+        """
+        raise NotImplementedError("Error, method 'load_state' must be implemented by children of 'SimulationBackend'!")
+
+    def is_loaded(self) -> bool:
+        """
+        :return: True if simulation is loaded (started and not closed), False otherwise
+        """
+        return self._open
+
+    # ------------------------------------------------- Simulation -------------------------------------------------
+
+    def get_time(self) -> float:
+        """
+        :return: Current time of simulation (seconds)
+        """
+        raise NotImplementedError("Error, method 'get_time' must be implemented by children of 'SimulationBackend'!")
+
+    def get_min_expected_number(self) -> int:
+        """
+        :return: Number of vehicles which are running or are yet to be inserted into simulation
+        """
+        raise NotImplementedError(
+            "Error, method 'get_min_expected_number' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_departed_ids(self) -> Tuple[str, ...]:
+        """
+        :return: Id's of vehicles which departed in the last step
+        """
+        raise NotImplementedError(
+            "Error, method 'get_departed_ids' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_arrived_ids(self) -> Tuple[str, ...]:
+        """
+        :return: Id's of vehicles which arrived (left simulation) in the last step
+        """
+        raise NotImplementedError(
+            "Error, method 'get_arrived_ids' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_vehicle_ids(self) -> Tuple[str, ...]:
+        """
+        :return: Id's of vehicles currently running in simulation
+        """
+        raise NotImplementedError(
+            "Error, method 'get_vehicle_ids' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_pending_ids(self) -> Tuple[str, ...]:
+        """
+        :return: Id's of vehicles waiting for insertion (their departure is delayed)
+        """
+        return ()
+
+    # ------------------------------------------------- Vehicles -------------------------------------------------
+
+    def get_route(self, vehicle_id: str) -> Tuple[str, ...]:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Edges of vehicle's route
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError("Error, method 'get_route' must be implemented by children of 'SimulationBackend'!")
+
+    def get_route_id(self, vehicle_id: str) -> str:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Id of vehicle's route
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError(
+            "Error, method 'get_route_id' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_route_index(self, vehicle_id: str) -> int:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Index of current edge in vehicle's route, -1 if vehicle did not depart yet
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError(
+            "Error, method 'get_route_index' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_road_id(self, vehicle_id: str) -> str:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Id of edge on which vehicle currently is
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError("Error, method 'get_road_id' must be implemented by children of 'SimulationBackend'!")
+
+    def get_departure(self, vehicle_id: str) -> float:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Time at which vehicle departed
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError(
+            "Error, method 'get_departure' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def get_depart_delay(self, vehicle_id: str) -> float:
+        """
+        :param vehicle_id: id of running vehicle
+        :return: Delay of vehicle's departure (compared to its planned departure)
+        :raises SimulationError: if vehicle is not known (e.g. it already left simulation)
+        """
+        raise NotImplementedError(
+            "Error, method 'get_depart_delay' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def set_route(self, vehicle_id: str, edges: List[str]) -> None:
+        """
+        :param vehicle_id: id of running vehicle
+        :param edges: new route of vehicle (must start with vehicle's current edge)
+        :return: None
+        :raises SimulationError: if route could not be assigned
+        """
+        raise NotImplementedError("Error, method 'set_route' must be implemented by children of 'SimulationBackend'!")
+
+    def set_routes(self, routes: Dict[str, List[str]]) -> List[str]:
+        """
+        :param routes: mapping of vehicle id to its new route (must start with vehicle's current edge)
+        :return: Id's of vehicles, to which route could not be assigned
+        """
+        failed: List[str] = []
+        for vehicle_id, edges in routes.items():
+            try:
+                self.set_route(vehicle_id, edges)
+            except SimulationError:
+                failed.append(vehicle_id)
+        return failed
+
+    # ------------------------------------------------- Edges -------------------------------------------------
+
+    def get_travel_time(self, edge_id: str) -> float:
+        """
+        :param edge_id: id of edge
+        :return: Current estimated travel time of edge (seconds)
+        """
+        raise NotImplementedError(
+            "Error, method 'get_travel_time' must be implemented by children of 'SimulationBackend'!"
+        )
+
+    def subscribe_travel_times(self, edge_ids: List[str]) -> None:
+        """
+        :param edge_ids: id's of edges, whose travel times should be collected each step
+        :return: None
+        """
+        self.subscribed = list(edge_ids)
+
+    def get_travel_times(self) -> Dict[str, float]:
+        """
+        :return: Mapping of subscribed edges to their current travel times
+        """
+        return {edge_id: self.get_travel_time(edge_id) for edge_id in self.subscribed}
@@ -0,0 +1,351 @@
+from utc.src.constants.file_system.my_file import MyFile
+from utc.src.simulator.backend.backend import SimulationBackend, SimulationError
+from utc.src.utils.options.SumoOptions import SumoOptions
+import xml.etree.ElementTree as ET
+import pickle
+from typing import List, Tuple, Dict, Optional
+
+
+class FakeVehicle:
+    """ Class representing vehicle driving in fake simulation """
+    def __init__(self, vehicle_id: str, depart: float, route_id: str, route: List[str]):
+        """
+        :param vehicle_id: id of vehicle
+        :param depart: planned departure time
+        :param route_id: id of vehicle's route
+        :param route: edges of vehicle's route
+        """
+        self.id: str = vehicle_id
+        self.depart: float = depart
+        self.route_id: str = route_id
+        self.route: List[str] = route
+        # -1 if vehicle did not depart yet
+        self.index: int = -1
+        self.departure: float = -1
+        # Time at which vehicle leaves its current edge
+        self.exit_time: float = -1
+
+
+class FakeBackend(SimulationBackend):
+    """
+    Scripted backend, which does not require SUMO, vehicles (and their routes) are loaded from files of
+    configuration file and are driven along their routes by travel times of edges (computed from network,
+    replayed from edge data of previous run, or set by user), there are no interactions between vehicles.
+    Used for testing and benchmarking (number of vehicles can be scaled).
+    """
+    def __init__(
+            self, label: str = "", travel_times: Dict[str, float] = None,
+            default_travel_time: float = 10., edge_data: str = "", scale: float = 1.
+        ):
+        """
+        :param label: of simulation
+        :param travel_times: mapping of edge id to travel time, overrides values computed from network
+        :param default_travel_time: travel time of edges not found in network
+        :param edge_data: path to edge dump file (".out.xml"), whose travel times are replayed by intervals
+        :param scale: of number of vehicles (vehicles are sampled evenly, or duplicated, with suffix '#n')
+        """
+        super().__init__(label)
+        assert(scale > 0)
+        self.travel_times: Dict[str, float] = {}
+        self.network_travel_times: Dict[str, float] = {}
+        self.overrides: Dict[str, float] = (travel_times or {})
+        self.default_travel_time: float = default_travel_time
+        self.edge_data: str = edge_data
+        self.scale: float = scale
+        # Travel times of edges from edge data (begin of interval, mapping of edge id to travel time)
+        self.intervals: List[Tuple[float, Dict[str, float]]] = []
+        self.interval: int = -1
+        self.step_length: float = 1.
+        self.time: float = 0.
+        self.vehicles: Dict[str, FakeVehicle] = {}
+        # Vehicles sorted by departure (in reverse, so the first one can be popped)
+        self.pending: List[str] = []
+        self.running: Dict[str, FakeVehicle] = {}
+        self.departed: List[str] = []
+        self.arrived: List[str] = []
+
+    # ------------------------------------------------- Control -------------------------------------------------
+
+    def start(self, sumo_options: SumoOptions) -> bool:
+        config = sumo_options.config_file
+        self.step_length = config.get_step_length()
+        self.time = float(config.get_start_time())
+        self.network_travel_times = self.load_travel_times(config.get_network())
+        self.travel_times = dict(self.network_travel_times)
+        self.travel_times.update(self.overrides)
+        self.intervals = self.load_edge_data(self.edge_data) if self.edge_data else []
+        self.interval = -1
+        self.update_interval()
+        file_paths: List[str] = [file_path.strip() for file_path in config.get_additional_files()]
+        routes_file = config.root.find("input").find("route-files")
+        if routes_file is not None and routes_file.attrib.get("value", ""):
+            file_paths += [
+                config.resolve_relative_path(config.dir_path, file_path.strip())
+                for file_path in routes_file.attrib["value"].split(",")
+            ]
+        self.vehicles = self.scale_vehicles(self.load_vehicles(file_paths), self.scale)
+        self.pending = sorted(self.vehicles, key=lambda vehicle_id: self.vehicles[vehicle_id].depart, reverse=True)
+        self.running.clear()
+        self.departed, self.arrived = [], []
+        print(f"Loaded fake simulation with: {len(self.vehicles)} vehicles, {len(self.travel_times)} edges")
+        self._open = True
+        return True
+
+    def close(self) -> None:
+        self._open = False
+        self.running.clear()
+        self.pending.clear()
+        return
+
+    def step(self, target_time: float = 0.) -> None:
+        while True:
+            self.time += self.step_length
+            self.update_interval()
+            # Vehicles of previous steps (for target time) are not reported, same as in SUMO
+            self.departed, self.arrived = [], []
+            while self.pending and self.vehicles[self.pending[-1]].depart <= self.time:
+                vehicle: FakeVehicle = self.vehicles[self.pending.pop()]
+                vehicle.index, vehicle.departure = 0, self.time
+                vehicle.exit_time = self.time + self.get_travel_time(vehicle.route[0])
+                self.running[vehicle.id] = vehicle
+                self.departed.append(vehicle.id)
+            for vehicle in list(self.running.values()):
+                while vehicle.exit_time <= self.time:
+                    vehicle.index += 1
+                    if vehicle.index == len(vehicle.route):
+                        self.running.pop(vehicle.id)
+                        self.arrived.append(vehicle.id)
+                        break
+                    vehicle.exit_time += self.get_travel_time(vehicle.route[vehicle.index])
+            if self.time + self.step_length / 2 >= target_time:
+                break
+        return
+
+    def save_state(self, file_path: str) -> None:
+        try:
+            with open(file_path, "wb") as state_file:
+                pickle.dump((self.time, self.vehicles, self.pending, list(self.running)), state_file)
+        except OSError as e:
+            raise SimulationError(f"Unable to save state: '{file_path}', error: {e}") from e
+        return
+
+    def load_state(self, file_path: str) -> None:
+        try:
+            with open(file_path, "rb") as state_file:
+                self.time, self.vehicles, self.pending, running = pickle.load(state_file)
+        except (OSError, pickle.UnpicklingError, ValueError) as e:
+            raise SimulationError(f"Unable to load state: '{file_path}', error: {e}") from e
+        self.running = {vehicle_id: self.vehicles[vehicle_id] for vehicle_id in running}
+        self.departed, self.arrived = [], []
+        self.update_interval()
+        return
+
+    # ------------------------------------------------- Simulation -------------------------------------------------
+
+    def get_time(self) -> float:
+        return self.time
+
+    def get_min_expected_number(self) -> int:
+        return len(self.pending) + len(self.running)
+
+    def get_departed_ids(self) -> Tuple[str, ...]:
+        return tuple(self.departed)
+
+    def get_arrived_ids(self) -> Tuple[str, ...]:
+        return tuple(self.arrived)
+
+    def get_vehicle_ids(self) -> Tuple[str, ...]:
+        return tuple(self.running)
+
+    # ------------------------------------------------- Vehicles -------------------------------------------------
+
+    def get_route(self, vehicle_id: str) -> Tuple[str, ...]:
+        return tuple(self.get_vehicle(vehicle_id).route)
+
+    def get_route_id(self, vehicle_id: str) -> str:
+        return self.get_vehicle(vehicle_id).route_id
+
+    def get_route_index(self, vehicle_id: str) -> int:
+        return self.get_vehicle(vehicle_id).index
+
+    def get_road_id(self, vehicle_id: str) -> str:
+        vehicle: FakeVehicle = self.get_vehicle(vehicle_id)
+        return "" if vehicle.index < 0 else vehicle.route[vehicle.index]
+
+    def get_departure(self, vehicle_id: str) -> float:
+        return self.get_vehicle(vehicle_id).departure
+
+    def get_depart_delay(self, vehicle_id: str) -> float:
+        vehicle: FakeVehicle = self.get_vehicle(vehicle_id)
+        return 0. if vehicle.index < 0 else vehicle.departure - vehicle.depart
+
+    def set_route(self, vehicle_id: str, edges: List[str]) -> None:
+        vehicle: FakeVehicle = self.get_vehicle(vehicle_id)
+        if not edges:
+            raise SimulationError(f"Unable to set empty route to vehicle: '{vehicle_id}'!")
+        elif vehicle.index >= 0 and edges[0] != vehicle.route[vehicle.index]:
+            raise SimulationError(
+                f"Route replacement for vehicle: '{vehicle_id}' must start at its "
+                f"current edge: '{vehicle.route[vehicle.index]}', got: '{edges[0]}'!"
+            )
+        vehicle.route = list(edges)
+        vehicle.index = min(vehicle.index, 0)
+        return
+
+    # ------------------------------------------------- Edges -------------------------------------------------
+
+    def get_travel_time(self, edge_id: str) -> float:
+        return self.travel_times.get(edge_id, self.default_travel_time)
+
+    def set_travel_time(self, edge_id: str, travel_time: float) -> None:
+        """
+        :param edge_id: id of edge
+        :param travel_time: new travel time of edge (used by vehicles entering edge)
+        :return: None
+        """
+        self.overrides[edge_id] = self.travel_times[edge_id] = travel_time
+        return
+
+    def update_interval(self) -> None:
+        """
+        Updates travel times of edges by those of the current interval from edge data (if there is new one).
+
+        :return: None
+        """
+        # State loaded from snapshot can be before the current interval
+        if self.interval >= 0 and self.intervals[self.interval][0] > self.time:
+            self.travel_times = dict(self.network_travel_times)
+            self.interval = -1
+        index: int = self.interval
+        while index + 1 < len(self.intervals) and self.intervals[index + 1][0] <= self.time:
+            index += 1
+            self.travel_times.update(self.intervals[index][1])
+        if index != self.interval:
+            self.travel_times.update(self.overrides)
+            self.interval = index
+        return
+
+    # ------------------------------------------------- Utils -------------------------------------------------
+
+    def get_vehicle(self, vehicle_id: str) -> FakeVehicle:
+        """
+        :param vehicle_id: id of vehicle
+        :return: Vehicle
+        :raises SimulationError: if vehicle is not known, or has already arrived
+        """
+        vehicle: Optional[FakeVehicle] = self.vehicles.get(vehicle_id)
+        if vehicle is None or vehicle.index >= len(vehicle.route):
+            raise SimulationError(f"Vehicle: '{vehicle_id}' is not known!")
+        return vehicle
+
+    # noinspection PyMethodMayBeStatic
+    def load_travel_times(self, network_path: str) -> Dict[str, float]:
+        """
+        :param network_path: path to network file
+        :return: Mapping of edge id to travel time (length / speed of its first lane)
+        """
+        travel_times: Dict[str, float] = {}
+        if not MyFile.file_exists(network_path):
+            return travel_times
+        edge_id: Optional[str] = None
+        for event, element in ET.iterparse(network_path, events=("start", "end")):
+            if event == "start":
+                if element.tag == "edge":
+                    edge_id = None if element.attrib.get("function", "") == "internal" else element.attrib["id"]
+                elif element.tag == "lane" and edge_id is not None and edge_id not in travel_times:
+                    travel_times[edge_id] = float(element.attrib["length"]) / max(float(element.attrib["speed"]), 0.1)
+            elif element.tag == "edge":
+                element.clear()
+        return travel_times
+
+    # noinspection PyMethodMayBeStatic
+    def load_edge_data(self, file_path: str) -> List[Tuple[float, Dict[str, float]]]:
+        """
+        :param file_path: path to edge dump file
+        :return: List of intervals (begin, mapping of edge id to travel time), only edges
+        with measured travel time are included
+        """
+        intervals: List[Tuple[float, Dict[str, float]]] = []
+        if not MyFile.file_exists(file_path):
+            return intervals
+        for _, element in ET.iterparse(file_path, events=("end",)):
+            if element.tag == "interval":
+                intervals.append((float(element.attrib["begin"]), {
+                    edge.attrib["id"]: float(edge.attrib["traveltime"])
+                    for edge in element.iter("edge") if "traveltime" in edge.attrib
+                }))
+                element.clear()
+        intervals.sort(key=lambda interval: interval[0])
+        print(f"Loaded: {len(intervals)} intervals of travel times from: '{file_path}'")
+        return intervals
+
+    def load_vehicles(self, file_paths: List[str]) -> Dict[str, FakeVehicle]:
+        """
+        Vehicles departing at simulation start ('now', 'begin') are inserted at the current time,
+        vehicles waiting for trigger (persons, containers) are skipped, since they are not simulated.
+
+        :param file_paths: paths to files containing routes and vehicles
+        :return: Mapping of vehicle id to vehicle
+        """
+        routes: Dict[str, List[str]] = {}
+        vehicles: List[Tuple[str, float, str, Optional[List[str]]]] = []
+        skipped: int = 0
+        for file_path in file_paths:
+            if not MyFile.file_exists(file_path, message=False):
+                continue
+            for _, element in ET.iterparse(file_path, events=("end",)):
+                if element.tag == "route" and "id" in element.attrib:
+                    routes[element.attrib["id"]] = element.attrib["edges"].split()
+                elif element.tag == "vehicle":
+                    depart: Optional[float] = self.parse_depart(element.attrib.get("depart", "0"))
+                    if depart is None:
+                        skipped += 1
+                        element.clear()
+                        continue
+                    # Route can be defined inside of vehicle
+                    route: Optional[ET.Element] = element.find("route")
+                    vehicles.append((
+                        element.attrib["id"], depart,
+                        element.attrib.get("route", element.attrib["id"]),
+                        None if route is None else route.attrib["edges"].split()
+                    ))
+                    element.clear()
+        if skipped:
+            print(f"Skipped: {skipped} vehicles with triggered departure (not supported by fake simulation)")
+        return {
+            vehicle_id: FakeVehicle(vehicle_id, depart, route_id, list(edges or routes[route_id]))
+            for vehicle_id, depart, route_id, edges in vehicles if edges or route_id in routes
+        }
+
+    def parse_depart(self, depart: str) -> Optional[float]:
+        """
+        :param depart: departure attribute of vehicle
+        :return: Departure time, None if vehicle departure is triggered
+        """
+        if depart in ("now", "begin"):
+            return self.time
+        try:
+            return float(depart)
+        except ValueError:
+            return None
+
+    # noinspection PyMethodMayBeStatic
+    def scale_vehicles(self, vehicles: Dict[str, FakeVehicle], scale: float) -> Dict[str, FakeVehicle]:
+        """
+        :param vehicles: mapping of vehicle id to vehicle
+        :param scale: of number of vehicles, vehicles are sampled evenly (by departure)
+        or duplicated (copies have suffix '#n' and the same departure and route)
+        :return: Scaled mapping of vehicle id to vehicle
+        """
+        if scale == 1 or not vehicles:
+            return vehicles
+        ordered: List[FakeVehicle] = sorted(vehicles.values(), key=lambda vehicle: vehicle.depart)
+        scaled: Dict[str, FakeVehicle] = {}
+        copies: Dict[str, int] = {}
+        for index in range(round(len(ordered) * scale)):
+            vehicle: FakeVehicle = ordered[int(index / scale)]
+            copy: int = copies.get(vehicle.id, 0)
+            copies[vehicle.id] = copy + 1
+            vehicle_id: str = vehicle.id if copy == 0 else f"{vehicle.id}#{copy}"
+            scaled[vehicle_id] = FakeVehicle(vehicle_id, vehicle.depart, vehicle.route_id, list(vehicle.route))
+        return scaled
@@ -0,0 +1,35 @@
+from utc.src.simulator.backend.sumo_backend import SumoBackend
+from utc.src.utils.options.SumoOptions import SumoOptions
+
+
+class LibsumoBackend(SumoBackend):
+    """
+    Backend running SUMO inside of the current process trough libsumo (no socket communication),
+    libsumo supports only one simulation per process (and no GUI).
+    """
+    _running: bool = False
+
+    def start(self, sumo_options: SumoOptions) -> bool:
+        try:
+            import libsumo
+        except ImportError as e:
+            print(f"Unable to use libsumo backend, error: {e}")
+            return False
+        if LibsumoBackend._running:
+            print("Unable to start simulation, libsumo can only run one simulation per process!")
+            return False
+        try:
+            libsumo.start(sumo_options.create_command())
+        except libsumo.TraCIException as e:
+            print(f"Error occurred: {e}")
+            return False
+        self.api, self.api_error = libsumo, libsumo.TraCIException
+        self._open = LibsumoBackend._running = True
+        return True
+
+    def close(self) -> None:
+        if self._open:
+            self.api.close()
+            self.api = None
+            self._open = LibsumoBackend._running = False
+        return
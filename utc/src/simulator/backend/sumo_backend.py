@@ -0,0 +1,110 @@
+from utc.src.simulator.backend.backend import SimulationBackend, SimulationError
+from typing import List, Tuple, Dict, Any
+
+
+class SumoBackend(SimulationBackend):
+    """
+    Super class of backends running SUMO, commands are sent trough api (TraCI connection,
+    or libsumo module), both of which provide the same domains (simulation, vehicle, edge).
+    """
+    # Variable of edge subscription (same in TraCI and libsumo)
+    VAR_CURRENT_TRAVELTIME: int = 0x5a
+
+    def __init__(self, label: str = ""):
+        super().__init__(label)
+        # Object providing domains of commands (set once simulation is started)
+        self.api: Any = None
+        # Exception raised by api when command fails
+        self.api_error: type = Exception
+
+    # ------------------------------------------------- Control -------------------------------------------------
+
+    def step(self, target_time: float = 0.) -> None:
+        self.api.simulation.step(target_time)
+
+    def save_state(self, file_path: str) -> None:
+        try:
+            self.api.simulation.saveState(file_path)
+        except self.api_error as e:
+            raise SimulationError(f"Unable to save state: '{file_path}', error: {e}") from e
+
+    def load_state(self, file_path: str) -> None:
+        try:
+            self.api.simulation.loadState(file_path)
+        except self.api_error as e:
+            raise SimulationError(f"Unable to load state: '{file_path}', error: {e}") from e
+
+    # ------------------------------------------------- Simulation -------------------------------------------------
+
+    def get_time(self) -> float:
+        return self.api.simulation.getTime()
+
+    def get_min_expected_number(self) -> int:
+        return self.api.simulation.getMinExpectedNumber()
+
+    def get_departed_ids(self) -> Tuple[str, ...]:
+        return self.api.simulation.getDepartedIDList()
+
+    def get_arrived_ids(self) -> Tuple[str, ...]:
+        return self.api.simulation.getArrivedIDList()
+
+    def get_vehicle_ids(self) -> Tuple[str, ...]:
+        return self.api.vehicle.getIDList()
+
+    def get_pending_ids(self) -> Tuple[str, ...]:
+        return self.api.simulation.getPendingVehicles()
+
+    # ------------------------------------------------- Vehicles -------------------------------------------------
+
+    def get_route(self, vehicle_id: str) -> Tuple[str, ...]:
+        return self.vehicle_command("getRoute", vehicle_id)
+
+    def get_route_id(self, vehicle_id: str) -> str:
+        return self.vehicle_command("getRouteID", vehicle_id)
+
+    def get_route_index(self, vehicle_id: str) -> int:
+        return self.vehicle_command("getRouteIndex", vehicle_id)
+
+    def get_road_id(self, vehicle_id: str) -> str:
+        return self.vehicle_command("getRoadID", vehicle_id)
+
+    def get_departure(self, vehicle_id: str) -> float:
+        return self.vehicle_command("getDeparture", vehicle_id)
+
+    def get_depart_delay(self, vehicle_id: str) -> float:
+        return self.vehicle_command("getDepartDelay", vehicle_id)
+
+    def vehicle_command(self, command: str, vehicle_id: str) -> Any:
+        """
+        :param command: name of command in vehicle domain (e.g. 'getRoute')
+        :param vehicle_id: id of vehicle
+        :return: Result of command
+        :raises SimulationError: if command failed (e.g. vehicle is not known, or already left simulation)
+        """
+        try:
+            return getattr(self.api.vehicle, command)(vehicle_id)
+        except self.api_error as e:
+            raise SimulationError(f"Command: '{command}' failed for vehicle: '{vehicle_id}', error: {e}") from e
+
+    def set_route(self, vehicle_id: str, edges: List[str]) -> None:
+        try:
+            self.api.vehicle.setRoute(vehicle_id, edges)
+        except self.api_error as e:
+            raise SimulationError(str(e)) from e
+
+    # ------------------------------------------------- Edges -------------------------------------------------
+
+    def get_travel_time(self, edge_id: str) -> float:
+        return self.api.edge.getTraveltime(edge_id)
+
+    def subscribe_travel_times(self, edge_ids: List[str]) -> None:
+        super().subscribe_travel_times(edge_ids)
+        for edge_id in self.subscribed:
+            self.api.edge.subscribe(edge_id, [self.VAR_CURRENT_TRAVELTIME])
+        return
+
+    def get_travel_times(self) -> Dict[str, float]:
+        return {
+            edge_id: values[self.VAR_CURRENT_TRAVELTIME]
+            for edge_id, values in self.api.edge.getAllSubscriptionResults().items()
+        }
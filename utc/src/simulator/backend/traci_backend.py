@@ -0,0 +1,44 @@
+from utc.src.simulator.backend.sumo_backend import SumoBackend
+from utc.src.utils.options.SumoOptions import SumoOptions
+import traci
+from itertools import count
+from os import getpid
+
+
+class TraciBackend(SumoBackend):
+    """
+    Backend running SUMO in separate process, commands are sent trough TraCI connection (socket),
+    each instance has its own labelled connection, so that multiple simulations can run at once.
+    """
+    _counter = count()
+
+    def __init__(self, label: str = ""):
+        """
+        :param label: of TraCI connection, generated if not given (must be unique between running simulations)
+        """
+        super().__init__(label if label else f"utc_{getpid()}_{next(TraciBackend._counter)}")
+        self.api_error = traci.exceptions.TraCIException
+
+    def start(self, sumo_options: SumoOptions) -> bool:
+        try:
+            traci.start(sumo_options.create_command(), label=self.label)
+            self.api = traci.getConnection(self.label)
+            self._open = True
+        except traci.exceptions.FatalTraCIError as e:
+            # Closed by user
+            if str(e) == "connection closed by SUMO":
+                print("Closed GUI, exiting ....")
+            else:
+                print(f"Error occurred: {e}")
+            self._open = False
+        return self._open
+
+    def close(self) -> None:
+        if self._open:
+            try:
+                self.api.close()
+            except traci.exceptions.FatalTraCIError as e:
+                print(f"Error occurred while closing simulation: {e}")
+            self.api = None
+            self._open = False
+        return
@@ -2,6 +2,8 @@ from utc.src.constants.file_system.directory_types import ScenarioDir
 from utc.src.constants.file_system.file_types.sumo_config_file import SumoConfigFile, FilePaths
 from utc.src.constants.file_system.file_types.sumo_routes_file import SumoRoutesFile
 from utc.src.constants.file_system.file_types.sumo_vehicles_file import SumoVehiclesFile
+from utc.src.constants.static import FileExtension
+from utc.src.constants.file_system.my_file import MyFile
 from typing import Optional
 
 
@@ -42,10 +44,28 @@ class Scenario:
             self.config_file = SumoConfigFile(FilePaths.XmlTemplates.SUMO_CONFIG)
             self.routes_file = SumoRoutesFile(FilePaths.XmlTemplates.SUMO_ROUTES)
             self.vehicles_file = SumoVehiclesFile(FilePaths.XmlTemplates.SUMO_VEHICLE)
-        else:  # Load existing (have to exist)
+        else:  # Load existing (have to exist), files can be compressed
             self.config_file = SumoConfigFile(FilePaths.SCENARIO_CONFIG.format(self.name, self.name))
-            self.routes_file = SumoRoutesFile(FilePaths.SCENARIO_ROUTES.format(self.name, self.name))
-            self.vehicles_file = SumoVehiclesFile(FilePaths.SCENARIO_VEHICLES.format(self.name, self.name))
+            self.routes_file = SumoRoutesFile(self.get_path(FilePaths.SCENARIO_ROUTES.format(self.name, self.name)))
+            self.vehicles_file = SumoVehiclesFile(
+                self.get_path(FilePaths.SCENARIO_VEHICLES.format(self.name, self.name))
+            )
+
+    def stream(self, compress: bool = False) -> bool:
+        """
+        Starts streaming of routes and vehicles to files of scenario (scenario
+        directory has to be initialized), streams are finished by saving the scenario
+
+        :param compress: True if files should be compressed by gzip
+        :return: True on success, false otherwise
+        """
+        if None in (self.routes_file, self.vehicles_file):
+            print("Either routes or vehicle files are 'None', cannot stream scenario!")
+            return False
+        return (
+            self.routes_file.stream(FilePaths.SCENARIO_ROUTES.format(self.name, self.name), compress) and
+            self.vehicles_file.stream(FilePaths.SCENARIO_VEHICLES.format(self.name, self.name), compress)
+        )
 
     def save(self, road_network: str, with_directory: bool = True) -> bool:
         """
@@ -69,16 +89,23 @@ class Scenario:
         if None in (self.config_file, self.routes_file, self.vehicles_file):
             print("Either configuration or routes or vehicle files are 'None', cannot create scenario!")
             return False
+        # Streamed files are finished instead
+        routes_path: str = (
+            self.routes_file.get_stream_path() or FilePaths.SCENARIO_ROUTES.format(self.name, self.name)
+        )
+        vehicles_path: str = (
+            self.vehicles_file.get_stream_path() or FilePaths.SCENARIO_VEHICLES.format(self.name, self.name)
+        )
         # Create "scenario_routes.rou.xml"
-        elif not self.routes_file.save(FilePaths.SCENARIO_ROUTES.format(self.name, self.name)):
+        if not self.routes_file.save(routes_path):
             return False
         # Create vehicle file
-        elif not self.vehicles_file.save(FilePaths.SCENARIO_VEHICLES.format(self.name, self.name)):
+        elif not self.vehicles_file.save(vehicles_path):
             return False
         # Create ".sumocfg" (executable)
         self.config_file.set_network_file(road_network)
-        self.config_file.set_routes_file(FilePaths.SCENARIO_ROUTES.format(self.name, self.name))
-        self.config_file.set_additional_file(FilePaths.SCENARIO_VEHICLES.format(self.name, self.name))
+        self.config_file.set_routes_file(routes_path)
+        self.config_file.set_additional_file(vehicles_path)
         if not self.config_file.save(FilePaths.SCENARIO_CONFIG.format(self.name, self.name)):
             return False
         print(f"Scenario: '{self.name}' created successfully")
@@ -86,6 +113,16 @@ class Scenario:
 
     # ------------------------------------------ Utils ------------------------------------------
 
+    # noinspection PyMethodMayBeStatic
+    def get_path(self, file_path: str) -> str:
+        """
+        :param file_path: path to file of scenario
+        :return: Path to compressed file, if only the compressed one exists, original path otherwise
+        """
+        if not MyFile.file_exists(file_path, message=False) and MyFile.file_exists(file_path + FileExtension.GZ, False):
+            return file_path + FileExtension.GZ
+        return file_path
+
     def exists(self, message: bool = False) -> bool:
         """
         Scenarios exists, if its folder does exist and associated files,
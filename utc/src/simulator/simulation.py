@@ -1,28 +1,45 @@
 from utc.src.constants.static import DirPaths, FileExtension, FilePaths
 from utc.src.constants.file_system.file_types.sumo_config_file import SumoConfigFile
 from utc.src.utils.options.SumoOptions import SumoOptions
-import traci
+from utc.src.simulator.backend import SimulationBackend, SimulationError, TraciBackend, LibsumoBackend, FakeBackend
 import xml.etree.ElementTree as ET
 from typing import Optional, Union, List, Dict
 
 
+# Mapping of backend names (used in configuration) to their classes
+BACKENDS: Dict[str, type] = {
+    "traci": TraciBackend,
+    "libsumo": LibsumoBackend,
+    "fake": FakeBackend
+}
+
+
 class Simulation:
     """
-    Class representing SUMO simulation run by TraCI (traci) library.
-    Functions as wrapper around function, provides utility methods.
+    Class representing SUMO simulation run by backend (TraCI, libsumo, or fake one),
+    functions as wrapper around backend, provides utility methods.
     Has to be run by using "with" keyword.
     """
-    def __init__(self, config: Union[str, SumoConfigFile], options: Dict[str, str] = None, snapshot: str = ""):
+    def __init__(
+            self, config: Union[str, SumoConfigFile], options: Dict[str, str] = None,
+            snapshot: str = "", backend: Union[str, SimulationBackend] = "traci"
+        ):
         """
         :param config: configuration file or path to one
         :param options: simulation options
         :param snapshot: path to snapshot, default None
+        :param backend: name of backend running simulation (traci, libsumo, fake) or its instance, default traci
         """
         self.config: SumoConfigFile = config if isinstance(config, SumoConfigFile) else SumoConfigFile(config)
         self.sumo_options: SumoOptions = SumoOptions(self.config, options=options)
         self.snapshot: str = snapshot
+        self.backend: Optional[SimulationBackend] = backend if isinstance(backend, SimulationBackend) else None
+        if self.backend is None and backend in BACKENDS:
+            self.backend = BACKENDS[backend]()
+        elif self.backend is None:
+            print(f"Unknown simulation backend: '{backend}', expected one of: {list(BACKENDS.keys())}!")
         self.last_vehicle_depart: float = 0
-        self._open: bool = False
+        self.step_length: float = self.config.get_step_length() if self.config.is_loaded() else 1.
         self._step: int = 0
 
     # ------------------------------------------------- Getters -------------------------------------------------
@@ -36,15 +53,15 @@ class Simulation:
         vehicles: List[ET.Element] = [
             ET.Element("vehicle", {
                 "id": vehicle_id,
-                "depart": str(traci.vehicle.getDeparture(vehicle_id) - traci.vehicle.getDepartDelay(vehicle_id)),
-                "route": traci.vehicle.getRouteID(vehicle_id),
+                "depart": str(self.backend.get_departure(vehicle_id) - self.backend.get_depart_delay(vehicle_id)),
+                "route": self.backend.get_route_id(vehicle_id),
                 "type": "CarDefault",
                 "departLane": "best",
                 "departPos": "random_free",
                 "departSpeed": "max",
                 "arrivalPos": "max"
             })
-            for vehicle_id in traci.simulation.getDepartedIDList()
+            for vehicle_id in self.backend.get_departed_ids()
         ]
         return vehicles
 
@@ -56,10 +73,10 @@ class Simulation:
             return None
         ret_val: List[ET.Element] = [
             ET.Element("route", {
-                "id": traci.vehicle.getRouteID(vehicle_id),
-                "edges": " ".join(traci.vehicle.getRoute(vehicle_id)),
+                "id": self.backend.get_route_id(vehicle_id),
+                "edges": " ".join(self.backend.get_route(vehicle_id)),
             })
-            for vehicle_id in traci.simulation.getDepartedIDList()
+            for vehicle_id in self.backend.get_departed_ids()
         ]
         return ret_val
 
@@ -68,16 +85,16 @@ class Simulation:
         :param use_vehicle_time: measure time by last vehicle departure (False by default)
         :return: Current time in seconds
         """
-        if not traci.isLoaded():
+        if not self.is_loaded():
             return -1
         elif use_vehicle_time:
-            if traci.simulation.getDepartedNumber() > 0:
-                vehicle_id: str = traci.simulation.getDepartedIDList()[-1]
+            departed: tuple = self.backend.get_departed_ids()
+            if departed:
                 self.last_vehicle_depart = (
-                    traci.vehicle.getDeparture(vehicle_id) - traci.vehicle.getDepartDelay(vehicle_id)
+                    self.backend.get_departure(departed[-1]) - self.backend.get_depart_delay(departed[-1])
                 )
             return self.last_vehicle_depart
-        return traci.simulation.getTime()
+        return self.backend.get_time()
 
     def save_snapshot(self, snapshot_path: str) -> bool:
         """
@@ -87,7 +104,11 @@ class Simulation:
         if not self.is_running():
             return False
         print(f"Saving simulation state at: '{snapshot_path}'")
-        traci.simulation.saveState(snapshot_path)
+        try:
+            self.backend.save_state(snapshot_path)
+        except SimulationError as e:
+            print(f"Error occurred: {e}")
+            return False
         return True
 
     def get_step(self) -> int:
@@ -100,65 +121,75 @@ class Simulation:
 
     def initialize(self) -> Optional['Simulation']:
         """
-        :return: Self if traci loaded simulation, None if error occurred
+        :return: Self if backend loaded simulation, None if error occurred
         """
         print("Entering simulation, loading ...")
-        try:
-            traci.start(self.sumo_options.create_command())
-            self._open = True
-            # Start simulation from given state
-            if self.snapshot and SumoConfigFile.file_exists(self.snapshot):
-                print(f"Loading simulation from snapshot: {self.snapshot}")
-                traci.simulation.loadState(self.snapshot)
-        except traci.exceptions.FatalTraCIError as e:
-            # Closed by user
-            if str(e) == "connection closed by SUMO":
-                print("Closed GUI, exiting ....")
-            else:
-                print(f"Error occurred: {e}")
-            self._open = False
+        if self.backend is None or not self.backend.start(self.sumo_options):
             return None
+        # Start simulation from given state
+        if self.snapshot and SumoConfigFile.file_exists(self.snapshot):
+            print(f"Loading simulation from snapshot: {self.snapshot}")
+            try:
+                self.backend.load_state(self.snapshot)
+            except SimulationError as e:
+                print(f"Error occurred: {e}")
+                self.close()
+                return None
         return self
 
     def close(self) -> None:
         """
         :return:
         """
-        if traci.isLoaded() and self._open:
+        if self.is_loaded():
             print("Exiting simulation...")
-            traci.close()
-            self._open = False
+            self.backend.close()
         return
 
-    def step(self) -> bool:
+    def step(self, target_time: float = 0.) -> bool:
         """
-        Performs step on SUMO simulation.
+        Performs step on SUMO simulation, or advances it (by multiple steps) to the given time.
+        Departed and arrived vehicles are reported only for the last performed step.
 
+        :param target_time: time to which simulation is advanced (limited by end time),
+        single step is performed if it is not at least two steps ahead
         :return: True on success, false otherwise
         """
         if not self.is_running():
             return False
-        traci.simulation.step()
+        if target_time > 0:
+            current_time: float = self.backend.get_time()
+            target_time = min(target_time, self.config.get_end_time())
+            if target_time - current_time >= 2 * self.step_length:
+                self.backend.step(target_time)
+                self._step += round((self.backend.get_time() - current_time) / self.step_length)
+                return True
+        self.backend.step()
         self._step += 1
         return True
 
-    # noinspection PyMethodMayBeStatic
     def is_running(self, use_end_time: bool = True) -> bool:
         """
         :param use_end_time: If end time of configuration file should be used
         :return: True if simulation is running, false otherwise
         """
-        if not traci.isLoaded():
+        if not self.is_loaded():
             print("Simulation is not loaded!")
             return False
-        elif not (traci.simulation.getMinExpectedNumber() > 0):
+        elif not (self.backend.get_min_expected_number() > 0):
             print("Simulation ended!")
             return False
-        elif use_end_time and (traci.simulation.getTime() >= self.config.get_end_time()):
-            print(f"Simulation ended at time: {traci.simulation.getTime()}")
+        elif use_end_time and (self.backend.get_time() >= self.config.get_end_time()):
+            print(f"Simulation ended at time: {self.backend.get_time()}")
             return False
         return True
 
+    def is_loaded(self) -> bool:
+        """
+        :return: True if simulation was loaded by backend (and was not closed), False otherwise
+        """
+        return self.backend is not None and self.backend.is_loaded()
+
     # ------------------------------------------------- Magics -------------------------------------------------
 
     def __del__(self) -> None:
@@ -196,8 +227,7 @@ if __name__ == "__main__":
     with Simulation(config_path,  {"": ""}) as simulation:
         for _ in range(30):
             simulation.step()
-            print(traci.meandata.getParameter("-100654685#0", "sampledSeconds"))
-            traci.meandata.getIDList()
+            print(simulation.backend.get_travel_time("-100654685#0"))
 
 
 
@@ -1,9 +1,9 @@
 from utc.src.clustering.gravitational.congestion_visualizer import CongestionVisualizer
 from utc.src.constants.static.file_constants import DirPaths, FileExtension
-from utc.src.constants.file_system.file_types.xml_file import XmlFile
+from utc.src.constants.file_system.file_types.edge_data_store import EdgeDataStore
 from utc.src.graph import Graph, RoadNetwork
 from utc.src.constants.static.colors import GraphColors
-from typing import Dict, Tuple, Optional, List
+from typing import Tuple, Optional, List
 import numpy as np
 from matplotlib.patches import Circle
 import matplotlib.pyplot as plt
@@ -14,36 +14,39 @@ import matplotlib.gridspec as gridspec
 
 
 
-def load_ci(edge_data: str, graph: Graph, window: Optional[Tuple[float, float]] = None) -> list:
+def load_ci(
+        edge_data: str, graph: Graph, window: Optional[Tuple[float, float]] = None,
+        area: Optional[Tuple[float, float, float]] = None
+    ) -> list:
     """
     :param edge_data: edge data
     :param graph: on which we want the data to be (i.e. the other edges will be filtered)
     :param window: time window from which we want the data to be (from, to)
+    :param area: circle (x, y, radius), if given, only edges with centroid inside are loaded (others are NaN)
     :return: Congestion index values as
     """
-    if not XmlFile.file_exists(edge_data, True):
+    store: EdgeDataStore = EdgeDataStore(edge_data)
+    if not store.is_loaded():
         return None
     elif window is None:
         window = (0, float("inf"))
-    xml_file: XmlFile = XmlFile(edge_data)
-    # Edge_id : CongestionIndex
-    ci_map: Dict[str, float] = {edge_id: 0. for edge_id in graph.road_network.edges}
-    n_intervals: int = 0
-    for interval in xml_file.root.findall("interval"):
-        if float(interval.attrib["begin"]) < window[0]:
-            continue
-        elif float(interval.attrib["end"]) > window[1]:
-            break
-        n_intervals += 1
-        for edge in interval.findall("edge"):
-            if edge.attrib["id"] not in ci_map:
-                continue
-            elif "congestionIndex" not in edge.attrib:
-                print(f"Edge: {edge.attrib['id']} is missing attribute 'congestionIndex' !")
-                continue
-            ci_map[edge.attrib["id"]] += float(edge.attrib["congestionIndex"])
-    print(f"Loaded CI of: {edge_data}, intervals: {n_intervals}")
-    return np.array(list(ci_map.values())) / n_intervals
+    intervals: np.ndarray = store.get_intervals(*window)
+    # Intervals x edges of graph (values of edges missing in interval are NaN)
+    edges: List[str] = list(graph.road_network.edges.keys())
+    if area is not None:
+        edges = graph.road_network.get_spatial_index().edges_in_radius(area[:2], area[2])
+    values: Optional[np.ndarray] = store.get_values("congestionIndex", edges, intervals)
+    if values is None:
+        print(f"Edge data: {edge_data} is missing attribute 'congestionIndex' !")
+        return None
+    print(f"Loaded CI of: {edge_data}, intervals: {len(intervals)}, edges: {len(edges)}")
+    if area is None:
+        return np.nansum(values, axis=0, dtype=np.float64) / len(intervals)
+    ci: np.ndarray = np.full(len(graph.road_network.edges), np.nan, dtype=np.float64)
+    ci[[graph.road_network.get_edge(edge_id).internal_id for edge_id in edges]] = (
+        np.nansum(values, axis=0, dtype=np.float64) / len(intervals)
+    )
+    return ci
 
 
 if __name__ == '__main__':
@@ -65,6 +68,13 @@ if __name__ == '__main__':
         assert(planned_lust_ci[graph.road_network.get_edge(edge.id).internal_id] == planned_lust_red_ci[edge.internal_id])
     for edge in regions[0].road_network.get_edge_list():
         assert(orig_lust_ci[graph.road_network.get_edge(edge.id).internal_id] == orig_lust_red_ci[edge.internal_id])
+    # CI of edges around the center of red region (selected by spatial index, without the region network)
+    center: np.ndarray = np.mean(
+        [junction.get_position() for junction in regions[0].road_network.get_junctions_list()], axis=0
+    )
+    planned_area_ci = load_ci(data[0], graph, area=(center[0], center[1], 500.))
+    inside: np.ndarray = ~np.isnan(planned_area_ci)
+    assert(np.allclose(planned_area_ci[inside], planned_lust_ci[inside]))
 
 
 
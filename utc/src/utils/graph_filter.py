@@ -40,10 +40,14 @@ class GraphFilter:
         # Initialize new scenario
         new_scenario: Scenario = Scenario(new_scenario_name, True)
         routes_mapping: Dict[str, str] = {}
-        for original_route in original_scenario.routes_file.root.findall("route"):
-            sequence, indexes = graph.road_network.get_longest_sequence(original_route.attrib["edges"].split())
+        original_routes: List[Element] = original_scenario.routes_file.root.findall("route")
+        sequences: List[List[str]] = [original_route.attrib["edges"].split() for original_route in original_routes]
+        # Validate all routes at once
+        for original_route, sequence, (left, right) in zip(
+                original_routes, sequences, graph.road_network.get_longest_sequences(sequences)
+                ):
             # Unable to find at any common edges with subgraph, this vehicle does not travel on subgraph
-            if not sequence:
+            if left == right:
                 continue
             elif full_path:
                 routes_mapping[original_route.attrib["id"]] = new_scenario.routes_file.add_route(Element("route", {
@@ -54,7 +58,7 @@ class GraphFilter:
             # Save new route with new edges, along with new id of route
             routes_mapping[original_route.attrib["id"]] = new_scenario.routes_file.add_route(Element("route", {
                 "id": original_route.attrib["id"],
-                "edges": " ".join([edge.id for edge in sequence]),
+                "edges": " ".join(sequence[left:right]),
             }))
         # Change vehicles routes
         for original_vehicle in original_scenario.vehicles_file.root.findall("vehicle"):
@@ -0,0 +1,111 @@
+from utc.src.constants.static import FilePaths
+from utc.src.constants.file_system.file_types.sumo_config_file import SumoConfigFile
+from utc.src.graph import Graph, RoadNetwork
+from utc.src.simulator.simulation import Simulation
+from utc.src.simulator.backend import FakeBackend
+from utc.src.routing.planning.scheduler import Scheduler
+from utc.src.routing.planning.route_assigner import RouteAssigner
+import numpy as np
+import time
+from typing import Optional, List, Dict
+
+
+class OnlineBenchmark:
+    """
+    Class measuring throughput and latency of online control loop (simulation steps, scheduling of
+    vehicles, assignment of routes) without SUMO, simulation is replayed by FakeBackend from scenario
+    (vehicles, routes and optionally edge data), planner is replaced by re-assigning the current routes.
+    """
+    def __init__(self, config_path: str, regions: List[str], edge_data: str = ""):
+        """
+        :param config_path: path to configuration file of scenario
+        :param regions: names of (or paths to) networks of regions, in which vehicles are planned
+        :param edge_data: path to edge dump file, whose travel times are replayed
+        """
+        self.config: SumoConfigFile = SumoConfigFile(config_path)
+        self.edge_data: str = edge_data
+        self.graph: Graph = Graph(RoadNetwork())
+        assert(self.config.is_loaded() and self.graph.loader.load_map(self.config.get_network()))
+        self.regions: List[RoadNetwork] = []
+        for region in regions:
+            sub_graph: Graph = Graph(RoadNetwork())
+            assert(sub_graph.loader.load_map(region))
+            self.regions.append(sub_graph.road_network)
+
+    def run(
+            self, scale: float = 1., horizon: float = 30, lead_time: float = 10, fast_forward: bool = True
+        ) -> Optional[Dict[str, float]]:
+        """
+        :param scale: of number of vehicles in scenario
+        :param horizon: of scheduler (seconds)
+        :param lead_time: of scheduler (seconds)
+        :param fast_forward: if simulation should be fast-forwarded between events of scheduler
+        :return: Measured values (counts, wall time, latency of loop iterations in milliseconds), None on error
+        """
+        backend: FakeBackend = FakeBackend(edge_data=self.edge_data, scale=scale)
+        latencies: List[float] = []
+        scheduled: int = 0
+        assigned: int = 0
+        now: float = time.perf_counter()
+        with Simulation(self.config, {"-W": ""}, backend=backend) as simulation:
+            if simulation is None:
+                return None
+            scheduler: Scheduler = Scheduler(self.regions, dict(backend.travel_times), horizon, lead_time)
+            if fast_forward:
+                scheduler.set_departures((vehicle.depart, vehicle.route) for vehicle in backend.vehicles.values())
+            assigner: RouteAssigner = RouteAssigner(self.graph.road_network)
+            while simulation.is_running():
+                start: float = time.perf_counter()
+                simulation.step(scheduler.next_event(simulation))
+                batches: Optional[Dict[int, List[str]]] = scheduler.step(simulation)
+                if batches is None:
+                    break
+                for vehicle_ids in batches.values():
+                    scheduled += len(vehicle_ids)
+                    for vehicle_id in vehicle_ids:
+                        assigner.add_route(vehicle_id, list(backend.get_route(vehicle_id)))
+                    scheduler.queue.set_planned(vehicle_ids)
+                if assigner.routes:
+                    outcomes: Dict[str, str] = assigner.assign(backend, scheduler.queue.arrived)
+                    assigned += sum(outcome == RouteAssigner.ASSIGNED for outcome in outcomes.values())
+                latencies.append(time.perf_counter() - start)
+            steps: int = simulation.get_step()
+        total_time: float = time.perf_counter() - now
+        latency: np.ndarray = np.array(latencies, dtype=np.float64) * 1000
+        return {
+            "vehicles": len(backend.vehicles),
+            "steps": steps,
+            "iterations": len(latencies),
+            "scheduled": scheduled,
+            "assigned": assigned,
+            "time": round(total_time, 3),
+            "steps_per_second": round(steps / max(total_time, 1e-9), 2),
+            "latency_mean": round(float(latency.mean()), 3) if len(latency) else 0.,
+            "latency_p50": round(float(np.percentile(latency, 50)), 3) if len(latency) else 0.,
+            "latency_p95": round(float(np.percentile(latency, 95)), 3) if len(latency) else 0.,
+            "latency_max": round(float(latency.max()), 3) if len(latency) else 0.
+        }
+
+    def run_scales(self, scales: List[float], **kwargs) -> List[Dict[str, float]]:
+        """
+        :param scales: of number of vehicles, each is benchmarked separately
+        :param kwargs: arguments of 'run' method
+        :return: List of measured values (for each scale)
+        """
+        results: List[Dict[str, float]] = []
+        for scale in scales:
+            result: Optional[Dict[str, float]] = self.run(scale, **kwargs)
+            if result is None:
+                print(f"Benchmark with scale: {scale} failed!")
+                continue
+            print(f"Benchmark with scale: {scale}, results: {result}")
+            results.append(result)
+        return results
+
+
+# For testing purposes
+if __name__ == "__main__":
+    benchmark: OnlineBenchmark = OnlineBenchmark(
+        FilePaths.SCENARIO_CONFIG.format("lust_25200_32400", "lust_25200_32400"), ["lust_red"]
+    )
+    benchmark.run_scales([0.5, 1, 2, 4])
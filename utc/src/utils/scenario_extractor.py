@@ -1,10 +1,12 @@
 import time
-from utc.src.simulator import Scenario
+from utc.src.simulator.scenario import Scenario
 from utc.src.simulator.simulation import Simulation
 from utc.src.constants.static import DirPaths, FilePaths, FileExtension
-from utc.src.constants.file_system import SumoConfigFile
-from utc.src.graph.network import Graph, RoadNetwork
+from utc.src.constants.file_system.file_types.sumo_config_file import SumoConfigFile
+from utc.src.constants.file_system.directory_types import ScenarioDir
+from utc.src.graph import Graph, RoadNetwork
 from utc.src.utils.vehicle_extractor import VehicleExtractor
+from utc.src.utils.task_manager import TaskManager
 from typing import Optional, Union, Dict, Tuple, List, Set
 from copy import deepcopy
 
@@ -16,8 +18,12 @@ class ScenarioExtractor:
     include snapshots, etc.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = "traci"):
+        """
+        :param backend: name of backend running simulations (traci, libsumo, fake), default traci
+        """
         # Simulation
+        self.backend: str = backend
         self.config: Optional[SumoConfigFile] = None
         self.scenario: Optional[Scenario] = None
         self.graph: Optional[Graph] = None
@@ -163,7 +169,7 @@ class ScenarioExtractor:
         :return: True on success, false otherwise
         """
         scenario_name += f"_{from_time}_{to_time}"
-        with Simulation(config_path, {"-W": ""}, from_state) as simulation:
+        with Simulation(config_path, {"-W": ""}, from_state, self.backend) as simulation:
             if simulation is None or not simulation.is_running():
                 return False
             # Initialize scenario
@@ -209,37 +215,185 @@ class ScenarioExtractor:
         :param estimate_flows: if vehicle flow file should be generated
         :return: True on success, false otherwise
         """
-        if not (period > 0):
-            print(f"Invalid period, must be higher than 0, got: {period}!")
-            return False
-        self.config = SumoConfigFile(config_path)
-        to_time = self.config.get_end_time() if to_time == -1 else min(self.config.get_end_time(), to_time)
-        if not self.config.is_loaded():
-            return False
-        elif period > (self.config.get_end_time() - self.config.get_start_time()):
-            print(f"Invali period, higher then entire simulation time!")
+        intervals: Optional[List[Tuple[int, int]]] = self.get_intervals(config_path, period, from_time, to_time)
+        if intervals is None:
             return False
-        total_scenarios: int = (to_time - from_time) // period
-        print(f"Proceeding to generate {total_scenarios} scenarios")
-
-        for i in range(total_scenarios):
+        print(f"Proceeding to generate {len(intervals)} scenarios")
+        for i, (start, end) in enumerate(intervals):
             now: float = time.time()
             if not self.extract_scenario(
                     self.config, scenario_name, from_state, network,
-                    from_time, from_time + period, use_vehicle_time,
-                    snapshots, estimate_flows
+                    start, end, use_vehicle_time, snapshots, estimate_flows
                     ):
                 return False
             from_state = FilePaths.SCENARIO_SNAPSHOT.format(
-                scenario_name + f"_{from_time}_{from_time + period}",
-                scenario_name + f"_{from_time}_{from_time + period}"
+                scenario_name + f"_{start}_{end}", scenario_name + f"_{start}_{end}"
             )
             assert(SumoConfigFile.file_exists(from_state))
-            from_time += period
-            print(f"Finished extracting scenario: {i+1}/{total_scenarios}")
+            print(f"Finished extracting scenario: {i+1}/{len(intervals)}")
             print(f"Time taken: {round(time.time() - now)}s")
         return True
 
+    def extract_scenarios_parallel(
+            self, config_path: str, scenario_name: str, period: int = 3600,
+            from_state: str = "", network: str = None, from_time: int = 0,
+            to_time: int = -1, use_vehicle_time: bool = True, snapshots: bool = True,
+            processes: int = 4, merged_scenario_name: str = ""
+        ) -> bool:
+        """
+        Generates the same scenarios as 'extract_scenarios', but the simulation is first run
+        (without extracting vehicles) to create snapshots at the end of each interval, from
+        which are then the scenarios extracted in parallel (each by its own simulation).
+
+        :param config_path: path to configuration file
+        :param scenario_name: name of newly generated scenario (time will be added as suffix)
+        :param period: how often should scenarios be created (seconds), default 1 hour
+        :param from_state: if scenario should be loaded from certain state
+        :param network: if new scenario should only be on certain sub-network
+        :param from_time: starting time
+        :param to_time: ending time
+        :param use_vehicle_time: if ending time should be measured by last car departure
+        :param snapshots: if snapshot of the last scenario should be included
+        :param processes: number of simulations running in parallel
+        :param merged_scenario_name: name of scenario merged from extracted ones, skipped if not given
+        :return: True on success, false otherwise
+        """
+        intervals: Optional[List[Tuple[int, int]]] = self.get_intervals(config_path, period, from_time, to_time)
+        if intervals is None:
+            return False
+        names: List[str] = [scenario_name + f"_{start}_{end}" for start, end in intervals]
+        print(f"Proceeding to generate {len(intervals)} scenarios on {processes} processes")
+        now: float = time.time()
+        states: Optional[List[str]] = self.create_snapshots(names, intervals, from_state, use_vehicle_time)
+        if states is None:
+            return False
+        print(f"Created snapshots of {len(intervals)} intervals, time taken: {round(time.time() - now)}s")
+        # Snapshots of intervals (besides the last one) already exist, they are not saved again
+        task_manager: TaskManager = TaskManager(processes)
+        task_manager.tasks = [
+            (extract_interval, (
+                self.backend, self.config.file_path, scenario_name, state, network,
+                start, end, use_vehicle_time, (snapshots and i == len(intervals) - 1)
+            )) for i, (state, (start, end)) in enumerate(zip(states, intervals))
+        ]
+        results: List[bool] = task_manager.start()
+        print(f"Finished extracting {sum(results)}/{len(results)} scenarios, time taken: {round(time.time() - now)}s")
+        if not all(results):
+            return False
+        return not merged_scenario_name or self.merge_scenarios(names, merged_scenario_name)
+
+    def create_snapshots(
+            self, scenario_names: List[str], intervals: List[Tuple[int, int]],
+            from_state: str = "", use_vehicle_time: bool = True
+        ) -> Optional[List[str]]:
+        """
+        Runs single simulation trough all intervals, saves snapshot at the end of each
+        interval (besides the last one) to the directory of its scenario.
+
+        :param scenario_names: names of scenarios (one for each interval)
+        :param intervals: of scenarios
+        :param from_state: if simulation should be loaded from certain state
+        :param use_vehicle_time: if ending time should be measured by last car departure
+        :return: List of starting states of intervals, None if error occurred
+        """
+        states: List[str] = [from_state]
+        if len(intervals) < 2:
+            return states
+        with Simulation(self.config, {"-W": ""}, from_state, self.backend) as simulation:
+            if simulation is None or not simulation.is_running():
+                return None
+            for scenario_name, (_, end) in zip(scenario_names[:-1], intervals[:-1]):
+                # Nothing is extracted, simulation is fast-forwarded to the end of interval
+                # (time of vehicle departures cannot be ahead of simulation time)
+                simulation.step(end)
+                while simulation.is_running() and simulation.get_time(use_vehicle_time) < end:
+                    simulation.step()
+                if not simulation.is_running():
+                    print(f"Simulation ended before the end of interval: {end}!")
+                    return None
+                elif not ScenarioDir(scenario_name).initialize_dir():
+                    return None
+                states.append(FilePaths.SCENARIO_SNAPSHOT.format(scenario_name, scenario_name))
+                if not simulation.save_snapshot(states[-1]):
+                    return None
+        return states
+
+    def merge_scenarios(self, scenario_names: List[str], new_scenario_name: str) -> bool:
+        """
+        Merges scenarios (e.g. extracted from consecutive intervals) into one, vehicles
+        are added in the given order of scenarios and their routes are re-indexed.
+
+        :param scenario_names: names of scenarios to be merged
+        :param new_scenario_name: name of newly created scenario
+        :return: True on success, False otherwise
+        """
+        if not scenario_names:
+            print("Received empty list of scenarios to be merged!")
+            return False
+        new_scenario: Scenario = Scenario(new_scenario_name, create_new=True)
+        network: str = ""
+        for scenario_name in scenario_names:
+            scenario: Scenario = Scenario(scenario_name)
+            if not scenario.exists():
+                print(f"Unable to merge scenario: '{scenario_name}', it does not exist!")
+                return False
+            network = (network or scenario.config_file.get_network())
+            routes: dict = {
+                route.attrib["id"]: route for route in scenario.routes_file.root.findall("route")
+            }
+            for vehicle in scenario.vehicles_file.root.findall("vehicle"):
+                vehicle = deepcopy(vehicle)
+                vehicle.attrib["route"] = new_scenario.routes_file.add_route(deepcopy(routes[vehicle.attrib["route"]]))
+                new_scenario.vehicles_file.add_vehicle(vehicle)
+        return new_scenario.save(network)
+
+    def get_intervals(
+            self, config_path: Union[str, SumoConfigFile], period: int,
+            from_time: int = 0, to_time: int = -1
+        ) -> Optional[List[Tuple[int, int]]]:
+        """
+        :param config_path: path to configuration file
+        :param period: length of intervals (seconds)
+        :param from_time: starting time
+        :param to_time: ending time
+        :return: List of intervals (from, to), None if error occurred
+        """
+        if not (period > 0):
+            print(f"Invalid period, must be higher than 0, got: {period}!")
+            return None
+        self.config = config_path if isinstance(config_path, SumoConfigFile) else SumoConfigFile(config_path)
+        if not self.config.is_loaded():
+            return None
+        to_time = self.config.get_end_time() if to_time == -1 else min(self.config.get_end_time(), to_time)
+        if period > (self.config.get_end_time() - self.config.get_start_time()):
+            print(f"Invalid period, higher then entire simulation time!")
+            return None
+        total_scenarios: int = (to_time - from_time) // period
+        return [(from_time + i * period, from_time + (i + 1) * period) for i in range(total_scenarios)]
+
+
+def extract_interval(
+        backend: str, config_path: str, scenario_name: str, from_state: str,
+        network: Optional[str], from_time: int, to_time: int, use_vehicle_time: bool, snapshots: bool
+    ) -> bool:
+    """
+    Extracts scenario of single interval in separate process (used by 'extract_scenarios_parallel')
+
+    :param backend: name of backend running simulation
+    :param config_path: path to configuration file
+    :param scenario_name: name of newly generated scenario (time will be added as suffix)
+    :param from_state: if scenario should be loaded from certain state
+    :param network: if new scenario should only be on certain sub-network
+    :param from_time: starting time
+    :param to_time: ending time
+    :param use_vehicle_time: if ending time should be measured by last car departure
+    :param snapshots: if snapshot should be included in scenario
+    :return: True on success, false otherwise
+    """
+    return ScenarioExtractor(backend).extract_scenario(
+        config_path, scenario_name, from_state, network, from_time, to_time, use_vehicle_time, snapshots
+    )
+
 
 # For testing purposes
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
 import subprocess
 from multiprocessing import Pool, current_process
 from multiprocessing.pool import ApplyResult
-from psutil import Process, cpu_count
+from psutil import Process, NoSuchProcess, cpu_count
 from subprocess import Popen, call, TimeoutExpired, DEVNULL, SubprocessError
 from shlex import split as cmd_split
+from time import time, sleep
 from typing import List, Callable, Tuple, Any, Optional
 
 
@@ -70,10 +71,7 @@ class TaskManager:
             # Kill process and any children it has
             if proc is not None:
                 print(f"Process: {current_process().name} ran out of time, killing process ..")
-                process = Process(proc.pid)
-                for proc in process.children(recursive=True):
-                    proc.kill()
-                process.kill()
+                TaskManager.kill_process(proc.pid)
             # Catch other errors, apart from timeout ...
             if not isinstance(e, TimeoutExpired):
                 print(f"Error:! {e}")
@@ -83,6 +81,77 @@ class TaskManager:
             print(f"Successfully executed command: {success}")
         return success, ret_val
 
+    @staticmethod
+    def race_shell(
+            commands: List[str], timeout: float, cwd: List[Optional[str]] = None,
+            finished: Callable[[int], bool] = None, interval: float = 0.1, message: bool = True
+        ) -> int:
+        """
+        Runs all commands in parallel, till the first of them is finished (given by 'finished' function,
+        or by exiting successfully if function is not provided), or the timeout is reached,
+        remaining processes (and their children) are killed afterwards.
+
+        :param commands: console/terminal commands strings
+        :param timeout: total time (seconds) for running the console commands
+        :param cwd: directories from which commands should be called from (default is current)
+        :param finished: function checking if command (given by index) finished its task,
+        if None, command is finished once it successfully exits
+        :param interval: time (seconds) between checks of processes
+        :param message: true if called commands should be printed & their results, default true
+        :return: Index of command which finished first, -1 if none did
+        """
+        assert(timeout > 0.0 and commands)
+        cwd = ([None] * len(commands)) if cwd is None else cwd
+        assert(len(cwd) == len(commands))
+        if message:
+            print(f"Racing {len(commands)} commands with timeout: '{timeout}'")
+            print(f"On process: {current_process().name}")
+        winner: int = -1
+        processes: List[Optional[Popen[str]]] = [None] * len(commands)
+        deadline: float = time() + timeout
+        try:
+            for index, (command, directory) in enumerate(zip(commands, cwd)):
+                processes[index] = Popen(
+                    cmd_split(command), stdout=DEVNULL, stdin=DEVNULL, cwd=directory, encoding="utf-8"
+                )
+            while winner == -1 and time() < deadline:
+                running: bool = False
+                for index, proc in enumerate(processes):
+                    exited: bool = (proc.poll() is not None)
+                    running |= not exited
+                    # Task is finished once checked by function, or when process successfully exited
+                    if (finished is not None and finished(index)) or (finished is None and exited and proc.returncode == 0):
+                        winner = index
+                        break
+                if not running:
+                    break
+                sleep(interval)
+        except (SubprocessError, OSError) as e:  # OSError is raised if command could not be started
+            print(f"Error:! {e}")
+        # Kill processes which are still running (and wait for them, so that they do not remain as zombies)
+        for proc in processes:
+            if proc is not None and proc.poll() is None:
+                TaskManager.kill_process(proc.pid)
+                proc.wait()
+        if message:
+            print(f"Finished racing commands, winner: {winner}")
+        return winner
+
+    @staticmethod
+    def kill_process(pid: int) -> None:
+        """
+        :param pid: id of process to be killed (along with all of its children)
+        :return: None
+        """
+        try:
+            process = Process(pid)
+            for child in process.children(recursive=True):
+                child.kill()
+            process.kill()
+        except NoSuchProcess:
+            pass
+        return
+
     @staticmethod
     def call_shell_block(command: str, cwd: str = None, message: bool = True) -> Tuple[bool, int]:
         """
@@ -2,6 +2,11 @@ from utc.test.cases.converter_test import ConverterTest
 from utc.test.cases.graph_test import GraphTest
 from utc.test.cases.pddl_test import PddlTest
 from utc.test.cases.simulator_test import SimulatorTest
+from utc.test.cases.edge_data_test import EdgeDataTest
+from utc.test.cases.edge_manager_test import EdgeManagerTest
+from utc.test.cases.eta_engine_test import EtaEngineTest
+from utc.test.cases.spatial_index_test import SpatialIndexTest
+from utc.test.cases.route_assigner_test import RouteAssignerTest
 
 
 # Forward imports
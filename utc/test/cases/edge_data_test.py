@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+from os import utime
+from os.path import getmtime
+from tempfile import TemporaryDirectory
+from utc.src.constants.file_system.file_types.edge_data_store import EdgeDataStore
+
+
+EDGE_DUMP: str = """<?xml version="1.0" encoding="UTF-8"?>
+<meandata>
+    <interval begin="0.00" end="900.00" id="edgedata">
+        <edge id="a" traveltime="10.00" density="1.50" speed="13.89"/>
+        <edge id="b" traveltime="20.00" density="0.50"/>
+    </interval>
+    <interval begin="900.00" end="1800.00" id="edgedata">
+        <edge id="b" traveltime="25.00" density="2.00"/>
+        <edge id="c" traveltime="5.00" sampledSeconds="12.00"/>
+    </interval>
+</meandata>
+"""
+
+
+class EdgeDataTest(unittest.TestCase):
+    """ Test conversion of edge dump files to columnar store """
+
+    def write_dump(self, directory: str) -> str:
+        """
+        :param directory: in which edge dump is created
+        :return: path to edge dump
+        """
+        dump_path: str = directory + "/test_edgedata.out.xml"
+        with open(dump_path, "w") as file:
+            file.write(EDGE_DUMP)
+        return dump_path
+
+    def test_conversion(self) -> None:
+        """
+        Tests conversion of edge dump and loading of the saved store
+
+        :return: None
+        """
+        with TemporaryDirectory() as directory:
+            dump_path: str = self.write_dump(directory)
+            store: EdgeDataStore = EdgeDataStore(dump_path)
+            self.assertTrue(store.is_loaded())
+            self.assertTrue(store.file_path.endswith(".npz"))
+            self.assertEqual(list(store.edges), ["a", "b", "c"])
+            self.assertEqual(store.begin.tolist(), [0, 900])
+            self.assertEqual(store.end.tolist(), [900, 1800])
+            self.assertEqual(set(store.attributes), {"traveltime", "density", "speed", "sampledSeconds"})
+            # Missing values are NaN
+            np.testing.assert_array_equal(
+                store.get_attribute("traveltime"), np.array([[10, 20, np.nan], [np.nan, 25, 5]], dtype=np.float32)
+            )
+            # Loaded again from saved store (without conversion)
+            mtime: float = getmtime(store.file_path)
+            loaded: EdgeDataStore = EdgeDataStore(dump_path)
+            self.assertEqual(getmtime(loaded.file_path), mtime)
+            self.assertEqual(loaded.edges, store.edges)
+            np.testing.assert_array_equal(loaded.get_attribute("density"), store.get_attribute("density"))
+            loaded.close()
+
+    def test_queries(self) -> None:
+        """
+        Tests selection of intervals and values of edges
+
+        :return: None
+        """
+        with TemporaryDirectory() as directory:
+            store: EdgeDataStore = EdgeDataStore(self.write_dump(directory))
+            self.assertEqual(store.get_intervals(0, 900).tolist(), [0])
+            self.assertEqual(store.get_intervals(900).tolist(), [1])
+            self.assertEqual(store.get_intervals().tolist(), [0, 1])
+            self.assertIsNone(store.get_attribute("congestionIndex"))
+            # Unknown edges have NaN values
+            values: np.ndarray = store.get_values("traveltime", ["c", "x", "a"], np.array([1]))
+            np.testing.assert_array_equal(values, np.array([[5, np.nan, np.nan]], dtype=np.float32))
+
+    def test_computed_attribute(self) -> None:
+        """
+        Tests saving of computed attribute, which is kept once the store is converted again from newer edge dump
+
+        :return: None
+        """
+        with TemporaryDirectory() as directory:
+            dump_path: str = self.write_dump(directory)
+            store: EdgeDataStore = EdgeDataStore(dump_path)
+            store.set_attribute("congestionIndex", np.array([[0.1, 0.2, np.nan], [np.nan, 0.3, 0.4]]))
+            self.assertTrue(store.save())
+            # Edge dump is changed (new edge is added to the second interval)
+            with open(dump_path, "w") as file:
+                file.write(EDGE_DUMP.replace('<edge id="c"', '<edge id="d" traveltime="1.00"/>\n        <edge id="c"'))
+            utime(dump_path, (getmtime(store.file_path) + 10, getmtime(store.file_path) + 10))
+            converted: EdgeDataStore = EdgeDataStore(dump_path)
+            self.assertEqual(list(converted.edges), ["a", "b", "d", "c"])
+            np.testing.assert_array_equal(
+                converted.get_values("congestionIndex", ["a", "b", "c", "d"]),
+                np.array([[0.1, 0.2, np.nan, np.nan], [np.nan, 0.3, 0.4, np.nan]], dtype=np.float32)
+            )
+            converted.close()
@@ -0,0 +1,56 @@
+import unittest
+from utc.src.graph.network.managers.edge_manager import EdgeManager
+from utc.src.graph.network.parts import Edge
+from typing import List, Tuple
+
+
+class EdgeManagerTest(unittest.TestCase):
+    """ Test bulk validation of edge sequences """
+
+    def create_manager(self) -> EdgeManager:
+        """
+        Edges 'a' -> 'b' -> 'c' -> 'd', 'a' -> 'e', edges 'a' and 'f' have no incoming edges (accept any)
+
+        :return: EdgeManager with edges
+        """
+        manager: EdgeManager = EdgeManager()
+        for index, edge_id in enumerate(["a", "b", "c", "d", "e", "f"]):
+            self.assertTrue(manager.add_edge(Edge(
+                {"id": edge_id, "from": str(index), "to": str(index + 1)},
+                {f"{edge_id}_0": {"speed": 13.89, "length": 100.0}}, index
+            )))
+        manager.edge_connections = {"b": {"a"}, "c": {"b"}, "d": {"c"}, "e": {"a"}}
+        return manager
+
+    def test_longest_sequences(self) -> None:
+        """
+        Tests the longest valid sub-sequences of multiple sequences at once
+
+        :return: None
+        """
+        manager: EdgeManager = self.create_manager()
+        sequences: List[List[str]] = [
+            ["a", "b", "c", "d"],  # Whole sequence is valid
+            ["a", "x", "b", "c"],  # Unknown edge splits sequence
+            ["a", "b", "d", "e"],  # Edges 'b' -> 'd' and 'd' -> 'e' are not connected
+            [],
+            ["x", "y"],  # No edges in graph
+            ["c", "f", "a"],  # Edges without incoming edges accept any
+            ["a", "b", "x", "a", "e"],  # First one is chosen on tie
+            ["b", "c"]  # Not connected to the last edge of previous sequence
+        ]
+        expected: List[Tuple[int, int]] = [(0, 4), (2, 4), (0, 2), (-1, -1), (-1, -1), (0, 3), (0, 2), (0, 2)]
+        self.assertEqual(manager.get_longest_sequences(sequences), expected)
+        self.assertEqual(manager.get_longest_sequences([]), [])
+        self.assertEqual(manager.get_longest_sequences([[], ["x"]]), [(-1, -1), (-1, -1)])
+
+    def test_single_sequence(self) -> None:
+        """
+        Tests that bulk version matches 'get_longest_sequence' on sequences of connected edges
+
+        :return: None
+        """
+        manager: EdgeManager = self.create_manager()
+        sequences: List[List[str]] = [["a", "b", "c"], ["x", "a", "e", "y"], ["b", "x", "x", "a", "b", "c"]]
+        for sequence, bounds in zip(sequences, manager.get_longest_sequences(sequences)):
+            self.assertEqual(manager.get_longest_sequence(sequence)[1], bounds)
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from utc.src.routing.planning.eta_engine import EtaEngine
+from typing import Dict, List
+
+
+class EtaEngineTest(unittest.TestCase):
+    """ Test vectorised estimation of arrival times """
+
+    TRAVEL_TIMES: Dict[str, float] = {"a": 10.0, "b": 20.0, "c": 5.0, "d": 40.0}
+
+    def expected(self, engine: EtaEngine, routes: Dict[str, List[str]], vehicle_id: str, start: int, end: int) -> float:
+        """
+        :param engine: eta engine
+        :param routes: of vehicles
+        :param vehicle_id: id of vehicle
+        :param start: index in vehicle's route
+        :param end: index in vehicle's route (excluded)
+        :return: Sum of travel times of edges between start and end (computed edge by edge)
+        """
+        route: List[str] = routes[vehicle_id]
+        return sum(engine.travel_times[engine.edges[edge_id]] for edge_id in route[max(start, 0):end])
+
+    def test_estimate(self) -> None:
+        """
+        Tests ETA's of multiple vehicles against sums over their routes
+
+        :return: None
+        """
+        engine: EtaEngine = EtaEngine(self.TRAVEL_TIMES)
+        routes: Dict[str, List[str]] = {
+            "v0": ["a", "b", "c", "d"], "v1": ["c", "d"], "v2": ["d", "x", "a"]
+        }
+        for vehicle_id, route in routes.items():
+            engine.add_vehicle(vehicle_id, route)
+        # Unknown edges have zero travel time
+        self.assertEqual(engine.travel_times[engine.edges["x"]], 0)
+        vehicle_ids: List[str] = ["v0", "v1", "v2", "v0"]
+        starts: np.ndarray = np.array([1, 0, 0, 3])
+        ends: np.ndarray = np.array([3, 10, 3, 2])  # Ends after route, or before start
+        etas: np.ndarray = engine.estimate(vehicle_ids, starts, ends)
+        np.testing.assert_allclose(etas, [25.0, 45.0, 50.0, 0.0])
+        for vehicle_id, start, end, eta in zip(vehicle_ids, starts.tolist(), ends.tolist(), etas.tolist()):
+            self.assertAlmostEqual(eta, self.expected(engine, routes, vehicle_id, start, end))
+        self.assertEqual(len(engine.estimate([], np.zeros(0), np.zeros(0))), 0)
+
+    def test_update(self) -> None:
+        """
+        Tests smoothing of travel times and reported changed edges
+
+        :return: None
+        """
+        engine: EtaEngine = EtaEngine(self.TRAVEL_TIMES, alpha=0.5)
+        engine.add_vehicle("v0", ["a", "b", "c"])
+        changed: np.ndarray = engine.update({"a": 30.0, "b": 20.5, "c": 5.0}, tolerance=0.1)
+        self.assertEqual(changed.tolist(), [engine.edges["a"]])
+        np.testing.assert_allclose(engine.travel_times[:3], [20.0, 20.25, 5.0])
+        np.testing.assert_allclose(engine.estimate(["v0"], np.array([0]), np.array([3])), [45.25])
+        self.assertEqual(len(engine.update({})), 0)
+
+    def test_buffer(self) -> None:
+        """
+        Tests replacing and removing routes of vehicles, including compaction of buffer
+
+        :return: None
+        """
+        engine: EtaEngine = EtaEngine(self.TRAVEL_TIMES)
+        routes: Dict[str, List[str]] = {}
+        for index in range(600):
+            vehicle_id: str = f"v{index % 50}"
+            routes[vehicle_id] = [["a", "b", "c", "d"][(index + offset) % 4] for offset in range(index % 7 + 1)]
+            engine.add_vehicle(vehicle_id, routes[vehicle_id])
+        engine.remove_vehicle("v0")
+        routes.pop("v0")
+        self.assertNotIn("v0", engine.routes)
+        for vehicle_id, route in routes.items():
+            self.assertEqual(engine.get_edges(vehicle_id, 0, len(route)).tolist(), [engine.edges[e] for e in route])
+        vehicle_ids: List[str] = list(routes.keys())
+        etas: np.ndarray = engine.estimate(
+            vehicle_ids, np.ones(len(vehicle_ids)), np.full(len(vehicle_ids), 100)
+        )
+        for vehicle_id, eta in zip(vehicle_ids, etas.tolist()):
+            self.assertAlmostEqual(eta, self.expected(engine, routes, vehicle_id, 1, 100))
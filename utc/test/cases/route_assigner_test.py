@@ -0,0 +1,87 @@
+import unittest
+from utc.src.graph import RoadNetwork
+from utc.src.graph.network.parts import Edge, Junction, Route
+from utc.src.routing.planning.route_assigner import RouteAssigner
+from utc.src.simulator.backend.fake_backend import FakeBackend, FakeVehicle
+from typing import Dict, List
+
+
+class RouteAssignerTest(unittest.TestCase):
+    """ Test validation and assignment of new routes to vehicles of (fake) simulation """
+
+    def create_network(self) -> RoadNetwork:
+        """
+        Edges 'a' -> 'b' -> 'c' (route 'r0'), 'a' -> 'd' -> 'c' (connection of routes 'r1', 'r2' at junction '1')
+
+        :return: RoadNetwork
+        """
+        network: RoadNetwork = RoadNetwork()
+        for index in range(4):
+            self.assertTrue(network.add_junction(
+                Junction({"id": str(index), "x": str(index * 100), "y": "0", "type": "priority"}, index)
+            ))
+        for index, (edge_id, from_junction, to_junction) in enumerate(
+                [("a", "0", "1"), ("b", "1", "2"), ("c", "2", "3"), ("d", "1", "2")]):
+            self.assertTrue(network.add_edge(Edge(
+                {"id": edge_id, "from": from_junction, "to": to_junction},
+                {f"{edge_id}_0": {"speed": 13.89, "length": 100.0}}, index
+            )))
+        routes: List[Route] = [
+            Route([network.edges[edge_id] for edge_id in edges], f"r{index}", index)
+            for index, edges in enumerate([["a", "b", "c"], ["a"], ["d", "c"]])
+        ]
+        for route in routes:
+            self.assertTrue(network.add_route(route))
+        self.assertTrue(network.junctions["1"].add_connection(routes[1], routes[2]))
+        return network
+
+    def create_backend(self, indexes: Dict[str, int]) -> FakeBackend:
+        """
+        :param indexes: mapping of vehicle id to its index on route 'a', 'b', 'c' (-1 if not departed)
+        :return: FakeBackend with vehicles
+        """
+        backend: FakeBackend = FakeBackend()
+        for vehicle_id, index in indexes.items():
+            vehicle: FakeVehicle = FakeVehicle(vehicle_id, 0., "r0", ["a", "b", "c"])
+            vehicle.index = index
+            backend.vehicles[vehicle_id] = vehicle
+            if index >= 0:
+                backend.running[vehicle_id] = vehicle
+        return backend
+
+    def test_outcomes(self) -> None:
+        """
+        Tests outcomes of assignment and routes of vehicles afterwards
+
+        :return: None
+        """
+        assigner: RouteAssigner = RouteAssigner(self.create_network())
+        self.assertTrue(assigner.is_connected(["a", "d", "c"]))
+        backend: FakeBackend = self.create_backend({
+            "on_first": 0, "on_second": 1, "waiting": -1, "invalid": 0, "shifted": 0, "finished": 3, "left": 0
+        })
+        routes: Dict[str, List[str]] = {
+            "on_first": ["a", "d", "c"],  # Diverges on edge after the current one
+            "on_second": ["a", "d", "c"],  # Vehicle is already on edge 'b'
+            "waiting": ["a", "d", "c"],  # Not departed, route is assigned entirely
+            "invalid": ["a", "b", "d"],  # Edges 'b' -> 'd' are not connected
+            "shifted": ["d", "c"],  # Does not start at the first edge of current route
+            "finished": ["a", "d", "c"],  # Vehicle reached end of its route (backend no longer knows it)
+            "left": ["a", "d", "c"],  # Reported as arrived
+            "unknown": ["a", "d", "c"]  # Not in simulation at all
+        }
+        for vehicle_id, edges in routes.items():
+            assigner.add_route(vehicle_id, edges)
+        outcomes: Dict[str, str] = assigner.assign(backend, {"left"})
+        self.assertEqual(outcomes, {
+            "on_first": RouteAssigner.ASSIGNED, "on_second": RouteAssigner.PASSED,
+            "waiting": RouteAssigner.ASSIGNED, "invalid": RouteAssigner.INVALID,
+            "shifted": RouteAssigner.INVALID, "finished": RouteAssigner.ARRIVED,
+            "left": RouteAssigner.ARRIVED, "unknown": RouteAssigner.ARRIVED
+        })
+        self.assertEqual(assigner.routes, {})
+        self.assertEqual(backend.get_route("on_first"), ("a", "d", "c"))
+        self.assertEqual(backend.get_route("waiting"), ("a", "d", "c"))
+        self.assertEqual(backend.get_route_index("waiting"), -1)
+        for vehicle_id in ("on_second", "invalid", "shifted"):
+            self.assertEqual(backend.get_route(vehicle_id), ("a", "b", "c"))
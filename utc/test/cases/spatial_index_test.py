@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from utc.src.graph.network.spatial_index import GridIndex, SpatialIndex
+from utc.src.graph.network.parts import Edge, Junction
+from typing import List, Tuple
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """ Test spatial queries of grid index against linear scans """
+
+    def create_grids(self) -> List[GridIndex]:
+        """
+        :return: Grid indexes of random points (including empty grid and grid with duplicate points)
+        """
+        generator: np.random.Generator = np.random.default_rng(42)
+        grids: List[GridIndex] = [GridIndex(np.zeros((0, 2)), 10.)]
+        for size, cell_size in ((1, 5.), (50, 1.), (300, 25.), (300, 400.)):
+            points: np.ndarray = generator.normal(0, 100, (size, 2)) * (1, 3)
+            grids.append(GridIndex(points, cell_size))
+        points: np.ndarray = generator.normal(0, 100, (100, 2))
+        points[:40] = points[0]
+        grids.append(GridIndex(points, 10.))
+        return grids
+
+    def get_queries(self) -> List[Tuple[float, float]]:
+        """
+        :return: Points of queries (inside and outside of grids)
+        """
+        return [(0., 0.), (-35.5, 120.), (250., -400.), (5000., 5000.), (-1e6, 3.)]
+
+    def test_radius(self) -> None:
+        """
+        Tests points inside circle (sorted by distance)
+
+        :return: None
+        """
+        for grid in self.create_grids():
+            for point in self.get_queries():
+                distances: np.ndarray = np.hypot(*(grid.points - np.array(point)).T)
+                for radius in (0., 15., 150., 1e7):
+                    found: np.ndarray = grid.query_radius(point, radius)
+                    self.assertEqual(set(found.tolist()), set(np.flatnonzero(distances <= radius).tolist()))
+                    self.assertTrue(np.all(np.diff(distances[found]) >= 0))
+            # Duplicate points are found by zero radius
+            if len(grid.points):
+                self.assertEqual(
+                    set(grid.query_radius(tuple(grid.points[0]), 0).tolist()),
+                    set(np.flatnonzero(np.all(grid.points == grid.points[0], axis=1)).tolist())
+                )
+
+    def test_nearest(self) -> None:
+        """
+        Tests k nearest points (distances must equal to the k smallest ones)
+
+        :return: None
+        """
+        for grid in self.create_grids():
+            for point in self.get_queries():
+                distances: np.ndarray = np.hypot(*(grid.points - np.array(point)).T)
+                for k in (0, 1, 7, 45, 1000):
+                    found: np.ndarray = grid.query_nearest(point, k)
+                    self.assertEqual(len(found), min(k, len(grid.points)))
+                    self.assertEqual(len(set(found.tolist())), len(found))
+                    np.testing.assert_array_equal(distances[found], np.sort(distances)[:len(found)])
+
+    def test_network_queries(self) -> None:
+        """
+        Tests queries of junctions and edges by their id's
+
+        :return: None
+        """
+        junctions: List[Junction] = [
+            Junction({"id": str(index), "x": str(x), "y": str(y), "type": "priority"}, index)
+            for index, (x, y) in enumerate([(0, 0), (100, 0), (100, 100), (0, 300)])
+        ]
+        edges: List[Edge] = [
+            Edge(
+                {"id": f"e{index}", "from": str(index), "to": str(index + 1)},
+                {f"e{index}_0": {"speed": 13.89, "length": 100.0, "shape": shape}}, index
+            ) for index, shape in enumerate([[(0, 0), (100, 0)], [(100, 0), (100, 100)], [(100, 100), (0, 300)]])
+        ]
+        index: SpatialIndex = SpatialIndex(junctions, edges)
+        self.assertEqual(index.junctions_in_radius((90., 10.), 20.), ["1"])
+        self.assertEqual(index.nearest_junctions((90., 90.), 2), ["2", "1"])
+        self.assertEqual(index.edges_in_radius((50., 0.), 1.), ["e0"])
+        self.assertEqual(index.nearest_edges((60., 180.), 3), ["e2", "e1", "e0"])
+        self.assertEqual(index.nearest_edges((0., 0.), 10), ["e0", "e1", "e2"])